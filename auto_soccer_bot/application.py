@@ -1,55 +1,43 @@
 import cv2
 import asyncio
 import time
-import numpy as np
 from .camera_manager import CameraManager
 from .ball_detector import BallDetector
 from .robot_controller import RobotController
 from .robot_communicator import RobotCommunicator
+from .perf_stats import LatencyWindow, RateStats, monitor_event_loop_lag
+from .preprocessing import ColorPreprocessor
+from .frame_context import FrameContext
+from .motion_gate import MotionGate
+from .headless import MjpegDebugServer, install_shutdown_handler
+from .latency_trace import LatencyTracer
 from . import config_auto as config
 
-def enhance_frame_colors(frame, saturation_scale=1.5, value_scale=1.2):
-    """
-    Enhances the color saturation and value of a frame to make colors more vibrant.
-    :param frame: The input frame in BGR format.
-    :param saturation_scale: Factor to scale the saturation by (e.g., 1.5 for 50% increase).
-    :param value_scale: Factor to scale the brightness by (e.g., 1.2 for 20% increase).
-    :return: The enhanced frame in BGR format.
-    """
-    if frame is None:
-        return None
-    
-    # Convert the image from BGR to HSV color space
-    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-    
-    # Split the channels
-    h, s, v = cv2.split(hsv)
-
-    # Increase the saturation
-    # We multiply the saturation channel by a factor.
-    s = cv2.multiply(s, saturation_scale)
-    s = np.clip(s, 0, 255).astype(np.uint8)
-
-    # Optionally, increase the brightness/value as well
-    v = cv2.multiply(v, value_scale)
-    v = np.clip(v, 0, 255).astype(np.uint8)
-
-    # Merge the channels back together
-    final_hsv = cv2.merge((h, s, v))
-    
-    # Convert the HSV image back to BGR format
-    enhanced_frame = cv2.cvtColor(final_hsv, cv2.COLOR_HSV2BGR)
-    
-    return enhanced_frame
-
-
 class Application:
     def __init__(self):
         self.camera_manager = CameraManager()
         self.ball_detector = BallDetector()
         self.robot_controller = RobotController()
         self.robot_communicator = RobotCommunicator()
+        # Color enhancement (display/YOLO) + detector HSV stage; enhancement is skipped for webcams
+        self.preprocessor = ColorPreprocessor(enhance=self.camera_manager.source_type != 'webcam')
         self.running = False
+        self.loop_lag = LatencyWindow("event-loop lag")
+        self._lag_task = None
+        self.loop_stats = RateStats("loop")
+        self.frame_age = LatencyWindow("frame age")  # capture -> command decision (ms)
+        # Reuse the previous detection while stopped in a static scene
+        self.motion_gate = MotionGate() if getattr(config, "MOTION_GATE", True) else None
+        # Headless: no drawing/window; annotated frames only for a connected debug-stream client
+        self.headless = getattr(config, "HEADLESS", False)
+        self.debug_stream = MjpegDebugServer() if getattr(config, "DEBUG_STREAM_PORT", 0) else None
+        self._remove_signal_handler = None
+        self.stop_requested = False
+        # Per-stage timestamps of every frame, receipt -> command ack
+        self.latency_tracer = LatencyTracer() if getattr(config, "LATENCY_TRACE", True) else None
+        if self.latency_tracer is not None:
+            self.ball_detector.yolo_done_listener = self.latency_tracer.yolo_done
+            self.robot_communicator.delivery_listener = self.latency_tracer.delivered
 
     async def initialize(self):
         if not self.camera_manager.initialize(): return False
@@ -57,50 +45,62 @@ class Application:
             self.camera_manager.release()
             return False
         await self.robot_communicator.initialize()
+        if self.debug_stream is not None and not self.debug_stream.start():
+            self.debug_stream = None
+        self._remove_signal_handler = install_shutdown_handler(self.request_stop)
         self.running = True
+        if getattr(config, "LOOP_LAG_MONITOR", False):
+            self._lag_task = asyncio.create_task(monitor_event_loop_lag(self.loop_lag))
         print("Auto Soccer Bot Application initialized.")
         return True
 
     async def run_main_loop(self):
-        print("Starting Automatic Ball Chasing. Press ESC in OpenCV window to quit.")
+        if self.headless:
+            print("Starting Automatic Ball Chasing (headless). Press Ctrl+C to quit.")
+        else:
+            print("Starting Automatic Ball Chasing. Press ESC in OpenCV window to quit.")
         print(f"Target ESP32 Endpoint: {config.ESP32_MOVE_ENDPOINT}")
 
-        # --- Frame Skipping & State Variables ---
-        frame_counter = 0
+        # --- State Variables ---
+        last_seq = 0               # seq of the last frame processed (never process a frame twice)
         last_yolo_detection = None # Store the last valid detection result
+        direction_command = None   # last command decided (the motion gate only skips after 'stop')
 
         while self.running and self.camera_manager.is_opened():
-            raw_frame = self.camera_manager.get_frame()
-            if raw_frame is None:
-                await asyncio.sleep(0.01)
+            # Sleep until a frame newer than last_seq exists (no polling, no duplicates)
+            packet = await self.camera_manager.next_frame(last_seq, timeout=0.5)
+            if packet is None:
                 continue
+            if last_seq and packet.seq > last_seq + 1:
+                self.loop_stats.add("skipped", packet.seq - last_seq - 1)
+            last_seq = packet.seq
+            raw_frame = packet.frame
 
-            # --- Pre-processing Steps (Color enhancement, resizing, etc.) ---
+            # --- Pre-processing: derived images (HSV, enhanced, display, ...) are built on demand, once per frame ---
             # FOR TEST: For best performance, you should also resize the frame here
             # raw_frame = cv2.resize(raw_frame, (640, 480))
-
-            if self.camera_manager.source_type != 'webcam':
-                enhanced_frame = enhance_frame_colors(raw_frame, saturation_scale=config.SATURATION, value_scale=config.BRIGHTNESS)
-            else:
-                enhanced_frame = raw_frame
+            ctx = FrameContext(raw_frame, self.preprocessor, packet.seq, packet.timestamp)
+            timing = self.latency_tracer.begin(ctx, packet) if self.latency_tracer is not None else None
 
             # The frame dimensions should be taken from the final processed frame
-            frame_height, frame_width, _ = enhanced_frame.shape
+            frame_height, frame_width = ctx.height, ctx.width
             if self.camera_manager.frame_width == 0:
                 self.camera_manager.frame_width = frame_width
                 self.camera_manager.frame_height = frame_height
 
-            frame_counter += 1
-            # We will draw on this copy of the frame
-            display_frame = enhanced_frame.copy()
-
-            # --- Frame Skipping Logic ---
-            if frame_counter % config.DETECTION_INTERVAL == 0:
-                # On a detection frame, we UNCONDITIONALLY update our memory. The result of process_frame is the new reality.
-                last_yolo_detection = self.ball_detector.process_frame(enhanced_frame)
-            
-            # Now, draw whatever is in our memory (either the new detection or None)
-            display_frame = self.ball_detector.draw_detection(display_frame, last_yolo_detection)
+            # --- Detection: color every frame, YOLO as scheduled for the current controller state ---
+            # Robot stopped and scene unchanged: no color/YOLO run, but finished YOLO results
+            # are still merged and the track re-predicted
+            gated = self.motion_gate is not None and self.motion_gate.should_skip(ctx, direction_command)
+            if not gated:
+                t0 = time.perf_counter()
+                last_yolo_detection = self.ball_detector.process_frame(ctx, self.robot_controller.state)
+                if self.motion_gate is not None:
+                    self.motion_gate.record_run(time.perf_counter() - t0)
+            else:
+                last_yolo_detection = self.ball_detector.refresh()
+                if timing is not None:
+                    timing["gated"] = True
 
             # 2. Decide robot action based on the most recent valid ball position
             ball_info = self.ball_detector.get_detection_data(last_yolo_detection)
@@ -108,32 +108,66 @@ class Application:
             direction_command, speed_command, turn_ratio_command = self.robot_controller.decide_action(
                 ball_info, frame_width
             )
+            ctx.mark("decided")
+            self.frame_age.add((time.time() - packet.timestamp) * 1000.0)
+            self.loop_stats.add("frames")
 
             # 3. Send command to robot
-            asyncio.create_task(
-                self.robot_communicator.send_command(direction_command, speed_command, turn_ratio_command)
-            )
-
-            # 4. Display visuals on the frame we've been drawing on
-            self.robot_controller.draw_target_zone(display_frame, frame_width, frame_height)
-            self.robot_controller.draw_state_info(display_frame)
-            cv2.putText(display_frame, f"Cmd: {direction_command} @ {speed_command}", (10, 30),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            cv2.imshow('Auto Soccer Bot - Ball Detection', display_frame)
-            
-            key = cv2.waitKey(5) & 0xFF
-            if key == 27:  # ESC key
-                self.running = False
-                asyncio.create_task(self.robot_communicator.send_command("stop", 0))
-                await asyncio.sleep(0.2)
-                break
-            
-            await asyncio.sleep(0.001)
+            self.robot_communicator.submit(direction_command, speed_command, turn_ratio_command, token=timing)
+
+            # 4. Display visuals: drawn only for the window or a due debug-stream frame
+            publish = self.debug_stream is not None and self.debug_stream.wants_frame()
+            if not self.headless or publish:
+                # Draw whatever is in our memory (either the new detection or None)
+                self.ball_detector.draw_detection(ctx, last_yolo_detection)
+                self.robot_controller.draw_target_zone(ctx)
+                self.robot_controller.draw_state_info(ctx)
+                display_frame = ctx.display
+                cv2.putText(display_frame, f"Cmd: {direction_command} @ {speed_command}", (10, 30),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+                if publish:
+                    self.debug_stream.publish(display_frame)
+
+            if not self.headless:
+                cv2.imshow('Auto Soccer Bot - Ball Detection', display_frame)
+                key = cv2.waitKey(5) & 0xFF
+                if key == 27:  # ESC key
+                    self.request_stop()
+
+            if self.loop_stats.maybe_report() is not None:
+                print(f"[loop] {self.frame_age.summary()}")
+            if self.motion_gate is not None:
+                self.motion_gate.maybe_report()
+            if self.latency_tracer is not None:
+                self.latency_tracer.maybe_report()
+
+        if self.stop_requested:
+            self.robot_communicator.submit("stop", 0)
+            await self.robot_communicator.flush()
+
+    def request_stop(self):
+        """ESC or SIGINT/SIGTERM: leave the loop after this iteration and stop the robot."""
+        if not self.stop_requested:
+            print("Stopping...")
+        self.stop_requested = True
+        self.running = False
 
     async def cleanup(self):
+        if self._remove_signal_handler is not None:
+            self._remove_signal_handler()
+            self._remove_signal_handler = None
+        if self.debug_stream is not None:
+            self.debug_stream.stop()
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            self._lag_task = None
+        self.ball_detector.close()
         self.camera_manager.release()
-        cv2.destroyAllWindows()
+        if not self.headless:
+            cv2.destroyAllWindows()
         await self.robot_communicator.close()
+        if self.latency_tracer is not None:
+            self.latency_tracer.close()
         print("Auto Soccer Bot Application cleaned up.")
 
 async def start_auto_application():
@@ -1,9 +1,18 @@
+import time
 import cv2
 import numpy as np
 from ultralytics import YOLO
 import torch
 from . import config_auto as config
 from .detection_manager_base import DetectionManager
+from .frame_context import FrameContext
+from .detection_output import detection_data, draw_detection
+from .preprocessing import ColorPreprocessor
+from .inference_worker import InferenceWorker
+from .detection_scheduler import DetectionScheduler
+from .ball_tracker import BallTracker
+from .imgsz_controller import ImgszController
+from .perf_stats import LatencyWindow, RateStats
 
 class BallDetector(DetectionManager):
     def __init__(self):
@@ -14,21 +23,48 @@ class BallDetector(DetectionManager):
         self.target_class_ids = set()
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
 
-        # YOLO scheduling / TTL
+        # YOLO scheduling: color every frame, YOLO when the scheduler says so
         self.frame_count = 0
-        self.yolo_interval = max(1, getattr(config, "DETECTION_INTERVAL", 1))
-        self.yolo_ttl_frames = max(self.yolo_interval * 2, 3)  # keep last YOLO result briefly
+        self.scheduler = DetectionScheduler()
         self.last_yolo_detection = None
         self.last_yolo_frame_idx = -10_000
 
+        # Both detectors update the tracker; the app gets its prediction every frame
+        self.tracker = BallTracker()
+
+        # Asynchronous YOLO: inference on a worker thread, results merged as they arrive
+        self.async_yolo = bool(getattr(config, "YOLO_ASYNC", True))
+        self.yolo_worker = None
+        self.yolo_stats = RateStats("yolo")                  # inference time, submitted/results/dropped
+        self.yolo_result_age = LatencyWindow("yolo result age")  # capture -> merged into the loop (ms)
+        self.yolo_done_listener = None  # called with (seq, finish time) for every async result merged
+
         # Color thresholds and minimal area
         self.lower_color = np.array(config.LOWER_BALL_COLOR, dtype=np.uint8)
         self.upper_color = np.array(config.UPPER_BALL_COLOR, dtype=np.uint8)
         self.min_contour_area = int(config.MIN_BALL_CONTOUR_AREA)
 
-        # Optional HSV pre-processing
+        # Optional HSV pre-processing (applied through ColorPreprocessor's detection LUT)
         self.sat_gain = float(getattr(config, "SATURATION", 1.0))    # multiplicative on S
         self.brightness_add = float(getattr(config, "BRIGHTNESS", 0))  # additive on V
+        self._preprocessor = None  # detector gains only; used when given a plain BGR frame
+
+        # Optional YOLO input downscale (0 = full frame); boxes are scaled back to frame coordinates
+        self.yolo_input_width = int(getattr(config, "YOLO_INPUT_WIDTH", 0))
+
+        # Cascade: color blobs propose regions, YOLO verifies padded crops at a small imgsz
+        self.cascade = bool(getattr(config, "YOLO_CASCADE", False))
+        self.cascade_max_proposals = max(1, int(getattr(config, "CASCADE_MAX_PROPOSALS", 3)))
+        self.cascade_imgsz = int(getattr(config, "CASCADE_IMGSZ", 224))
+        self.cascade_pad = float(getattr(config, "CASCADE_PAD", 2.5))          # crop side = pad * blob diameter
+        self.cascade_min_crop = int(getattr(config, "CASCADE_MIN_CROP", 96))   # px
+        self.cascade_full_frame_s = float(getattr(config, "CASCADE_FULL_FRAME_PERIOD_MS", 2000)) / 1000.0
+        self.last_full_frame_yolo = 0.0
+        self.color_proposals = []
+
+        # Full-frame YOLO input size from a ladder, adapted to latency budget and ball size
+        self.imgsz_controller = ImgszController() if getattr(config, "YOLO_ADAPTIVE_IMGSZ", True) else None
+        self.frame_long_side = 0
 
     def initialize(self):
         print(f"Initializing YOLO model. Using device: {self.device}")
@@ -46,20 +82,37 @@ class BallDetector(DetectionManager):
                 return False
             print(f"YOLO initialized. Target class IDs: {self.target_class_ids}")
             print(f"Color fallback: lower={tuple(self.lower_color)}, upper={tuple(self.upper_color)}, min_area={self.min_contour_area}")
-            return True
         except Exception as e:
             print(f"Error loading YOLO model from {config.YOLO_MODEL_PATH}: {e}")
             return False
 
+        if self.async_yolo:
+            self.yolo_worker = InferenceWorker(self._run_yolo, self.yolo_stats)
+            self.yolo_worker.start()
+            print("YOLO inference runs on a worker thread (YOLO_ASYNC).")
+        return True
+
+    def close(self):
+        """Stop the inference worker (if any) and flush the imgsz log."""
+        if self.yolo_worker is not None:
+            self.yolo_worker.stop()
+            self.yolo_worker = None
+        if self.imgsz_controller is not None:
+            self.imgsz_controller.close()
+
     # -----------------------------
     # Internal helpers (YOLO / Color)
     # -----------------------------
-    def _run_yolo(self, frame_bgr):
-        """Return best YOLO detection dict or None."""
+    def _run_yolo(self, images, transforms, imgsz=None, kind="full"):
+        """
+        Return best YOLO detection dict or None over a batch of images (full
+        frame or crops). transforms[i] = (ox, oy, scale) maps image i's pixels
+        to frame pixels: frame = o + pixel * scale. `kind` only labels the job.
+        """
         best = None
-        # You can add imgsz=320 for speed if desired: self.model(frame_bgr, imgsz=320, ...)
-        results = self.model(frame_bgr, stream=True, device=self.device, verbose=False)
-        for r in results:
+        kwargs = {} if imgsz is None else {"imgsz": int(imgsz)}
+        results = self.model(images, stream=True, device=self.device, verbose=False, **kwargs)
+        for r, (ox, oy, scale) in zip(results, transforms):
             for box in r.boxes:
                 cls = int(box.cls[0])
                 if cls not in self.target_class_ids:
@@ -67,7 +120,8 @@ class BallDetector(DetectionManager):
                 conf = float(box.conf[0])
                 if conf <= config.DETECTION_CONFIDENCE_THRESHOLD:
                     continue
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
+                x1, y1, x2, y2 = (float(v) * scale for v in box.xyxy[0])
+                x1, y1, x2, y2 = int(ox + x1), int(oy + y1), int(ox + x2), int(oy + y2)
                 w, h = x2 - x1, y2 - y1
                 det = {
                     "type": "yolo",
@@ -80,19 +134,49 @@ class BallDetector(DetectionManager):
                     best = det
         return best
 
-    def _run_color(self, frame_bgr):
-        """Return color-based detection dict or None (largest contour in HSV range)."""
-        hsv = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV)
+    def _yolo_job(self, ctx, proposals, copy):
+        """
+        Build the YOLO job for this frame: (images, transforms, imgsz).
+        Cascade: padded crops around the color proposals at a small imgsz.
+        Full frame: when the cascade is off, there are no proposals, or the
+        periodic full-frame pass is due (catches balls the color stage misses).
+        """
+        full_due = time.perf_counter() - self.last_full_frame_yolo >= self.cascade_full_frame_s
+        if not self.cascade or not proposals or full_due:
+            return self._full_frame_job(ctx, copy)
+
+        frame = ctx.enhanced
+        images, transforms = [], []
+        for det in proposals[:self.cascade_max_proposals]:
+            cx, cy = det["center"]
+            half = max(self.cascade_min_crop, int(2 * det["radius"] * self.cascade_pad)) // 2
+            x0, y0 = max(0, cx - half), max(0, cy - half)
+            x1, y1 = min(ctx.width, cx + half), min(ctx.height, cy + half)
+            if x1 - x0 < 8 or y1 - y0 < 8:
+                continue
+            crop = frame[y0:y1, x0:x1]
+            images.append(crop.copy() if copy else crop)
+            transforms.append((x0, y0, 1.0))
+        if not images:
+            return self._full_frame_job(ctx, copy)
+        self.yolo_stats.add("crops", len(images))
+        return images, transforms, self.cascade_imgsz, "crops"
 
-        # Optional S/V adjustment
-        if self.sat_gain != 1.0 or self.brightness_add != 0.0:
-            h, s, v = cv2.split(hsv)
-            if self.sat_gain != 1.0:
-                s = np.clip(s.astype(np.float32) * self.sat_gain, 0, 255).astype(np.uint8)
-            if self.brightness_add != 0.0:
-                v = np.clip(v.astype(np.float32) + self.brightness_add, 0, 255).astype(np.uint8)
-            hsv = cv2.merge([h, s, v])
+    def _full_frame_job(self, ctx, copy):
+        self.last_full_frame_yolo = time.perf_counter()
+        image, scale = ctx.detector_input(self.yolo_input_width)
+        if copy and image is not ctx.raw and scale == 1.0:
+            image = image.copy()  # reused preprocessing buffer; the worker keeps it
+        self.yolo_stats.add("full_frame")
+        imgsz = self.imgsz_controller.imgsz if self.imgsz_controller is not None else None
+        return [image], [(0, 0, scale)], imgsz, "full"
 
+    def _run_color(self, hsv):
+        """
+        Return color-based detection dict or None (largest contour in HSV range).
+        `hsv` already has the S/V gains applied (FrameContext.detection_hsv).
+        The largest `cascade_max_proposals` blobs are kept in self.color_proposals.
+        """
         mask = cv2.inRange(hsv, self.lower_color, self.upper_color)
 
         # Mild denoise / morphology
@@ -102,14 +186,13 @@ class BallDetector(DetectionManager):
         mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=1)
 
         contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if not contours:
-            return None
-
-        c = max(contours, key=cv2.contourArea)
-        area = float(cv2.contourArea(c))
-        if area <= self.min_contour_area:
-            return None
+        scored = sorted(((cv2.contourArea(c), c) for c in contours), key=lambda ac: ac[0], reverse=True)
+        self.color_proposals = [self._color_detection(c, float(area))
+                                for area, c in scored[:max(1, self.cascade_max_proposals)]
+                                if area > self.min_contour_area]
+        return self.color_proposals[0] if self.color_proposals else None
 
+    def _color_detection(self, c, area):
         (x, y), radius = cv2.minEnclosingCircle(c)
         center_x, center_y, radius = int(x), int(y), int(radius)
         # Provide a bbox too (unified interface for drawing if needed)
@@ -128,76 +211,133 @@ class BallDetector(DetectionManager):
     # -----------------------------
     # Public API used by the app
     # -----------------------------
-    def process_frame(self, frame):
+    def frame_context(self, frame):
+        """Wrap a plain BGR frame (no enhancement, detector gains only)."""
+        if self._preprocessor is None:
+            self._preprocessor = ColorPreprocessor(enhance=False, detector_sat_gain=self.sat_gain,
+                                                   detector_brightness_add=self.brightness_add)
+        return FrameContext(frame, self._preprocessor)
+
+    def process_frame(self, frame, state=None):
         """
         Run prioritized hybrid detection:
-        - YOLO every N frames; cache result with short TTL.
-        - Color detection every frame as fallback.
-        Returns a detection dict or None (no drawing here).
+        - YOLO when the DetectionScheduler allows it (period from the controller
+          `state` and measured inference time).
+        - Color detection every frame.
+        Both feed the BallTracker (YOLO may restart the track, color only
+        refines it); between detections the track coasts on its velocity.
+        `frame` is a FrameContext (YOLO reads its enhanced/resized image, color
+        detection its detector HSV) or a plain BGR frame.
+        Returns a 'track' detection dict predicted for now, or None (no drawing here).
         """
         if frame is None or self.model is None:
             return None
+        ctx = frame if isinstance(frame, FrameContext) else self.frame_context(frame)
 
         self.frame_count += 1
+        self.frame_long_side = max(ctx.width, ctx.height)
 
-        # Throttled YOLO
-        new_yolo = None
-        if (self.frame_count % self.yolo_interval) == 0:
-            new_yolo = self._run_yolo(frame)
-            if new_yolo is not None:
-                self.last_yolo_detection = new_yolo
-                self.last_yolo_frame_idx = self.frame_count
+        # Fast color detection this frame (also the cascade's region proposals)
+        hsv = ctx.detection_hsv
+        ctx.mark("preprocessed")
+        color_det = self._run_color(hsv)
+        ctx.mark("color")
+        self.scheduler.color_ran()
 
-        # Pick valid YOLO (respect TTL to avoid stale boxes)
-        yolo_age = self.frame_count - self.last_yolo_frame_idx
-        yolo_valid = (self.last_yolo_detection is not None) and (yolo_age <= self.yolo_ttl_frames)
+        # Scheduled YOLO (never queued behind a running inference)
+        busy = self.yolo_worker is not None and not self.yolo_worker.idle()
+        if self.scheduler.run_yolo(state, busy):
+            job = self._yolo_job(ctx, self.color_proposals, copy=self.yolo_worker is not None)
+            if self.yolo_worker is not None:
+                self.yolo_worker.submit(ctx.seq, self.frame_count, job, ctx.timestamp)
+                ctx.mark("yolo_pending", True)
+            else:
+                t0 = time.perf_counter()
+                new_yolo = self._run_yolo(*job)
+                elapsed = time.perf_counter() - t0
+                self.yolo_stats.add_time("inference", elapsed)
+                self._record_inference(job, elapsed, new_yolo, ctx.seq)
+                self._merge_yolo(new_yolo, self.frame_count, ctx.seq, ctx.timestamp)
+                ctx.mark("yolo")
 
-        # Fast color fallback this frame
-        color_det = self._run_color(frame)
+        # Merge a finished async result; its age counts from the frame it was computed on
+        self._merge_finished()
 
-        # Priority rule: YOLO first if valid; otherwise color; otherwise None
-        if yolo_valid:
-            return self.last_yolo_detection
-        return color_det
+        # Color measurement after YOLO: a fresh YOLO box may have restarted the track elsewhere
+        if color_det is not None:
+            cx, cy = color_det["center"]
+            self.tracker.update(cx, cy, color_det["area"], ctx.timestamp, "color")
 
-    def draw_detection(self, frame, detection_result):
-        """Lightweight overlay for whichever detector produced the result."""
-        if frame is None or not detection_result:
-            return frame
-
-        t = detection_result.get("type", "yolo")
-        if t == "yolo":
-            x, y, w, h = detection_result["bbox"]
-            label = f'{detection_result.get("class_name","ball")} {detection_result.get("confidence",0):.2f}'
-            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-            cv2.putText(frame, label, (x, max(0, y - 10)),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-        else:
-            # color
-            cx, cy = detection_result.get("center", (None, None))
-            radius = detection_result.get("radius", 0)
-            if cx is not None:
-                cv2.circle(frame, (cx, cy), max(2, radius), (0, 255, 0), 2)
-                cv2.circle(frame, (cx, cy), 4, (0, 0, 255), -1)
-                cv2.putText(frame, "color", (cx - radius, max(0, cy - radius - 10)),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-        return frame
+        self.scheduler.maybe_report()
+        if self.yolo_stats.maybe_report() is not None:
+            print(f"[yolo] {self.yolo_result_age.summary()}")
 
-    def get_detection_data(self, detection_result):
+        return self._track_detection()
+
+    def refresh(self):
         """
-        Return (center_x, center_y, area) for controller consumption.
-        Works for both 'yolo' and 'color' detections.
+        Frame skipped by the motion gate: no color detection, no new YOLO job,
+        but a finished async YOLO result is still merged and the track is
+        predicted for now. Returns the same 'track' dict as process_frame().
         """
-        if not detection_result:
+        if self.model is None:
             return None
+        self._merge_finished()
+        return self._track_detection()
+
+    def _merge_finished(self):
+        if self.yolo_worker is None:
+            return
+        result = self.yolo_worker.take_result()
+        if result is not None:
+            self._record_inference(result.job, result.inference_s, result.detection, result.seq)
+            self._merge_yolo(result.detection, result.frame_idx, result.seq, result.timestamp)
+            if self.yolo_done_listener is not None:
+                self.yolo_done_listener(result.seq, result.finished)
 
-        if detection_result.get("type") == "color":
-            cx, cy = detection_result["center"]
-            area = detection_result["area"]
-            return (int(cx), int(cy), float(area))
-        else:
-            x, y, w, h = detection_result["bbox"]
-            cx = x + w // 2
-            cy = y + h // 2
-            area = detection_result["area"]
-            return (int(cx), int(cy), float(area))
\ No newline at end of file
+    def _track_detection(self):
+        prediction = self.tracker.predict()
+        if prediction is None:
+            return None
+        cx, cy, area, uncertainty = prediction
+        radius = int(np.sqrt(area / np.pi))
+        cx, cy = int(cx), int(cy)
+        return {
+            "type": "track",
+            "bbox": (cx - radius, cy - radius, radius * 2, radius * 2),
+            "center": (cx, cy),
+            "radius": radius,
+            "confidence": 1.0,
+            "area": area,
+            "class_name": self.tracker.source,  # detector of the last measurement
+            "uncertainty": uncertainty,          # px, grows while coasting
+        }
+
+    def _record_inference(self, job, seconds, detection, seq):
+        self.scheduler.record_inference(seconds)
+        imgsz, kind = job[2], job[3]
+        if self.imgsz_controller is not None and kind == "full":
+            diameter = max(detection["bbox"][2:]) if detection else None
+            self.imgsz_controller.update(imgsz, seconds, diameter, self.frame_long_side, seq)
+
+    def _merge_yolo(self, detection, frame_idx, seq, timestamp):
+        now = time.time()
+        if timestamp is None:
+            timestamp = now
+        self.yolo_result_age.add((now - timestamp) * 1000.0)
+        if detection is None or frame_idx < self.last_yolo_frame_idx:
+            return
+        detection["seq"] = seq              # camera frame the box belongs to
+        detection["timestamp"] = timestamp
+        self.last_yolo_detection = detection
+        self.last_yolo_frame_idx = frame_idx
+        x, y, w, h = detection["bbox"]
+        self.tracker.update(x + w / 2.0, y + h / 2.0, detection["area"], timestamp, "yolo", force=True)
+
+    def draw_detection(self, frame, detection_result):
+        """Lightweight overlay for whichever detector produced the result."""
+        return draw_detection(frame, detection_result)
+
+    def get_detection_data(self, detection_result):
+        """Return (center_x, center_y, area) for controller consumption."""
+        return detection_data(detection_result)
@@ -0,0 +1,102 @@
+# auto_soccer_bot/ball_tracker.py
+import time
+import numpy as np
+from . import config_auto as config
+
+
+class BallTracker:
+    """
+    Alpha-beta (constant-velocity) filter on the ball's image center and area.
+    Any detector updates it with a timestamped measurement; predict() is
+    queried every frame and extrapolates to the decision time, so the
+    controller steers toward where the ball is now rather than where the
+    last detection saw it.
+
+    Measurements older than the last update (async YOLO results) correct the
+    state through their residual against the prediction at their own capture
+    time. The track coasts on its velocity for at most `max_coast_s` after
+    the last measurement, then it is dropped.
+    """
+
+    def __init__(self, alpha=None, beta=None, max_coast_s=None, gate_px=None,
+                 meas_sigma_px=None, coast_sigma_px_per_s=None):
+        self.alpha = float(alpha if alpha is not None else getattr(config, "TRACKER_ALPHA", 0.6))
+        self.beta = float(beta if beta is not None else getattr(config, "TRACKER_BETA", 0.2))
+        self.max_coast_s = float(max_coast_s if max_coast_s is not None else getattr(config, "TRACKER_MAX_COAST_MS", 500)) / 1000.0
+        self.gate_px = float(gate_px if gate_px is not None else getattr(config, "TRACKER_GATE_PX", 120))
+        self.meas_sigma_px = float(meas_sigma_px if meas_sigma_px is not None else getattr(config, "TRACKER_MEAS_SIGMA_PX", 5.0))
+        self.coast_sigma_px_per_s = float(coast_sigma_px_per_s if coast_sigma_px_per_s is not None
+                                          else getattr(config, "TRACKER_COAST_SIGMA_PX_PER_S", 200.0))
+        self.reset()
+
+    def reset(self):
+        self.x = None                  # [cx, cy, area]
+        self.v = np.zeros(3)           # per second
+        self.t = 0.0                   # time the state refers to
+        self.last_measurement_t = 0.0
+        self.source = None             # detector of the last accepted measurement
+        self.updates = 0
+        self.rejected = 0              # measurements outside the gate
+
+    def is_active(self, now=None):
+        now = time.time() if now is None else now
+        return self.x is not None and now - self.last_measurement_t <= self.max_coast_s
+
+    def update(self, cx, cy, area, timestamp=None, source="color", force=False):
+        """
+        Feed a measurement taken at `timestamp` (capture time of its frame).
+        A measurement farther than the gate from an active track is rejected,
+        unless `force` (trusted detector): then the track restarts there.
+        Returns True if the measurement was used.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        z = np.array((cx, cy, area), dtype=np.float64)
+
+        if not self.is_active(timestamp):
+            self._start(z, timestamp, source)
+            return True
+
+        dt = timestamp - self.t
+        predicted = self.x + self.v * dt
+        residual = z - predicted
+        if np.hypot(residual[0], residual[1]) > self.gate_px:
+            if not force:
+                self.rejected += 1
+                return False
+            self._start(z, timestamp, source)
+            return True
+
+        if dt > 1e-4:
+            # Normal case: advance to the measurement time and correct
+            self.x = predicted + self.alpha * residual
+            self.v = self.v + (self.beta / max(dt, 0.02)) * residual  # floor: no velocity spikes on near-simultaneous frames
+            self.t = timestamp
+        else:
+            # Out-of-sequence (older than the state): correct position only, keep the state time
+            self.x = self.x + self.alpha * residual
+        self.last_measurement_t = max(self.last_measurement_t, timestamp)
+        self.source = source
+        self.updates += 1
+        return True
+
+    def _start(self, z, timestamp, source):
+        self.x = z
+        self.v = np.zeros(3)
+        self.t = timestamp
+        self.last_measurement_t = timestamp
+        self.source = source
+        self.updates += 1
+
+    def predict(self, now=None):
+        """
+        Predicted (cx, cy, area, uncertainty_px) at `now`, or None when there is
+        no track or it has coasted longer than max_coast_s.
+        """
+        now = time.time() if now is None else now
+        if not self.is_active(now):
+            return None
+        dt = now - self.t
+        x = self.x + self.v * dt
+        coast = now - self.last_measurement_t
+        uncertainty = self.meas_sigma_px + self.coast_sigma_px_per_s * coast
+        return float(x[0]), float(x[1]), max(0.0, float(x[2])), uncertainty
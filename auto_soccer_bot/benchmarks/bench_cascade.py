@@ -0,0 +1,114 @@
+# auto_soccer_bot/benchmarks/bench_cascade.py
+# CPU time per frame and recall: full-frame YOLO vs color-proposal -> YOLO-on-crop cascade.
+# Recall is measured against the full-frame pass (reference = what the current path finds).
+# Needs the YOLO model (ultralytics/torch). To run (from the parent directory of 'auto_soccer_bot'):
+#   python -m auto_soccer_bot.benchmarks.bench_cascade --input recording.mjpeg
+#   python -m auto_soccer_bot.benchmarks.bench_cascade --input recording.mjpeg --imgsz 160 224 256
+import argparse
+import time
+import numpy as np
+from .. import config_auto as config
+from ..ball_detector import BallDetector
+from ..frame_context import FrameContext
+from ..preprocessing import ColorPreprocessor
+from .stream_samples import RESOLUTIONS, load_frames, synthetic_frame
+
+
+def box_match(a, b, min_iou=0.3):
+    """True if bboxes (x, y, w, h) overlap enough or b's center lies inside a."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    if union > 0 and inter / union >= min_iou:
+        return True
+    cx, cy = bx + bw / 2.0, by + bh / 2.0
+    return ax <= cx <= ax + aw and ay <= cy <= ay + ah
+
+
+def run_full(detector, frames, enhance):
+    pre = ColorPreprocessor(enhance=enhance)
+    results, cpu = [], 0.0
+    for frame in frames:
+        t0 = time.process_time()
+        ctx = FrameContext(frame, pre)
+        detector._run_color(ctx.detection_hsv)  # the loop always runs color as well
+        results.append(detector._run_yolo(*detector._full_frame_job(ctx, copy=False)))
+        cpu += time.process_time() - t0
+    return results, cpu * 1000.0 / len(frames)
+
+
+def run_cascade(detector, frames, enhance, imgsz, full_frame_period_s):
+    pre = ColorPreprocessor(enhance=enhance)
+    detector.cascade = True
+    detector.cascade_imgsz = imgsz
+    detector.cascade_full_frame_s = full_frame_period_s
+    detector.last_full_frame_yolo = time.perf_counter()
+    results, cpu, crops = [], 0.0, 0
+    for frame in frames:
+        t0 = time.process_time()
+        ctx = FrameContext(frame, pre)
+        detector._run_color(ctx.detection_hsv)
+        images, transforms, size, kind = detector._yolo_job(ctx, detector.color_proposals, copy=False)
+        results.append(detector._run_yolo(images, transforms, size, kind))
+        cpu += time.process_time() - t0
+        crops += len(images) if kind == "crops" else 0
+    return results, cpu * 1000.0 / len(frames), crops / float(len(frames))
+
+
+def score(reference, candidate):
+    positives = [i for i, r in enumerate(reference) if r is not None]
+    hits = sum(1 for i in positives if candidate[i] is not None and box_match(reference[i]["bbox"], candidate[i]["bbox"]))
+    extra = sum(1 for i, r in enumerate(reference) if r is None and candidate[i] is not None)
+    recall = hits / float(len(positives)) if positives else float("nan")
+    return recall, len(positives), extra
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the YOLO cascade against full-frame YOLO.")
+    parser.add_argument("--input", help="recorded multipart MJPEG (or video file); synthetic frames if omitted")
+    parser.add_argument("--resolution", default="QVGA", choices=list(RESOLUTIONS))
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--imgsz", type=int, nargs="+", default=[160, 224, 256])
+    parser.add_argument("--full-frame-period-ms", type=float, default=0,
+                        help="periodic full-frame pass inside the cascade (0 = only when there are no proposals)")
+    parser.add_argument("--no-enhance", action="store_true", help="skip colour enhancement (webcam footage)")
+    args = parser.parse_args()
+
+    if args.input:
+        frames = load_frames(args.input, args.frames)
+    else:
+        width, height = RESOLUTIONS[args.resolution]
+        rng = np.random.default_rng(0)
+        frames = [synthetic_frame(width, height, i, rng) for i in range(args.frames)]
+    if not frames:
+        print("No frames to process.")
+        return
+
+    detector = BallDetector()
+    detector.async_yolo = False
+    detector.imgsz_controller = None  # reference: full frame at the model's default size
+    if not detector.initialize():
+        return
+    enhance = not args.no_enhance
+    h, w = frames[0].shape[:2]
+    period_s = args.full_frame_period_ms / 1000.0 if args.full_frame_period_ms > 0 else float("inf")
+    print(f"{len(frames)} frames {w}x{h}, model {config.YOLO_MODEL_PATH}, device {detector.device}")
+
+    # Warm up both paths (first model call allocates/fuses layers)
+    run_full(detector, frames[:2], enhance)
+    run_cascade(detector, frames[:2], enhance, args.imgsz[0], period_s)
+
+    reference, full_ms = run_full(detector, frames, enhance)
+    print(f"{'path':>16} {'cpu ms/frame':>13} {'crops/frame':>12} {'recall':>8} {'extra':>6}")
+    print(f"{'full frame':>16} {full_ms:13.1f} {'-':>12} {'ref':>8} {'-':>6}   ({sum(r is not None for r in reference)} frames with a ball)")
+    for imgsz in args.imgsz:
+        results, ms, crops = run_cascade(detector, frames, enhance, imgsz, period_s)
+        recall, positives, extra = score(reference, results)
+        print(f"{'cascade ' + str(imgsz):>16} {ms:13.1f} {crops:12.2f} {recall:8.1%} {extra:6d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# auto_soccer_bot/benchmarks/bench_command_transport.py
+# RobotCommunicator over HTTP vs binary UDP (with / without acks) against the local
+# ESP32 stand-in (run in a child process so its CPU time is not counted here).
+# Reports commands delivered, RTT percentiles, client CPU per command and bytes on the wire.
+# To run (from the parent directory of 'auto_soccer_bot'):
+#   python -m auto_soccer_bot.benchmarks.bench_command_transport --seconds 5 --rate 50
+#   python -m auto_soccer_bot.benchmarks.bench_command_transport --processing-ms 5 --udp-loss 0.05
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import multiprocessing as mp
+import time
+import httpx
+from .. import config_auto as config
+from ..command_transport import HttpTransport, UdpTransport, encode_command
+from ..robot_communicator import RobotCommunicator
+
+
+def serve_standin(ready_q, stop_event, processing_ms, udp_loss):
+    from .esp32_standin import Esp32StandIn
+    standin = Esp32StandIn(processing_ms=processing_ms, udp_loss=udp_loss)
+    standin.start()
+    ready_q.put((standin.http_port, standin.udp_port))
+    stop_event.wait()
+    standin.stop()
+
+
+def http_request_bytes(url):
+    """Size of one POST /move request as httpx sends it (request line + headers + body)."""
+    request = httpx.Request("POST", url, json={"direction": "soft_left", "speed": 120, "turn_ratio": 0.2})
+    head = f"POST {request.url.raw_path.decode()} HTTP/1.1\r\n"
+    head += "".join(f"{k}: {v}\r\n" for k, v in request.headers.items()) + "\r\n"
+    return len(head.encode()) + len(request.content)
+
+
+async def standin_status(http_port):
+    async with httpx.AsyncClient() as client:
+        return json.loads((await client.get(f"http://127.0.0.1:{http_port}/status")).text)
+
+
+async def run_transport(name, transport, seconds, rate, http_port):
+    before = await standin_status(http_port)
+    comm = RobotCommunicator(transport=transport)
+    comm.stats.interval_s = 0
+    directions = ["forward", "soft_left", "forward", "soft_right"]
+    with contextlib.redirect_stdout(io.StringIO()):  # the communicator prints every command
+        await comm.initialize()
+        cpu0, t0 = time.process_time(), time.perf_counter()
+        i = 0
+        while time.perf_counter() - t0 < seconds:
+            comm.submit(directions[(i // 5) % len(directions)], 120, 0.3)
+            i += 1
+            await asyncio.sleep(1.0 / rate)
+        comm.submit("stop", 0)
+        await comm.flush()
+        cpu = time.process_time() - cpu0
+        await comm.close()
+    after = await standin_status(http_port)
+    delta = {k: after[k] - before[k] for k in ("http", "udp", "udp_stale", "udp_lost")}
+
+    pct = comm.rtt.percentiles()
+    if isinstance(transport, UdpTransport):
+        wire = transport.bytes_sent / max(1, comm.sent + comm.failed)
+    else:
+        wire = http_request_bytes(transport.move_endpoint)
+    rtt = f"{pct['p50']:7.2f} {pct['p95']:7.2f}" if pct else f"{'-':>7} {'-':>7}"
+    print(f"{name:>12} {comm.sent:6d} {comm.failed:6d} {comm.coalesced:9d} {rtt} "
+          f"{cpu * 1e6 / max(1, comm.sent):10.0f} {wire:8.0f}   applied={delta['http'] + delta['udp']} "
+          f"stale={delta['udp_stale']} lost={delta['udp_lost']}")
+
+
+async def main_async(args, http_port, udp_port):
+    print(f"{'transport':>12} {'sent':>6} {'failed':>6} {'coalesced':>9} {'rtt p50':>7} {'p95':>7} "
+          f"{'cpu us/cmd':>10} {'bytes':>8}")
+    runs = [
+        ("http", HttpTransport(f"http://127.0.0.1:{http_port}/move", f"http://127.0.0.1:{http_port}/status")),
+        ("udp+ack", UdpTransport("127.0.0.1", udp_port, acks=True)),
+        ("udp", UdpTransport("127.0.0.1", udp_port, acks=False)),
+    ]
+    for name, transport in runs:
+        await run_transport(name, transport, args.seconds, args.rate, http_port)
+    print(f"(UDP command datagram: {len(encode_command(0, 'forward', 0, 0.0))} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RobotCommunicator transports against a local ESP32 stand-in.")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rate", type=float, default=50.0, help="commands submitted per second (the app's frame rate)")
+    parser.add_argument("--min-interval-ms", type=float, default=20.0,
+                        help="pacing floor (COMMAND_MIN_INTERVAL_MS / MIN_TIME_BETWEEN_ANY_COMMAND_MS) during the run")
+    parser.add_argument("--processing-ms", type=float, default=0.0, help="stand-in delay before every answer")
+    parser.add_argument("--udp-loss", type=float, default=0.0, help="fraction of datagrams the stand-in drops")
+    args = parser.parse_args()
+
+    config.COMMAND_MIN_INTERVAL_MS = args.min_interval_ms
+    config.MIN_TIME_BETWEEN_ANY_COMMAND_MS = args.min_interval_ms
+    config.COMMAND_KEEPALIVE_S = 0
+
+    ctx = mp.get_context("spawn")
+    ready_q, stop_event = ctx.Queue(), ctx.Event()
+    proc = ctx.Process(target=serve_standin, args=(ready_q, stop_event, args.processing_ms, args.udp_loss), daemon=True)
+    proc.start()
+    try:
+        http_port, udp_port = ready_q.get(timeout=10)
+        asyncio.run(main_async(args, http_port, udp_port))
+    finally:
+        stop_event.set()
+        proc.join(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
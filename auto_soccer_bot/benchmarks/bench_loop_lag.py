@@ -0,0 +1,83 @@
+# auto_soccer_bot/benchmarks/bench_loop_lag.py
+# Event-loop lag with JPEG decode on the loop vs on the decode worker.
+# To run (from the parent directory of 'auto_soccer_bot'):
+#   python -m auto_soccer_bot.benchmarks.bench_loop_lag --resolution SVGA --fps 20
+import argparse
+import asyncio
+import time
+from ..camera_manager import CameraManager
+from ..frame_decoder import decode_jpeg
+from ..perf_stats import LatencyWindow, monitor_event_loop_lag
+from .stream_samples import RESOLUTIONS, synthetic_jpegs
+
+MODES = {
+    "reader": "decode every part inside the reader coroutine (previous behaviour)",
+    "lazy": "decode the newest part inside get_frame() on the loop (DECODE_WORKERS = 0)",
+    "worker": "decode on FrameDecoder threads (DECODE_WORKERS >= 1)",
+}
+
+
+async def run_mode(mode, jpegs, fps, seconds, workers):
+    cm = CameraManager()
+    cm.source_type = "esp32_httpx"
+    cm.decode_stats.interval_s = 0  # silence periodic prints
+    cm.decode_workers = workers if mode == "worker" else 0
+    cm._start_decoder()
+
+    lag = LatencyWindow(mode)
+    lag_task = asyncio.create_task(monitor_event_loop_lag(lag, report_every_s=0))
+    stop_at = time.perf_counter() + seconds
+    consumed = [0]
+
+    async def reader():
+        # Stand-in for _run_httpx_mjpeg_reader: one part every 1/fps seconds
+        i = 0
+        while time.perf_counter() < stop_at:
+            jpg = jpegs[i % len(jpegs)]
+            if mode == "reader":
+                frame = decode_jpeg(jpg)
+                if frame is not None:
+                    cm.frame_slot.publish(frame)
+            else:
+                cm._store_jpeg(jpg)
+            i += 1
+            await asyncio.sleep(1.0 / fps)
+
+    async def consumer():
+        # Stand-in for the main loop: poll for frames, yield to the loop
+        last = None
+        while time.perf_counter() < stop_at:
+            frame = cm.frame_slot.latest().frame if mode == "reader" else cm.get_frame()
+            if frame is not None and frame is not last:
+                consumed[0] += 1
+                last = frame
+            await asyncio.sleep(0.005)
+
+    await asyncio.gather(reader(), consumer())
+    lag_task.cancel()
+    cm.release()
+    return lag, consumed[0]
+
+
+async def main_async(args):
+    w, h = RESOLUTIONS[args.resolution]
+    jpegs = synthetic_jpegs(30, w, h, args.quality)
+    print(f"{args.resolution} @ {args.fps} fps for {args.seconds:.0f}s per mode")
+    for mode in args.modes.split(","):
+        lag, consumed = await run_mode(mode, jpegs, args.fps, args.seconds, args.workers)
+        print(f"  {mode:<7} frames={consumed:<5} {lag.summary()}  -- {MODES[mode]}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Event-loop lag: decode on loop vs worker")
+    ap.add_argument("--resolution", default="SVGA", choices=sorted(RESOLUTIONS))
+    ap.add_argument("--quality", type=int, default=30)
+    ap.add_argument("--fps", type=float, default=20.0)
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--modes", default="reader,lazy,worker")
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
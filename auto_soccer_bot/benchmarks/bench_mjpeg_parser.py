@@ -0,0 +1,107 @@
+# auto_soccer_bot/benchmarks/bench_mjpeg_parser.py
+# Micro-benchmark: legacy regex/bytes-copy MJPEG parsing vs MjpegPartParser.
+# To run (from the parent directory of 'auto_soccer_bot'):
+#   python -m auto_soccer_bot.benchmarks.bench_mjpeg_parser
+#   python -m auto_soccer_bot.benchmarks.bench_mjpeg_parser --input recording.mjpeg --decode
+import argparse
+import re
+import time
+import numpy as np
+import cv2
+from ..mjpeg_parser import MjpegPartParser, BOUNDARY, HEADER_END
+from .stream_samples import (RESOLUTIONS, synthetic_jpegs, build_multipart_stream,
+                             load_stream, split_chunks)
+
+
+def legacy_parse(chunks, on_part):
+    """Parsing loop as it was in CameraManager._run_httpx_mjpeg_reader (kept as the baseline)."""
+    buf = bytearray()
+    for chunk in chunks:
+        buf.extend(chunk)
+        while True:
+            bidx = buf.find(BOUNDARY)
+            if bidx == -1:
+                if len(buf) > 2 * len(BOUNDARY):
+                    del buf[:len(buf) - 2 * len(BOUNDARY)]
+                break
+            h_end = buf.find(HEADER_END, bidx)
+            if h_end == -1:
+                break
+            headers_bytes = bytes(buf[bidx:h_end])
+            m = re.search(br'Content-Length:\s*(\d+)', headers_bytes, re.IGNORECASE)
+            if not m:
+                del buf[:h_end + 4]
+                continue
+            length = int(m.group(1))
+            start = h_end + 4
+            if len(buf) < start + length:
+                break
+            jpg = bytes(buf[start:start + length])
+            del buf[:start + length]
+            on_part(jpg)
+
+
+def parser_parse(chunks, on_part):
+    parser = MjpegPartParser(BOUNDARY)
+    for chunk in chunks:
+        parser.feed(chunk)
+        for jpg in parser:
+            on_part(jpg)
+    return parser
+
+
+def run_case(name, parse_fn, chunks, decode, repeats):
+    count = [0]
+
+    if decode:
+        def on_part(jpg):
+            arr = np.frombuffer(jpg, dtype=np.uint8)
+            if cv2.imdecode(arr, cv2.IMREAD_COLOR) is not None:
+                count[0] += 1
+    else:
+        def on_part(jpg):
+            count[0] += 1
+
+    best = float("inf")
+    for _ in range(repeats):
+        count[0] = 0
+        t0 = time.perf_counter()
+        parse_fn(chunks, on_part)
+        best = min(best, time.perf_counter() - t0)
+    return best, count[0]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="MJPEG part parser micro-benchmark")
+    ap.add_argument("--input", help="Recorded multipart stream (raw bytes). Default: synthetic stream.")
+    ap.add_argument("--resolution", default="SVGA", choices=sorted(RESOLUTIONS))
+    ap.add_argument("--frames", type=int, default=120)
+    ap.add_argument("--quality", type=int, default=30)
+    ap.add_argument("--chunk-sizes", default="512,1460,4096,16384,65536")
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--decode", action="store_true", help="Also cv2.imdecode every part")
+    args = ap.parse_args()
+
+    if args.input:
+        data = load_stream(args.input)
+        source = args.input
+    else:
+        w, h = RESOLUTIONS[args.resolution]
+        data = build_multipart_stream(synthetic_jpegs(args.frames, w, h, args.quality))
+        source = f"synthetic {args.resolution} x{args.frames} q{args.quality}"
+
+    print(f"Stream: {source} ({len(data) / 1e6:.2f} MB)  decode={args.decode}")
+    print(f"{'chunk':>8} {'legacy ms':>10} {'parser ms':>10} {'speedup':>8} {'parts':>6} {'MB/s':>8}")
+
+    for size in (int(s) for s in args.chunk_sizes.split(",")):
+        chunks = split_chunks(data, size)
+        t_old, n_old = run_case("legacy", legacy_parse, chunks, args.decode, args.repeats)
+        t_new, n_new = run_case("parser", parser_parse, chunks, args.decode, args.repeats)
+        if n_old != n_new:
+            print(f"Warning: part count mismatch at chunk={size}: legacy={n_old} parser={n_new}")
+        print(f"{size:>8} {t_old * 1e3:>10.2f} {t_new * 1e3:>10.2f} {t_old / t_new:>7.2f}x "
+              f"{n_new:>6} {len(data) / 1e6 / t_new:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# auto_soccer_bot/benchmarks/bench_preprocess.py
+# Per-frame colour preprocessing cost: enhance_frame_colors + BallDetector HSV stage
+# (previous path) vs one ColorPreprocessor pass (shared HSV + LUTs).
+# To run (from the parent directory of 'auto_soccer_bot'):
+#   python -m auto_soccer_bot.benchmarks.bench_preprocess --resolutions QVGA VGA SVGA
+import argparse
+import time
+import numpy as np
+import cv2
+from .. import config_auto as config
+from ..preprocessing import ColorPreprocessor, enhance_frame_colors
+from .stream_samples import RESOLUTIONS, synthetic_frame
+
+
+def legacy_detector_hsv(frame_bgr, sat_gain, brightness_add):
+    # Copy of the previous BallDetector._run_color pre-processing (ball_detector imports YOLO/torch)
+    hsv = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV)
+    h, s, v = cv2.split(hsv)
+    if sat_gain != 1.0:
+        s = np.clip(s.astype(np.float32) * sat_gain, 0, 255).astype(np.uint8)
+    if brightness_add != 0.0:
+        v = np.clip(v.astype(np.float32) + brightness_add, 0, 255).astype(np.uint8)
+    return cv2.merge([h, s, v])
+
+
+def legacy_path(frame, lower, upper):
+    enhanced = enhance_frame_colors(frame, saturation_scale=config.SATURATION, value_scale=config.BRIGHTNESS)
+    hsv = legacy_detector_hsv(enhanced, float(config.SATURATION), float(config.BRIGHTNESS))
+    return enhanced, cv2.inRange(hsv, lower, upper)
+
+
+def fused_path(pre, frame, lower, upper, with_bgr=True):
+    hsv = pre.to_hsv(frame)
+    mask = cv2.inRange(pre.detection_hsv(hsv), lower, upper)
+    enhanced = pre.enhanced_bgr(frame, hsv) if with_bgr else None
+    return enhanced, mask
+
+
+def time_per_frame(fn, frames, repeats):
+    best = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for f in frames:
+            fn(f)
+        dt = (time.perf_counter() - t0) * 1000.0 / len(frames)
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fused colour preprocessing stage.")
+    parser.add_argument("--resolutions", nargs="+", default=list(RESOLUTIONS), choices=list(RESOLUTIONS))
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    lower = np.array(config.LOWER_BALL_COLOR, dtype=np.uint8)
+    upper = np.array(config.UPPER_BALL_COLOR, dtype=np.uint8)
+    print(f"SATURATION={config.SATURATION}, BRIGHTNESS={config.BRIGHTNESS}, "
+          f"frames={args.frames}, best of {args.repeats}")
+    print(f"{'res':>5} {'legacy ms':>10} {'fused ms':>9} {'mask-only ms':>13} {'speedup':>8} {'mask agree':>11} {'bgr diff':>9}")
+
+    for name in args.resolutions:
+        width, height = RESOLUTIONS[name]
+        rng = np.random.default_rng(0)
+        frames = [synthetic_frame(width, height, i, rng) for i in range(args.frames)]
+        pre = ColorPreprocessor()
+
+        legacy_ms = time_per_frame(lambda f: legacy_path(f, lower, upper), frames, args.repeats)
+        fused_ms = time_per_frame(lambda f: fused_path(pre, f, lower, upper), frames, args.repeats)
+        mask_ms = time_per_frame(lambda f: fused_path(pre, f, lower, upper, with_bgr=False), frames, args.repeats)
+
+        # Output agreement: enhanced BGR is identical; masks differ only where the old
+        # HSV->BGR->HSV round trip shifted a hue/saturation value across a threshold
+        agree, bgr_diff = [], 0
+        for f in frames:
+            old_bgr, old_mask = legacy_path(f, lower, upper)
+            new_bgr, new_mask = fused_path(pre, f, lower, upper)
+            agree.append(float(np.mean(old_mask == new_mask)))
+            bgr_diff = max(bgr_diff, int(np.abs(old_bgr.astype(np.int16) - new_bgr).max()))
+
+        print(f"{name:>5} {legacy_ms:10.2f} {fused_ms:9.2f} {mask_ms:13.2f} "
+              f"{legacy_ms / fused_ms:7.2f}x {100.0 * np.mean(agree):10.2f}% {bgr_diff:9d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# auto_soccer_bot/benchmarks/bench_replay.py
+# Offline run of the perception/control pipeline on a recorded stream (stream_recording.py):
+# CameraManager 'replay' source -> BallDetector -> RobotController, no robot needed.
+# Reports frames per second, CPU time per stage and the command sequence (with a digest to
+# compare runs). As fast as possible (default) the run is deterministic: every frame is
+# processed, YOLO runs inline and the clock seen by the pipeline follows the recorded
+# receive timestamps. --realtime replays at the recorded pace through the live code path.
+# Needs the YOLO model (ultralytics/torch). To run (from the parent directory of 'auto_soccer_bot'):
+#   python -m auto_soccer_bot.benchmarks.bench_replay recordings/field.mjpeg --commands-out baseline.csv
+#   python -m auto_soccer_bot.benchmarks.bench_replay recordings/field.mjpeg --baseline baseline.csv
+#   python -m auto_soccer_bot.benchmarks.bench_replay recordings/synthetic.mjpeg --synthetic 200
+import argparse
+import asyncio
+import contextlib
+import csv
+import hashlib
+import os
+import time
+from .. import config_auto as config
+from ..stream_recording import StreamRecorder
+
+STAGES = ("decode", "preprocess", "detect", "decide")
+
+
+class RecordedClock:
+    """
+    Replaces time.time() / time.perf_counter() while the pipeline runs, so
+    timers (tracker, scheduler, controller timeouts) advance with the
+    recording instead of the wall clock. Inside a frame the clock stands
+    still: measured durations are 0, so time-budgeted YOLO scheduling only
+    depends on the recording.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self._saved = None
+
+    def set(self, timestamp):
+        self.now = timestamp
+
+    def __enter__(self):
+        self._saved = (time.time, time.perf_counter)
+        time.time = lambda: self.now
+        time.perf_counter = lambda: self.now
+        return self
+
+    def __exit__(self, *exc):
+        time.time, time.perf_counter = self._saved
+
+
+def write_synthetic_recording(path, n_frames, fps=20.0):
+    from .stream_samples import PART_TEMPLATE, synthetic_jpegs
+    recorder = StreamRecorder(path)
+    t = time.time()
+    for i, jpg in enumerate(synthetic_jpegs(n_frames, 640, 480, quality=40)):
+        ts = t + i / fps
+        recorder.write(PART_TEMPLATE % (len(jpg), int(ts), int((ts % 1) * 1e6)) + jpg, ts)
+    recorder.close()
+
+
+async def run(args):
+    from ..ball_detector import BallDetector
+    from ..camera_manager import CameraManager
+    from ..frame_context import FrameContext
+    from ..motion_gate import MotionGate
+    from ..preprocessing import ColorPreprocessor
+    from ..robot_controller import RobotController
+
+    camera = CameraManager()
+    detector = BallDetector()
+    controller = RobotController()
+    preprocessor = ColorPreprocessor(enhance=True)
+    motion_gate = MotionGate() if getattr(config, "MOTION_GATE", True) else None
+    if not camera.initialize() or not detector.initialize():
+        return None
+
+    cpu = {stage: 0.0 for stage in STAGES}
+    commands = []          # (seq, frame_stamp_s, direction, speed, turn_ratio)
+    clock = RecordedClock() if not args.realtime else contextlib.nullcontext()
+    last_seq, last_detection, direction = 0, None, None
+    t_start = time.perf_counter()
+    try:
+        while camera.is_opened() and (not args.max_frames or len(commands) < args.max_frames):
+            c0 = time.process_time()
+            packet = await camera.next_frame(last_seq, timeout=1.0)
+            c1 = time.process_time()
+            if packet is None:
+                continue
+            last_seq = packet.seq
+            if not args.realtime:
+                clock.set(packet.timestamp)
+            with clock:
+                ctx = FrameContext(packet.frame, preprocessor, packet.seq, packet.timestamp)
+                gated = motion_gate is not None and motion_gate.should_skip(ctx, direction)
+                if not gated:
+                    ctx.detection_hsv
+                c2 = time.process_time()
+                if not gated:
+                    last_detection = detector.process_frame(ctx, controller.state)
+                else:
+                    last_detection = detector.refresh()
+                c3 = time.process_time()
+                ball_info = detector.get_detection_data(last_detection)
+                direction, speed, turn_ratio = controller.decide_action(ball_info, ctx.width)
+                c4 = time.process_time()
+            for stage, dt in zip(STAGES, (c1 - c0, c2 - c1, c3 - c2, c4 - c3)):
+                cpu[stage] += dt
+            commands.append((packet.seq, packet.timestamp, direction, int(speed), round(float(turn_ratio), 4)))
+    finally:
+        wall = time.perf_counter() - t_start
+        detector.close()
+        camera.release()
+    return commands, cpu, wall
+
+
+def command_digest(commands):
+    """Digest of the command sequence (direction, speed, turn_ratio per frame)."""
+    h = hashlib.sha1()
+    for _, _, direction, speed, turn_ratio in commands:
+        h.update(f"{direction},{speed},{turn_ratio:.4f};".encode())
+    return h.hexdigest()[:16]
+
+
+def run_lengths(commands):
+    runs = []
+    for _, _, direction, speed, _ in commands:
+        if runs and runs[-1][0] == (direction, speed):
+            runs[-1][1] += 1
+        else:
+            runs.append([(direction, speed), 1])
+    return runs
+
+
+def write_commands(path, commands):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["seq", "frame_stamp_s", "direction", "speed", "turn_ratio"])
+        for seq, stamp, direction, speed, turn_ratio in commands:
+            writer.writerow([seq, f"{stamp:.6f}", direction, speed, f"{turn_ratio:.4f}"])
+
+
+def compare_baseline(path, commands):
+    with open(path, newline="") as f:
+        baseline = [(r["direction"], int(r["speed"]), float(r["turn_ratio"])) for r in csv.DictReader(f)]
+    current = [(d, s, t) for _, _, d, s, t in commands]
+    for i, (a, b) in enumerate(zip(baseline, current)):
+        if a[0] != b[0] or a[1] != b[1] or abs(a[2] - b[2]) > 1e-3:
+            print(f"Baseline differs at frame {i}: {a} -> {b}")
+            return False
+    if len(baseline) != len(current):
+        print(f"Baseline has {len(baseline)} frames, this run {len(current)}")
+        return False
+    print(f"Matches baseline ({len(current)} commands).")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded stream through detector + controller offline.")
+    parser.add_argument("recording", help="file written by STREAM_RECORD_PATH / stream_recording.py")
+    parser.add_argument("--realtime", action="store_true", help="recorded pace, live code path (not deterministic)")
+    parser.add_argument("--max-frames", type=int, default=0)
+    parser.add_argument("--commands-out", default="", help="write the command sequence as CSV")
+    parser.add_argument("--baseline", default="", help="compare with a --commands-out CSV of an earlier run")
+    parser.add_argument("--synthetic", type=int, default=0, help="first write a synthetic recording of N frames")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        write_synthetic_recording(args.recording, args.synthetic)
+    if not os.path.exists(args.recording):
+        parser.error(f"no recording at {args.recording}")
+
+    config.VIDEO_SOURCE = "replay"
+    config.REPLAY_PATH = args.recording
+    config.REPLAY_REALTIME = args.realtime
+    config.STATS_PRINT_INTERVAL_S = 0
+    if not args.realtime:
+        config.YOLO_ASYNC = False   # inline YOLO: results land on the frame they were computed on
+        config.DECODE_WORKERS = 0
+
+    result = asyncio.run(run(args))
+    if result is None:
+        return
+    commands, cpu, wall = result
+    n = len(commands)
+    if not n:
+        print("No frames replayed.")
+        return
+
+    print(f"\n{n} frames in {wall:.2f}s wall: {n / wall:.1f} fps "
+          f"({'real time' if args.realtime else 'as fast as possible'})")
+    print(f"{'stage':>10} {'cpu ms/frame':>12} {'share':>6}")
+    total = sum(cpu.values())
+    for stage in STAGES:
+        print(f"{stage:>10} {cpu[stage] * 1000.0 / n:12.2f} {cpu[stage] / max(total, 1e-9):6.0%}")
+    print(f"{'total':>10} {total * 1000.0 / n:12.2f}")
+
+    runs = run_lengths(commands)
+    print(f"\nCommand sequence ({len(runs)} changes), digest {command_digest(commands)}:")
+    print("  " + " ".join(f"{d}@{s}x{count}" for (d, s), count in runs[:40]) + (" ..." if len(runs) > 40 else ""))
+    if args.commands_out:
+        write_commands(args.commands_out, commands)
+        print(f"Commands written to {args.commands_out}")
+    if args.baseline:
+        compare_baseline(args.baseline, commands)
+
+
+if __name__ == "__main__":
+    main()
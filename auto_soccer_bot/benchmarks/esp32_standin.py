@@ -0,0 +1,196 @@
+# auto_soccer_bot/benchmarks/esp32_standin.py
+# Local stand-in for the command side of the ESP32 firmware, to test and benchmark
+# RobotCommunicator transports without the robot:
+#   HTTP POST /move  - same JSON rules as robot_control_handlers.cpp (400 on bad input, "OK")
+#   HTTP GET /status - current state and counters as JSON
+#   UDP              - binary datagrams of command_transport.py (latest seq wins, acks on request)
+# To run (from the parent directory of 'auto_soccer_bot'):
+#   python -m auto_soccer_bot.benchmarks.esp32_standin --http-port 8080 --udp-port 4210
+# then set ESP32_IP_ADDRESS / ESP32_CONTROL_PORT / ESP32_COMMAND_UDP_PORT to it.
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ..command_transport import (DIRECTION_CODES, KIND_ACK, KIND_COMMAND, KIND_PING,
+                                 decode_datagram, encode_header, seq_newer)
+
+
+class Esp32StandIn:
+    """
+    Emulates /move on HTTP and the UDP command datagrams. `processing_ms`
+    delays every answer (the firmware parses and drives motors before
+    replying); `udp_loss` drops that fraction of incoming datagrams.
+    Applied commands are kept in `history` as (time, transport, direction, speed, turn_ratio).
+    """
+
+    def __init__(self, host="127.0.0.1", http_port=0, udp_port=0, processing_ms=0.0, udp_loss=0.0, verbose=False):
+        self.host = host
+        self.processing_s = processing_ms / 1000.0
+        self.udp_loss = udp_loss
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self.state = {"direction": "stop", "speed": 0, "turn_ratio": 1.0}
+        self.counts = {"http": 0, "udp": 0, "udp_stale": 0, "udp_lost": 0, "bad_request": 0}
+        self.history = deque(maxlen=10000)
+        self.last_seq = None
+
+        self.http = ThreadingHTTPServer((host, http_port), _StandInHandler)
+        self.http.daemon_threads = True
+        self.http.standin = self
+        self.udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp.bind((host, udp_port))
+        self.udp.settimeout(0.5)
+        self.http_port = self.http.server_address[1]
+        self.udp_port = self.udp.getsockname()[1]
+        self._running = False
+        self._threads = []
+
+    def start(self):
+        self._running = True
+        self._threads = [threading.Thread(target=self.http.serve_forever, name="standin-http", daemon=True),
+                         threading.Thread(target=self._udp_loop, name="standin-udp", daemon=True)]
+        for t in self._threads:
+            t.start()
+        print(f"ESP32 stand-in: HTTP {self.host}:{self.http_port} (/move, /status), UDP {self.host}:{self.udp_port}")
+
+    def stop(self):
+        self._running = False
+        self.http.shutdown()
+        self.http.server_close()
+        for t in self._threads:
+            t.join(timeout=2.0)
+        self.udp.close()
+
+    def apply(self, transport, direction, speed, turn_ratio):
+        with self.lock:
+            self.state = {"direction": direction, "speed": speed, "turn_ratio": turn_ratio}
+            self.counts[transport] += 1
+            self.history.append((time.time(), transport, direction, speed, turn_ratio))
+        if self.verbose:
+            print(f"[{transport}] {direction} speed={speed} turn_ratio={turn_ratio:.2f}")
+
+    def status(self):
+        with self.lock:
+            return dict(self.state, **self.counts, last_seq=self.last_seq)
+
+    def _udp_loop(self):
+        while self._running:
+            try:
+                data, addr = self.udp.recvfrom(64)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            if self.udp_loss and random.random() < self.udp_loss:
+                with self.lock:
+                    self.counts["udp_lost"] += 1
+                continue
+            parsed = decode_datagram(data)
+            if parsed is None:
+                with self.lock:
+                    self.counts["bad_request"] += 1
+                continue
+            kind, seq, ack_requested, body = parsed
+            if kind == KIND_COMMAND:
+                with self.lock:
+                    newer = self.last_seq is None or seq_newer(seq, self.last_seq)
+                    if newer:
+                        self.last_seq = seq
+                    else:
+                        self.counts["udp_stale"] += 1  # late or duplicate: latest seq wins
+                if newer:
+                    direction, speed, turn_ratio = body
+                    self.apply("udp", direction, speed, turn_ratio)
+            elif kind != KIND_PING:
+                continue
+            if ack_requested or kind == KIND_PING:
+                if self.processing_s:
+                    time.sleep(self.processing_s)
+                self.udp.sendto(encode_header(KIND_ACK, seq), addr)
+
+
+def parse_move_json(body):
+    """Same rules as parseMoveCommandJson(): (direction, speed, turn_ratio) or None."""
+    try:
+        doc = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(doc, dict) or not isinstance(doc.get("direction"), str):
+        return None
+    speed = doc.get("speed", 255)
+    speed = max(0, min(255, speed)) if isinstance(speed, int) and not isinstance(speed, bool) else 255
+    turn_ratio = doc.get("turn_ratio", 1.0)
+    turn_ratio = float(turn_ratio) if isinstance(turn_ratio, (int, float)) and not isinstance(turn_ratio, bool) else 1.0
+    return doc["direction"], speed, turn_ratio
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like esp_http_server
+    disable_nagle_algorithm = True  # headers and body are separate writes
+
+    def _reply(self, code, body, content_type="text/plain"):
+        data = body.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        standin = self.server.standin
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        if self.path != "/move":
+            self._reply(404, "Not found")
+            return
+        if standin.processing_s:
+            time.sleep(standin.processing_s)
+        command = parse_move_json(body) if body else None
+        if command is None or command[0] not in DIRECTION_CODES:
+            with standin.lock:
+                standin.counts["bad_request"] += 1
+            self._reply(400, "Empty request body" if not body else "Malformed JSON or unknown direction")
+            return
+        standin.apply("http", *command)
+        self._reply(200, "OK")
+
+    def do_GET(self):
+        if self.path != "/status":
+            self._reply(404, "Not found")
+            return
+        self._reply(200, json.dumps(self.server.standin.status()), "application/json")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the ESP32 /move endpoint and UDP commands.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--http-port", type=int, default=8080)
+    parser.add_argument("--udp-port", type=int, default=4210)
+    parser.add_argument("--processing-ms", type=float, default=0.0, help="delay before every answer")
+    parser.add_argument("--udp-loss", type=float, default=0.0, help="fraction of datagrams dropped")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    standin = Esp32StandIn(args.host, args.http_port, args.udp_port, args.processing_ms, args.udp_loss,
+                           verbose=not args.quiet)
+    standin.start()
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.stop()
+        print(f"ESP32 stand-in: {standin.status()}")
+
+
+if __name__ == "__main__":
+    main()
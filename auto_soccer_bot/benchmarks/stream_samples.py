@@ -0,0 +1,84 @@
+# auto_soccer_bot/benchmarks/stream_samples.py
+# Helpers to get multipart MJPEG bytes for the benchmarks: either a recorded
+# ESP32 stream dumped to disk, or a synthetic stream with the firmware framing.
+import time
+import numpy as np
+import cv2
+from ..mjpeg_parser import BOUNDARY
+
+# Same layout as _STREAM_BOUNDARY / _STREAM_PART in esp32cam_robot camera_handlers.cpp
+PART_TEMPLATE = b"\r\n" + BOUNDARY + b"\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\nX-Timestamp: %d.%06d\r\n\r\n"
+
+RESOLUTIONS = {
+    "QVGA": (320, 240),
+    "VGA": (640, 480),
+    "SVGA": (800, 600),
+}
+
+
+def synthetic_frame(width, height, index, rng):
+    """Textured frame with a moving yellow-green ball (JPEG size close to a real scene)."""
+    frame = rng.integers(60, 140, size=(height, width, 3), dtype=np.uint8)
+    frame = cv2.GaussianBlur(frame, (7, 7), 0)
+    cx = int((index * 7) % width)
+    cy = int(height * 0.6)
+    cv2.circle(frame, (cx, cy), max(6, height // 12), (40, 220, 190), -1)
+    return frame
+
+
+def synthetic_jpegs(n_frames=60, width=800, height=600, quality=30, seed=0):
+    rng = np.random.default_rng(seed)
+    jpegs = []
+    for i in range(n_frames):
+        ok, enc = cv2.imencode(".jpg", synthetic_frame(width, height, i, rng),
+                               [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+        if ok:
+            jpegs.append(enc.tobytes())
+    return jpegs
+
+
+def build_multipart_stream(jpegs):
+    """Wrap JPEG payloads with the ESP32 multipart framing."""
+    now = time.time()
+    parts = []
+    for i, jpg in enumerate(jpegs):
+        ts = now + i / 20.0
+        parts.append(PART_TEMPLATE % (len(jpg), int(ts), int((ts % 1) * 1e6)))
+        parts.append(jpg)
+    return b"".join(parts)
+
+
+def load_stream(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def split_chunks(data, chunk_size):
+    """Pre-split the stream like httpx aiter_bytes() would (bytes objects)."""
+    return [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+def load_frames(path, max_frames=None):
+    """Decoded BGR frames from a recorded multipart MJPEG dump or any file OpenCV can open."""
+    from ..mjpeg_parser import MjpegPartParser
+    frames = []
+    data = load_stream(path)
+    if BOUNDARY in data[:4096]:
+        parser = MjpegPartParser(BOUNDARY)
+        parser.feed(data)
+        for jpg in parser:
+            frame = cv2.imdecode(np.frombuffer(jpg, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is not None:
+                frames.append(frame)
+            if max_frames and len(frames) >= max_frames:
+                break
+        return frames
+
+    cap = cv2.VideoCapture(path)
+    while not max_frames or len(frames) < max_frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
@@ -1,18 +1,24 @@
 import asyncio
-import re
+import time
 import httpx
-import numpy as np
 import cv2
 from . import config_auto as config
-
-# Boundary used by the ESP32 MJPEG server (matches firmware PART_BOUNDARY)
-BOUNDARY = b"--123456789000000000000987654321"
-HEADER_END = b"\r\n\r\n"
+from .mjpeg_parser import MjpegPartParser, BOUNDARY
+from .frame_decoder import FrameDecoder, decode_jpeg
+from .frame_slot import FrameSlot
+from .frame_grabber import FrameGrabber
+from .perf_stats import RateStats
+from .stream_recording import StreamRecorder, replay_chunks
 
 class CameraManager:
     def __init__(self):
         self.source_type = config.VIDEO_SOURCE
-        self.source_path = config.WEBCAM_INDEX if self.source_type == 'webcam' else config.ESP32_STREAM_URL
+        if self.source_type == 'webcam':
+            self.source_path = config.WEBCAM_INDEX
+        elif self.source_type == 'replay':
+            self.source_path = getattr(config, "REPLAY_PATH", "")
+        else:
+            self.source_path = config.ESP32_STREAM_URL
         self.cap = None  # used only for 'webcam' or legacy 'esp32_stream'
         self.frame_width = 0
         self.frame_height = 0
@@ -22,7 +28,27 @@ class CameraManager:
         self._stream_task = None
         self._stop = False
         self._opened = False
-        self._latest_frame = None  # always keep only the newest frame (dropping)
+        self._jpeg_slot = FrameSlot()  # newest compressed JPEG ('frame' holds the bytes)
+        self._decoded_seq = 0          # JPEG seq last decoded on the caller
+        self._decoded_reduction = None
+        self._decoded_frame = None
+
+        # Newest decoded frame + seq + capture timestamp, for every source type
+        self.frame_slot = FrameSlot()
+        self.decode_reduction = int(getattr(config, "JPEG_DECODE_REDUCTION", 1))
+        self.decode_workers = int(getattr(config, "DECODE_WORKERS", 1))
+        self.decode_stats = RateStats("decode")
+        self._decoder = None       # FrameDecoder when decoding off the event loop
+        self._grabber = None       # FrameGrabber thread for OpenCV sources
+        self.capture_stats = RateStats("capture")
+
+        # Recording / replay of the raw MJPEG stream (see stream_recording.py)
+        self.record_path = getattr(config, "STREAM_RECORD_PATH", "")
+        self._recorder = None
+        self.replay_realtime = getattr(config, "REPLAY_REALTIME", True)
+        self._replay = None        # chunk iterator for lock-step replay
+        self._replay_parser = None
+        self._replay_received = 0.0  # recorded receive time of the last chunk parsed
 
     def initialize(self):
         print(f"Initializing camera source: {self.source_type} at {self.source_path}")
@@ -34,6 +60,7 @@ class CameraManager:
                 return False
             self.frame_width  = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 0
             self.frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 0
+            self._start_grabber()
             self._opened = True
             print(f"Webcam initialized. {self.frame_width}x{self.frame_height}")
             return True
@@ -41,11 +68,29 @@ class CameraManager:
         elif self.source_type == 'esp32_httpx':
             # Start async MJPEG reader; frames are parsed and the latest is stored
             self._stop = False
+            self._start_decoder()
+            if self.record_path:
+                self._recorder = StreamRecorder(self.record_path)
+                print(f"Recording the stream to {self.record_path}")
             self._stream_task = asyncio.create_task(self._run_httpx_mjpeg_reader())
             self._opened = True
             print("ESP32 MJPEG over httpx: reader task started.")
             return True
 
+        elif self.source_type == 'replay':
+            self._stop = False
+            if self.replay_realtime:
+                # Same path as the live stream: reader task, latest-only slots, frames may be skipped
+                self._start_decoder()
+                self._stream_task = asyncio.create_task(self._run_replay_reader())
+            else:
+                # As fast as possible, lock-step: next_frame() parses and decodes every recorded frame
+                self._replay = replay_chunks(self.source_path, realtime=False)
+                self._replay_parser = MjpegPartParser(BOUNDARY)
+            self._opened = True
+            print(f"Replaying {self.source_path} ({'real time' if self.replay_realtime else 'as fast as possible'}).")
+            return True
+
         else:  # legacy 'esp32_stream' via OpenCV (kept for compatibility)
             self.cap = cv2.VideoCapture(self.source_path)
             if not self.cap.isOpened():
@@ -55,6 +100,7 @@ class CameraManager:
                 self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # may not have effect on all backends
             except Exception:
                 pass
+            self._start_grabber()
             self._opened = True
             print("Warning: Using OpenCV on network stream can add latency. Prefer 'esp32_httpx'.")
             return True
@@ -69,57 +115,71 @@ class CameraManager:
         try:
             async with self._client.stream("GET", self.source_path, headers=headers) as resp:
                 resp.raise_for_status()
-                buf = bytearray()
+                parser = MjpegPartParser(BOUNDARY)
 
                 async for chunk in resp.aiter_bytes():
                     if self._stop:
                         break
-                    buf.extend(chunk)
-
-                    # Parse one or more complete MJPEG parts from the buffer
-                    while True:
-                        bidx = buf.find(BOUNDARY)
-                        if bidx == -1:
-                            # Keep buffer size in check while waiting for a boundary
-                            if len(buf) > 2 * len(BOUNDARY):
-                                del buf[:len(buf) - 2 * len(BOUNDARY)]
-                            break
-
-                        h_end = buf.find(HEADER_END, bidx)
-                        if h_end == -1:
-                            # Incomplete headers; wait for more data
-                            break
-
-                        headers_bytes = bytes(buf[bidx:h_end])
-                        m = re.search(br'Content-Length:\s*(\d+)', headers_bytes, re.IGNORECASE)
-                        if not m:
-                            # If no Content-Length, drop headers and resync
-                            del buf[:h_end + 4]
-                            continue
-
-                        length = int(m.group(1))
-                        start = h_end + 4  # after \r\n\r\n
-
-                        if len(buf) < start + length:
-                            # Incomplete JPEG payload; wait for more data
-                            break
-
-                        jpg = bytes(buf[start:start + length])
-                        del buf[:start + length]
-
-                        # Decode JPEG to BGR; keep only the most recent frame
-                        arr = np.frombuffer(jpg, dtype=np.uint8)
-                        frame = cv2.imdecode(arr, cv2.IMREAD_COLOR)
-                        if frame is not None:
-                            # TODO: Jose, check if this feature increases YOLO performance
-                            # frame = cv2.resize(frame, (640, 480)) # Or any other desired size
-                            self.frame_height, self.frame_width = frame.shape[:2]
-                            self._latest_frame = frame
+                    received = time.time()
+                    if self._recorder is not None:
+                        self._recorder.write(chunk, received)
+                    self._feed_stream(parser, chunk, received)
 
         except Exception as e:
             print(f"ESP32 MJPEG reader error: {e}")
         finally:
             await self._close_httpx()
+            if self._recorder is not None:
+                self._recorder.close()
+                self._recorder = None
+
+    def _feed_stream(self, parser, chunk, received):
+        parser.feed(chunk)
+        # Keep only the newest complete part; decoding is deferred to get_frame()
+        parsed_before = parser.parts_parsed
+        jpg = parser.latest_part()
+        if jpg is not None:
+            self.decode_stats.add("received", parser.parts_parsed - parsed_before)
+            self._store_jpeg(bytes(jpg), received)
+
+    async def _run_replay_reader(self):
+        # Recorded chunks at their recorded spacing, stamped with the replay time like a live stream
+        parser = MjpegPartParser(BOUNDARY)
+        try:
+            async for _, chunk in replay_chunks(self.source_path, realtime=True):
+                if self._stop:
+                    break
+                self._feed_stream(parser, chunk, time.time())
+            await asyncio.sleep(0.5)  # let the loop take the last frame
+        except Exception as e:
+            print(f"Replay reader error: {e}")
+        finally:
+            self._opened = False
+            print("Replay finished.")
+
+    async def _next_replay_frame(self):
+        """Lock-step replay: decode the next recorded part, stamped with its recorded receive time."""
+        while True:
+            jpg = self._replay_parser.next_part()
+            while jpg is None:
+                try:
+                    self._replay_received, chunk = await self._replay.__anext__()
+                except StopAsyncIteration:
+                    self._opened = False
+                    print("Replay finished.")
+                    return None
+                self._replay_parser.feed(chunk)
+                jpg = self._replay_parser.next_part()
+            self.decode_stats.add("received")
+            t0 = time.perf_counter()
+            frame = decode_jpeg(jpg, self.decode_reduction)
+            self.decode_stats.add_time("decode", time.perf_counter() - t0)
+            if frame is None:
+                self.decode_stats.add("failed")
+                continue
+            self.decode_stats.add("decoded")
+            self.frame_height, self.frame_width = frame.shape[:2]
+            return self.frame_slot.publish(frame, self._replay_received)
 
     async def _close_httpx(self):
         if self._client is not None:
@@ -129,28 +189,122 @@ class CameraManager:
                 pass
             self._client = None
 
-    def get_frame(self):
-        # Returns the newest frame available; may be None at startup
-        if self.source_type == 'webcam':
-            if self.cap and self.cap.isOpened():
-                ok, frame = self.cap.read()
-                if ok:
-                    if self.frame_width == 0 or self.frame_height == 0:
-                        self.frame_height, self.frame_width = frame.shape[:2]
-                    return frame
+    def _start_decoder(self):
+        if self.decode_workers > 0 and self._decoder is None:
+            # Decode on worker threads so the event loop never runs imdecode
+            self._decoder = FrameDecoder(self.decode_reduction, self.decode_workers,
+                                         self.decode_stats, self.frame_slot)
+            self._decoder.start()
+
+    def _store_jpeg(self, jpg, timestamp=None):
+        packet = self._jpeg_slot.publish(jpg, timestamp)
+        if self._decoder is not None:
+            self._decoder.submit(packet.seq, jpg, packet.timestamp)
+
+    def _decode_latest(self, reduction):
+        """Decode the newest JPEG at most once (per reduction factor); reuse the result until a new one arrives."""
+        seq, jpg, timestamp = self._jpeg_slot.latest()[:3]
+        if jpg is None:
             return None
+        if seq == self._decoded_seq and reduction == self._decoded_reduction:
+            return self._decoded_frame
 
-        elif self.source_type == 'esp32_httpx':
-            return self._latest_frame
+        t0 = time.perf_counter()
+        frame = decode_jpeg(jpg, reduction)
+        self.decode_stats.add_time("decode", time.perf_counter() - t0)
+        self._decoded_seq = seq
+        self._decoded_reduction = reduction
+        if frame is None:
+            # Corrupt JPEG: keep serving the previous frame
+            self.decode_stats.add("failed")
+            return self._decoded_frame
+
+        self.decode_stats.add("decoded")
+        # TODO: Jose, check if this feature increases YOLO performance
+        # frame = cv2.resize(frame, (640, 480)) # Or any other desired size
+        self.frame_height, self.frame_width = frame.shape[:2]
+        self._decoded_frame = frame
+        if self._decoder is None and reduction == self.decode_reduction:
+            # Lazy mode: decodes on the caller are the frame stream
+            self.frame_slot.publish(frame, timestamp, seq)
+        return frame
+
+    def _start_grabber(self):
+        # cap.read() blocks for a frame interval; run it on its own thread, keep only the newest frame
+        self._grabber = FrameGrabber(self.cap, self.frame_slot, self.capture_stats,
+                                     name=f"{self.source_type}-grabber")
+        self._grabber.start()
+
+    def _latest_capture(self):
+        frame = self.frame_slot.latest().frame
+        if frame is not None and (self.frame_width == 0 or self.frame_height == 0):
+            self.frame_height, self.frame_width = frame.shape[:2]
+        self.capture_stats.maybe_report()
+        return frame
+
+    async def next_frame(self, after_seq=0, timeout=None):
+        """
+        Wait for a frame newer than `after_seq` and return its FramePacket
+        (seq, frame, timestamp), or None on timeout. Use packet.seq as the next
+        `after_seq`; the gap tells how many frames were skipped.
+        """
+        if self.source_type == 'replay' and not self.replay_realtime:
+            if not self._opened:
+                return None
+            packet = await self._next_replay_frame()  # never skips a frame
+            self.decode_stats.maybe_report()
+            return packet
+
+        if self.source_type in ('esp32_httpx', 'replay'):
+            if self._decoder is not None:
+                packet = await self.frame_slot.next_frame(after_seq, timeout)
+            else:
+                packet = None
+                after_jpeg = after_seq
+                while packet is None:
+                    jpeg_packet = await self._jpeg_slot.next_frame(after_jpeg, timeout)
+                    if jpeg_packet is None:
+                        return None
+                    self._decode_latest(self.decode_reduction)
+                    latest = self.frame_slot.latest()
+                    if latest.seq > after_seq and latest.frame is not None:
+                        packet = latest
+                    after_jpeg = jpeg_packet.seq  # corrupt JPEG; wait for the next one
+            if packet is not None:
+                self.frame_height, self.frame_width = packet.frame.shape[:2]
+            self.decode_stats.maybe_report()
+            return packet
+
+        # OpenCV sources: frames come from the grabber thread
+        packet = await self.frame_slot.next_frame(after_seq, timeout)
+        if packet is not None and (self.frame_width == 0 or self.frame_height == 0):
+            self.frame_height, self.frame_width = packet.frame.shape[:2]
+        self.capture_stats.maybe_report()
+        return packet
+
+    def get_frame(self, reduction=None):
+        # Returns the newest frame available; may be None at startup.
+        # reduction (1/2/4/8) only applies to 'esp32_httpx'; defaults to config.JPEG_DECODE_REDUCTION.
+        # With decode workers, other reductions fall back to decoding on the caller.
+        if self.source_type == 'webcam':
+            return self._latest_capture()
+
+        elif self.source_type == 'replay' and not self.replay_realtime:
+            return self.frame_slot.latest().frame
+
+        elif self.source_type in ('esp32_httpx', 'replay'):
+            reduction = self.decode_reduction if reduction is None else int(reduction)
+            if self._decoder is not None and reduction == self._decoder.reduction:
+                frame = self.frame_slot.latest().frame
+                if frame is not None:
+                    self.frame_height, self.frame_width = frame.shape[:2]
+            else:
+                frame = self._decode_latest(reduction)
+            self.decode_stats.maybe_report()
+            return frame
 
         else:  # 'esp32_stream' legacy
-            if self.cap and self.cap.isOpened():
-                ok, frame = self.cap.read()
-                if ok:
-                    if self.frame_width == 0 or self.frame_height == 0:
-                        self.frame_height, self.frame_width = frame.shape[:2]
-                    return frame
-            return None
+            return self._latest_capture()
 
     def get_frame_dimensions(self):
         return self.frame_height, self.frame_width
@@ -159,19 +313,30 @@ class CameraManager:
         self._opened = False
 
         if self.source_type in ('webcam', 'esp32_stream'):
+            if self._grabber is not None:
+                self._grabber.stop()
+                print(f"Capture grabber: {self._grabber.grabbed} grabbed, "
+                      f"{self._grabber.dropped} dropped, {self._grabber.failed} failed reads.")
+                self._grabber = None
             if self.cap:
                 self.cap.release()
                 self.cap = None
                 print("Video source released.")
-        elif self.source_type == 'esp32_httpx':
+        elif self.source_type in ('esp32_httpx', 'replay'):
             self._stop = True
             task = self._stream_task
             self._stream_task = None
             if task and not task.done():
                 task.cancel()
-            print("ESP32 MJPEG httpx reader stopped.")
+            if self._decoder is not None:
+                self._decoder.stop()
+                self._decoder = None
+            self._replay = None
+            print("ESP32 MJPEG httpx reader stopped." if self.source_type == 'esp32_httpx' else "Replay stopped.")
 
     def is_opened(self):
-        if self.source_type == 'esp32_httpx':
+        if self.source_type in ('esp32_httpx', 'replay'):
             return self._opened
+        if self._grabber is not None and not self._grabber.is_alive():
+            return False  # stream ended / device lost
         return self.cap is not None and self.cap.isOpened()
@@ -0,0 +1,224 @@
+# auto_soccer_bot/command_transport.py
+# Transports used by RobotCommunicator to deliver one movement command.
+#   HttpTransport : POST /move with a JSON body (what the ESP32 firmware serves)
+#   UdpTransport  : one compact binary datagram per command, optional acks
+# Both expose: open(), send(direction, speed, turn_ratio) -> True if acknowledged,
+# ping() -> True if the robot answered, close(). Timeouts raise TransportTimeout,
+# other failures TransportError.
+import asyncio
+import struct
+import time
+import httpx
+from . import config_auto as config
+
+# --- Binary datagram format (little-endian) ---
+# header : magic b"FB", version, kind (| FLAG_ACK_REQUESTED), seq (uint32)       8 bytes
+# command: header + direction code (uint8), speed (uint8), turn_ratio (float32)  14 bytes
+# ack    : header with kind=KIND_ACK and the seq being acknowledged              8 bytes
+# ping   : header with kind=KIND_PING (answered with an ack)                     8 bytes
+MAGIC = b"FB"
+VERSION = 1
+KIND_COMMAND = 1
+KIND_ACK = 2
+KIND_PING = 3
+FLAG_ACK_REQUESTED = 0x80
+HEADER = struct.Struct("<2sBBI")
+COMMAND_BODY = struct.Struct("<BBf")
+
+DIRECTION_CODES = {"stop": 0, "forward": 1, "backward": 2, "left": 3, "right": 4, "soft_left": 5, "soft_right": 6}
+DIRECTION_NAMES = {code: name for name, code in DIRECTION_CODES.items()}
+
+
+class TransportTimeout(Exception):
+    pass
+
+
+class TransportError(Exception):
+    pass
+
+
+def encode_command(seq, direction, speed, turn_ratio, ack=False):
+    kind = KIND_COMMAND | (FLAG_ACK_REQUESTED if ack else 0)
+    return HEADER.pack(MAGIC, VERSION, kind, seq & 0xFFFFFFFF) + COMMAND_BODY.pack(
+        DIRECTION_CODES[direction], max(0, min(255, int(speed))), float(turn_ratio))
+
+
+def encode_header(kind, seq, ack=False):
+    return HEADER.pack(MAGIC, VERSION, kind | (FLAG_ACK_REQUESTED if ack else 0), seq & 0xFFFFFFFF)
+
+
+def decode_datagram(data):
+    """
+    Parse a datagram. Returns (kind, seq, ack_requested, body) where body is
+    (direction, speed, turn_ratio) for commands and None otherwise; None if malformed.
+    """
+    if len(data) < HEADER.size:
+        return None
+    magic, version, kind, seq = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        return None
+    ack_requested = bool(kind & FLAG_ACK_REQUESTED)
+    kind &= ~FLAG_ACK_REQUESTED
+    body = None
+    if kind == KIND_COMMAND:
+        if len(data) < HEADER.size + COMMAND_BODY.size:
+            return None
+        code, speed, turn_ratio = COMMAND_BODY.unpack_from(data, HEADER.size)
+        if code not in DIRECTION_NAMES:
+            return None
+        body = (DIRECTION_NAMES[code], speed, turn_ratio)
+    return kind, seq, ack_requested, body
+
+
+def seq_newer(seq, last):
+    """Serial-number comparison on uint32 (wraps around): True if seq comes after last."""
+    return 0 < ((seq - last) & 0xFFFFFFFF) < 0x80000000
+
+
+class HttpTransport:
+    name = "http"
+
+    def __init__(self, move_endpoint=None, status_endpoint=None):
+        self.move_endpoint = move_endpoint or config.ESP32_MOVE_ENDPOINT
+        self.status_endpoint = status_endpoint if status_endpoint is not None else getattr(config, "ESP32_STATUS_ENDPOINT", None)
+        self.http_client = None
+
+    async def open(self):
+        if self.http_client is None:
+            limits = httpx.Limits(max_connections=5, max_keepalive_connections=2)
+            timeout = httpx.Timeout(config.HTTP_TIMEOUT_READ, connect=config.HTTP_TIMEOUT_CONNECT)
+            self.http_client = httpx.AsyncClient(timeout=timeout, limits=limits)
+
+    async def close(self):
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+
+    async def send(self, direction, speed, turn_ratio):
+        payload = {"direction": direction, "speed": int(speed), "turn_ratio": float(turn_ratio)}
+        await self._request("POST", self.move_endpoint, json=payload)
+        return True
+
+    async def ping(self):
+        if not self.status_endpoint:
+            return False
+        await self._request("GET", self.status_endpoint)
+        return True
+
+    async def _request(self, method, url, **kwargs):
+        try:
+            response = await self.http_client.request(method, url, **kwargs)
+            response.raise_for_status()
+        except httpx.TimeoutException as e:
+            raise TransportTimeout(type(e).__name__) from e
+        except httpx.HTTPError as e:
+            raise TransportError(str(e) or type(e).__name__) from e
+
+
+class _AckProtocol(asyncio.DatagramProtocol):
+    def __init__(self, owner):
+        self.owner = owner
+
+    def datagram_received(self, data, addr):
+        self.owner._on_datagram(data)
+
+    def error_received(self, exc):
+        self.owner._on_error(exc)
+
+
+class UdpTransport:
+    """
+    One datagram per command. The first seq is taken from the clock (ms) at
+    open(), so a restarted sender still counts as newer for the receiver (latest seq wins,
+    older or duplicate datagrams are ignored). With acks, send() waits up to
+    `ack_timeout_s` for the receiver's ack of that seq; without, it returns
+    False right after sending (no RTT sample, no retry).
+    """
+    name = "udp"
+
+    def __init__(self, host=None, port=None, acks=None, ack_timeout_s=None):
+        self.host = host or config.ESP32_IP_ADDRESS
+        self.port = int(port if port is not None else getattr(config, "ESP32_COMMAND_UDP_PORT", 4210))
+        self.acks = acks if acks is not None else getattr(config, "COMMAND_UDP_ACKS", True)
+        self.ack_timeout_s = (ack_timeout_s if ack_timeout_s is not None
+                              else getattr(config, "COMMAND_UDP_ACK_TIMEOUT_MS", 150) / 1000.0)
+        self.seq = 0
+        self.bytes_sent = 0
+        self._transport = None
+        self._waiters = {}   # seq -> future resolved by its ack
+        self._error = None
+
+    async def open(self):
+        if self._transport is None:
+            self.seq = int(time.time() * 1000) & 0xFFFFFFFF
+            loop = asyncio.get_running_loop()
+            self._transport, _ = await loop.create_datagram_endpoint(
+                lambda: _AckProtocol(self), remote_addr=(self.host, self.port))
+
+    async def close(self):
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        for fut in self._waiters.values():
+            fut.cancel()
+        self._waiters.clear()
+
+    async def send(self, direction, speed, turn_ratio):
+        if direction not in DIRECTION_CODES:
+            raise TransportError(f"unknown direction '{direction}'")
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        return await self._send(encode_command(self.seq, direction, speed, turn_ratio, self.acks), self.seq)
+
+    async def ping(self):
+        if not self.acks:
+            return False  # nothing would answer
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        return await self._send(encode_header(KIND_PING, self.seq, ack=True), self.seq)
+
+    async def _send(self, packet, seq):
+        if self._transport is None:
+            raise TransportError("UDP transport not open")
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise TransportError(str(error))
+        fut = None
+        if self.acks:
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters[seq] = fut
+        self._transport.sendto(packet)
+        self.bytes_sent += len(packet)
+        if fut is None:
+            return False
+        try:
+            await asyncio.wait_for(fut, self.ack_timeout_s)
+            return True
+        except asyncio.TimeoutError:
+            raise TransportTimeout(f"no ack for seq {seq}") from None
+        finally:
+            self._waiters.pop(seq, None)
+
+    def _on_datagram(self, data):
+        parsed = decode_datagram(data)
+        if parsed is None or parsed[0] != KIND_ACK:
+            return
+        fut = self._waiters.get(parsed[1])
+        if fut is not None and not fut.done():
+            fut.set_result(True)
+
+    def _on_error(self, exc):
+        # e.g. ICMP port unreachable: fail the waiting send instead of letting it time out
+        waiting = [fut for fut in self._waiters.values() if not fut.done()]
+        for fut in waiting:
+            fut.set_exception(TransportError(str(exc)))
+        if not waiting:
+            self._error = exc  # reported by the next send
+
+
+def make_transport(kind=None):
+    """Transport selected by COMMAND_TRANSPORT ('http' or 'udp')."""
+    kind = kind or getattr(config, "COMMAND_TRANSPORT", "http")
+    if kind == "udp":
+        return UdpTransport()
+    if kind == "http":
+        return HttpTransport()
+    raise ValueError(f"Unknown COMMAND_TRANSPORT '{kind}' (expected 'http' or 'udp')")
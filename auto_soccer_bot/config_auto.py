@@ -1,18 +1,44 @@
 # auto_soccer_bot/config_auto.py
 
 # --- Video Source ---
-# Set to 'webcam' or 'esp32_httpx'
-VIDEO_SOURCE = 'esp32_httpx' # 'webcam' or 'esp32_httpx'
+# Set to 'webcam', 'esp32_httpx' or 'replay' (a stream recorded with STREAM_RECORD_PATH)
+VIDEO_SOURCE = 'esp32_httpx' # 'webcam', 'esp32_httpx' or 'replay'
 WEBCAM_INDEX = 0
+STREAM_RECORD_PATH = ""      # Tee the raw esp32_httpx stream to this file (+ <path>.ts receive timestamps); "" = off
+REPLAY_PATH = "recordings/stream.mjpeg"  # Recording played by VIDEO_SOURCE = 'replay'
+REPLAY_REALTIME = True       # True: recorded pacing (frames may be skipped, like live); False: every frame, as fast as possible
 
 # --- ESP32 Communication Settings
 ESP32_IP_ADDRESS = "192.168.1.9"
 ESP32_CONTROL_PORT = 80
 ESP32_STREAM_URL = f"http://{ESP32_IP_ADDRESS}:81/stream"
 ESP32_MOVE_ENDPOINT = f"http://{ESP32_IP_ADDRESS}:{ESP32_CONTROL_PORT}/move"
+ESP32_STATUS_ENDPOINT = f"http://{ESP32_IP_ADDRESS}:{ESP32_CONTROL_PORT}/status" # connection pre-warm / keep-alive
 HTTP_TIMEOUT_CONNECT = 2.0
 HTTP_TIMEOUT_READ = 1.0
 
+# --- Stream Decoding ---
+JPEG_DECODE_REDUCTION = 1    # 1 = full size; 2/4/8 = DCT-domain reduced decode (IMREAD_REDUCED_COLOR_N)
+DECODE_WORKERS = 1           # JPEG decode threads (latest-only slot); 0 = decode lazily inside get_frame()
+LOOP_LAG_MONITOR = True      # Measure/print asyncio event-loop lag (blocking work shows up here)
+STATS_PRINT_INTERVAL_S = 5.0 # Print decode/loop statistics every N seconds (0 disables)
+
+# --- Multi-process Mode ---
+MULTIPROCESS = False         # Camera/decode and detection in separate processes (shared-memory frame ring)
+MP_DETECTOR_PROCESSES = 1    # Detector processes (each loads its own YOLO model and keeps its own tracker/scheduler/imgsz state)
+MP_RING_SLOTS = 0            # Frame slots in the ring (0 = 2 * detectors + 2)
+
+# --- Headless Mode ---
+HEADLESS = False             # No drawing, no OpenCV window; quit with Ctrl+C / SIGTERM
+DEBUG_STREAM_PORT = 0        # Annotated MJPEG at http://<host>:<port>/ while a client is connected (0 = off)
+DEBUG_STREAM_HOST = "0.0.0.0"
+DEBUG_STREAM_FPS = 5         # Max frames drawn/encoded per second for the debug stream
+DEBUG_STREAM_QUALITY = 70    # JPEG quality of the debug stream
+
+# --- Latency Instrumentation ---
+LATENCY_TRACE = True         # Per-stage timestamps per frame (receipt -> decode -> detect -> decide -> send -> ack), p50/p95/p99 printed
+LATENCY_CSV = ""             # CSV of every frame (frame_stamp_s, cmd_stamp_s, latency_ms like the simulation's 01_loop_latency.csv, then per stage); "" = off
+
 # --- Ball Detection Settings (Tennis Ball - Yellow/Green) ---
 LOWER_BALL_COLOR = (29, 100, 100) # Lower HSV for tennis ball yellow/green
 UPPER_BALL_COLOR = (49, 255, 255) # Upper HSV for tennis ball yellow/green
@@ -38,6 +64,16 @@ MAX_SPEED = 255
 # --- Command Sending ---
 COMMAND_SEND_INTERVAL_MS = 200
 MIN_TIME_BETWEEN_ANY_COMMAND_MS = 100
+COMMAND_ADAPTIVE_PACING = True   # Derive both intervals from the measured RTT (the values above apply until the first ack)
+COMMAND_RTT_FACTOR = 1.5         # Gap between requests = max(factor * RTT EWMA, RTT p95)
+COMMAND_MIN_INTERVAL_MS = 40     # Adaptive gap floor
+COMMAND_MAX_INTERVAL_MS = 1000   # Adaptive gap ceiling (reached through timeout backoff)
+COMMAND_KEEPALIVE_S = 2.0        # Ping (GET ESP32_STATUS_ENDPOINT over HTTP) after this long without a request (0 = off)
+COMMAND_MAX_PENDING_TOKENS = 64  # Latency-trace frames waiting for a command (link down: the oldest are kept, newer ones go untimed)
+COMMAND_TRANSPORT = "http"       # 'http' (POST /move, JSON) or 'udp' (binary datagrams, see command_transport.py)
+ESP32_COMMAND_UDP_PORT = 4210    # UDP command port on the robot ('udp' transport)
+COMMAND_UDP_ACKS = True          # Ask for an ack per datagram (RTT samples, retries); False = fire-and-forget
+COMMAND_UDP_ACK_TIMEOUT_MS = 150 # A datagram without an ack after this long counts as a timeout
 
 # --- State Machine & Control Logic ---
 BALL_CAPTURED_AREA_THRESHOLD = 15000
@@ -53,7 +89,51 @@ DRIBBLE_TURN_RATIO = 0.5   # Wider turn ratio when dribbling
 # --- Frame Processing ---
 SATURATION = 3.5  # Increase saturation for better color detection
 BRIGHTNESS = 1  # Increase brightness for better visibility
-DETECTION_INTERVAL = 6 # Process every N-th frame for detection
+YOLO_INPUT_WIDTH = 0   # Resize the YOLO input to this width (0 = full frame); boxes are mapped back
+YOLO_ASYNC = True      # Run YOLO on a worker thread; color detection keeps the loop at camera rate
+
+# --- Adaptive YOLO Input Size (full-frame passes) ---
+YOLO_ADAPTIVE_IMGSZ = True
+YOLO_IMGSZ_LADDER = (256, 320, 416, 640)
+YOLO_IMGSZ_INITIAL = 320
+YOLO_LATENCY_BUDGET_MS = 150     # step down when inference is slower than this
+YOLO_IMGSZ_SMALL_BALL_PX = 16    # ball diameter at model input below this -> more pixels
+YOLO_IMGSZ_LARGE_BALL_PX = 64    # ball diameter at model input above this -> fewer pixels
+YOLO_IMGSZ_HYSTERESIS = 0.15     # +-15% band around the budget
+YOLO_IMGSZ_MIN_DWELL = 5         # inferences at a size before switching again
+YOLO_IMGSZ_LOG = ""              # CSV path logging size/latency/ball size per inference ("" = off; multi-process: <name>.detector<N>.csv)
+
+# --- YOLO Cascade (color proposals -> YOLO on crops) ---
+YOLO_CASCADE = False               # Verify color blobs with YOLO on padded crops instead of the full frame
+CASCADE_MAX_PROPOSALS = 3          # Largest color blobs verified per YOLO pass
+CASCADE_IMGSZ = 224                # YOLO input size for crops (160-256)
+CASCADE_PAD = 2.5                  # Crop side = CASCADE_PAD * blob diameter
+CASCADE_MIN_CROP = 96              # Minimum crop side (px)
+CASCADE_FULL_FRAME_PERIOD_MS = 2000 # Full-frame YOLO at least this often (and whenever there are no proposals)
+
+# --- Detection Scheduling (color runs every frame) ---
+YOLO_PERIOD_MS = 250   # Target time between YOLO runs when the controller state has no entry below
+YOLO_PERIOD_MS_BY_STATE = {
+    "SEARCHING_FOR_BALL": 500,  # robot spinning, color detection is enough to notice the ball
+    "BALL_DETECTED": 100,       # confirm the sighting quickly
+    "APPROACHING_BALL": 200,
+    "CAPTURED_BALL": 400,
+}
+YOLO_TIME_BUDGET = 0.5 # Max fraction of wall time spent in YOLO (stretches the period on slow CPUs)
+
+# --- Motion Gate (skip detection while stopped in a static scene) ---
+MOTION_GATE = True
+MOTION_GATE_WIDTH = 80          # width of the grayscale image compared between frames
+MOTION_GATE_THRESHOLD = 2.0     # mean absolute difference (0-255) below which the scene counts as static
+MOTION_GATE_MAX_AGE_MS = 1000   # force a detection run at least this often
+
+# --- Ball Tracker (alpha-beta filter between detections) ---
+TRACKER_ALPHA = 0.6               # position gain per measurement
+TRACKER_BETA = 0.2                # velocity gain per measurement
+TRACKER_MAX_COAST_MS = 500        # drop the track after this long without a measurement
+TRACKER_GATE_PX = 120             # color measurements farther than this from the prediction are ignored
+TRACKER_MEAS_SIGMA_PX = 5.0       # reported uncertainty right after a measurement
+TRACKER_COAST_SIGMA_PX_PER_S = 200.0  # uncertainty growth while coasting
 
 # New state parameters
 BALL_CONFIRMATION_THRESHOLD = 10           # how many consecutive detections before committing to approach
@@ -0,0 +1,56 @@
+# auto_soccer_bot/detection_output.py
+# Drawing and controller input for BallDetector-style detection dicts ('yolo' / 'color' / 'track').
+# Torch-free, so processes that only consume detections (multi-process main) need no model.
+import cv2
+from .frame_context import FrameContext
+
+
+def draw_detection(frame, detection_result):
+    """Lightweight overlay for whichever detector produced the result."""
+    if isinstance(frame, FrameContext):
+        frame = frame.display
+    if frame is None or not detection_result:
+        return frame
+
+    t = detection_result.get("type", "yolo")
+    if t == "yolo":
+        x, y, w, h = detection_result["bbox"]
+        label = f'{detection_result.get("class_name","ball")} {detection_result.get("confidence",0):.2f}'
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        cv2.putText(frame, label, (x, max(0, y - 10)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+    else:
+        # color / track
+        cx, cy = detection_result.get("center", (None, None))
+        radius = detection_result.get("radius", 0)
+        if cx is not None:
+            label = "color" if t == "color" else f'track ({detection_result.get("class_name")})'
+            cv2.circle(frame, (cx, cy), max(2, radius), (0, 255, 0), 2)
+            cv2.circle(frame, (cx, cy), 4, (0, 0, 255), -1)
+            if t == "track":
+                # Uncertainty ring grows while the track coasts
+                cv2.circle(frame, (cx, cy), max(2, radius + int(detection_result.get("uncertainty", 0))),
+                           (0, 255, 255), 1)
+            cv2.putText(frame, label, (cx - radius, max(0, cy - radius - 10)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+    return frame
+
+
+def detection_data(detection_result):
+    """
+    Return (center_x, center_y, area) for controller consumption.
+    Works for 'yolo', 'color' and 'track' detections.
+    """
+    if not detection_result:
+        return None
+
+    if detection_result.get("type") in ("color", "track"):
+        cx, cy = detection_result["center"]
+        area = detection_result["area"]
+        return (int(cx), int(cy), float(area))
+    else:
+        x, y, w, h = detection_result["bbox"]
+        cx = x + w // 2
+        cy = y + h // 2
+        area = detection_result["area"]
+        return (int(cx), int(cy), float(area))
@@ -0,0 +1,63 @@
+# auto_soccer_bot/detection_scheduler.py
+import time
+from . import config_auto as config
+from .perf_stats import RateStats
+
+
+class DetectionScheduler:
+    """
+    Single owner of detector invocations. Color detection runs on every
+    frame; YOLO runs when its period has elapsed. The period is the target
+    for the controller state, stretched so YOLO never uses more than
+    `budget` of wall time (period >= inference_ewma / budget), and YOLO is
+    never started while a previous inference is still running.
+    Reports the effective rate of each detector.
+    """
+
+    def __init__(self, periods_ms=None, default_period_ms=None, budget=None, stats=None):
+        # Target time between YOLO runs per controller state (config.YOLO_PERIOD_MS_BY_STATE)
+        self.periods_ms = dict(periods_ms if periods_ms is not None else getattr(config, "YOLO_PERIOD_MS_BY_STATE", {}))
+        self.default_period_ms = float(default_period_ms if default_period_ms is not None
+                                       else getattr(config, "YOLO_PERIOD_MS", 250))
+        self.budget = min(1.0, max(0.01, float(budget if budget is not None else getattr(config, "YOLO_TIME_BUDGET", 0.5))))
+        self.stats = stats if stats is not None else RateStats("detect")
+
+        self.inference_ewma_s = None
+        self.alpha = 0.2
+        self.last_yolo_start = 0.0
+        self.state = None
+
+    def period_s(self, state=None):
+        """Current YOLO period in seconds for `state` (None = default)."""
+        target = self.periods_ms.get(state, self.default_period_ms) / 1000.0
+        if self.inference_ewma_s is not None:
+            target = max(target, self.inference_ewma_s / self.budget)
+        return target
+
+    def run_yolo(self, state=None, busy=False, now=None):
+        """True if YOLO should run on this frame (and marks it as started)."""
+        now = time.perf_counter() if now is None else now
+        self.state = state
+        if busy or now - self.last_yolo_start < self.period_s(state):
+            return False
+        self.last_yolo_start = now
+        self.stats.add("yolo")
+        return True
+
+    def color_ran(self):
+        self.stats.add("color")
+
+    def record_inference(self, seconds):
+        """Feed a measured YOLO inference time (sync or from the worker)."""
+        if self.inference_ewma_s is None:
+            self.inference_ewma_s = seconds
+        else:
+            self.inference_ewma_s += self.alpha * (seconds - self.inference_ewma_s)
+
+    def maybe_report(self):
+        snap = self.stats.maybe_report()
+        if snap is not None:
+            ewma = 0.0 if self.inference_ewma_s is None else self.inference_ewma_s * 1000.0
+            print(f"[detect] yolo period {self.period_s(self.state) * 1000.0:.0f}ms "
+                  f"(state {self.state}, inference ewma {ewma:.0f}ms, budget {self.budget:.0%})")
+        return snap
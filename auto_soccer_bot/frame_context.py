@@ -0,0 +1,93 @@
+# auto_soccer_bot/frame_context.py
+import time
+import cv2
+from .preprocessing import ColorPreprocessor
+
+
+class FrameContext:
+    """
+    One raw frame plus the representations derived from it, each computed
+    lazily and at most once: HSV, detector HSV, enhanced BGR, resized detector
+    input, downsampled grayscale motion image and the display copy.
+    BallDetector, RobotController and the display all read from the same
+    context, so no stage repeats a conversion another stage already did.
+
+    Derived images may live in the preprocessor's reused buffers: a context is
+    only valid until the next frame's context is built. Take `display` last;
+    it may be drawn into the enhanced buffer in place.
+    """
+
+    def __init__(self, raw, preprocessor=None, seq=0, timestamp=None):
+        self.raw = raw
+        self.seq = seq
+        self.timestamp = timestamp
+        self.timing = None  # per-stage timestamps when latency tracing is on (see latency_trace.py)
+        self.height, self.width = raw.shape[:2]
+        # Without a preprocessor: no enhancement, detector gains only (same as BallDetector on a BGR frame)
+        self.preprocessor = preprocessor if preprocessor is not None else ColorPreprocessor(enhance=False)
+
+        self._hsv = None
+        self._detection_hsv = None
+        self._enhanced = None
+        self._display = None
+        self._resized = {}
+        self._motion = {}
+
+    @property
+    def hsv(self):
+        if self._hsv is None:
+            self._hsv = self.preprocessor.to_hsv(self.raw)
+        return self._hsv
+
+    @property
+    def detection_hsv(self):
+        """HSV with enhancement + detector S/V gains, ready for cv2.inRange."""
+        if self._detection_hsv is None:
+            self._detection_hsv = self.preprocessor.detection_hsv(self.hsv)
+        return self._detection_hsv
+
+    @property
+    def enhanced(self):
+        """Colour-enhanced BGR (the raw frame when enhancement is off)."""
+        if self._enhanced is None:
+            if self.preprocessor.enhance:
+                self._enhanced = self.preprocessor.enhanced_bgr(self.raw, self.hsv)
+            else:
+                self._enhanced = self.raw  # no HSV needed at all
+        return self._enhanced
+
+    @property
+    def display(self):
+        """Frame to draw overlays on. Copies only when it would otherwise draw on the raw frame."""
+        if self._display is None:
+            enhanced = self.enhanced
+            self._display = enhanced.copy() if enhanced is self.raw else enhanced
+        return self._display
+
+    def detector_input(self, width):
+        """
+        Enhanced frame resized to `width` (aspect kept); returns (image, scale)
+        where scale maps detector coordinates back to frame coordinates.
+        """
+        width = int(width or 0)
+        if width <= 0 or width >= self.width:
+            return self.enhanced, 1.0
+        if width not in self._resized:
+            height = max(1, int(round(self.height * width / float(self.width))))
+            image = cv2.resize(self.enhanced, (width, height), interpolation=cv2.INTER_AREA)
+            self._resized[width] = (image, self.width / float(width))
+        return self._resized[width]
+
+    def motion_image(self, width=160):
+        """Small grayscale image for frame differencing (from the raw frame)."""
+        width = max(1, min(int(width), self.width))
+        if width not in self._motion:
+            height = max(1, int(round(self.height * width / float(self.width))))
+            small = cv2.resize(self.raw, (width, height), interpolation=cv2.INTER_AREA)
+            self._motion[width] = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return self._motion[width]
+
+    def mark(self, stage, t=None):
+        """Record when `stage` finished for this frame (no-op unless latency tracing is on)."""
+        if self.timing is not None:
+            self.timing[stage] = time.time() if t is None else t
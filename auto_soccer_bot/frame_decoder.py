@@ -0,0 +1,87 @@
+# auto_soccer_bot/frame_decoder.py
+import threading
+import time
+import numpy as np
+import cv2
+from .frame_slot import FrameSlot
+from .perf_stats import RateStats
+
+# imdecode flags per reduction factor; 2/4/8 decode in the DCT domain (cheaper than decode + resize)
+DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def decode_jpeg(jpg, reduction=1):
+    """Decode a JPEG buffer (bytes/memoryview) to BGR; None if corrupt."""
+    return cv2.imdecode(np.frombuffer(jpg, dtype=np.uint8), DECODE_FLAGS.get(reduction, cv2.IMREAD_COLOR))
+
+
+class FrameDecoder:
+    """
+    JPEG decode stage running on worker threads, fed through a latest-only slot.
+    submit() never blocks: a JPEG still waiting in the slot is overwritten (and
+    counted as dropped). Decoded frames are published to `frame_slot` under the
+    JPEG's seq/timestamp; FrameSlot ignores late results from a slower worker,
+    so the consumer always sees the freshest decoded frame.
+    cv2.imdecode releases the GIL, so decoding overlaps with the asyncio loop.
+    """
+
+    def __init__(self, reduction=1, workers=1, stats=None, frame_slot=None):
+        self.reduction = int(reduction)
+        self.workers = max(1, int(workers))
+        self.stats = stats if stats is not None else RateStats("decode")
+        self.frame_slot = frame_slot if frame_slot is not None else FrameSlot()
+
+        self._cond = threading.Condition()
+        self._pending = None      # (seq, jpg, timestamp) waiting for a worker
+        self._threads = []
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"jpeg-decode-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=1.0)
+        self._threads = []
+
+    def submit(self, seq, jpg, timestamp):
+        """Offer a new JPEG; replaces any JPEG not yet picked up by a worker."""
+        with self._cond:
+            if self._pending is not None:
+                self.stats.add("dropped")
+            self._pending = (seq, jpg, timestamp)
+            self._cond.notify()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while self._running and self._pending is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                seq, jpg, timestamp = self._pending
+                self._pending = None
+
+            t0 = time.perf_counter()
+            frame = decode_jpeg(jpg, self.reduction)
+            self.stats.add_time("decode", time.perf_counter() - t0)
+            if frame is None:
+                self.stats.add("failed")
+                continue
+
+            self.stats.add("decoded")
+            self.frame_slot.publish(frame, timestamp, seq)
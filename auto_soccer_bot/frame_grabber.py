@@ -0,0 +1,71 @@
+# auto_soccer_bot/frame_grabber.py
+import threading
+import time
+from .frame_slot import FrameSlot
+
+
+class FrameGrabber:
+    """
+    Reads an OpenCV VideoCapture on a dedicated thread and publishes every
+    frame to a latest-only FrameSlot. cap.read() blocks for a whole frame
+    interval; doing it here keeps it off the asyncio loop and keeps the
+    backend's internal buffer drained, so consumers always get the newest
+    frame. Counters: grabbed, failed reads, dropped (never read by a consumer).
+    """
+
+    def __init__(self, cap, frame_slot=None, stats=None, name="frame-grabber", max_failed_reads=100):
+        self.cap = cap
+        self.frame_slot = frame_slot if frame_slot is not None else FrameSlot()
+        self.stats = stats
+        self.name = name
+        self.max_failed_reads = int(max_failed_reads)
+        self.grabbed = 0
+        self.failed = 0
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # Must be called before cap.release(): the thread may be inside cap.read()
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def dropped(self):
+        return self.frame_slot.dropped
+
+    def _run(self):
+        failed_in_row = 0
+        while self._running:
+            ok, frame = self.cap.read()
+            if not ok or frame is None:
+                self.failed += 1
+                failed_in_row += 1
+                if self.stats is not None:
+                    self.stats.add("failed")
+                if failed_in_row >= self.max_failed_reads:
+                    print(f"{self.name}: {failed_in_row} failed reads in a row, stopping.")
+                    break
+                time.sleep(0.01)
+                continue
+
+            failed_in_row = 0
+            self.grabbed += 1
+            dropped_before = self.frame_slot.dropped
+            self.frame_slot.publish(frame, time.time())
+            if self.stats is not None:
+                self.stats.add("grabbed")
+                if self.frame_slot.dropped > dropped_before:
+                    self.stats.add("dropped")
+        self._running = False
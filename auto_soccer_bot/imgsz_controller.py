@@ -0,0 +1,106 @@
+# auto_soccer_bot/imgsz_controller.py
+import csv
+import time
+from . import config_auto as config
+
+
+class ImgszController:
+    """
+    Picks the full-frame YOLO input size from a ladder (e.g. 256/320/416/640).
+      - Measured inference latency at the current size above the budget -> step down.
+      - Apparent ball diameter at the current size (frame diameter * imgsz /
+        long side) below `small_px` -> step up, if the larger size is expected
+        to fit the budget; above `large_px` -> step down (a close ball needs
+        fewer pixels). No ball -> prefer the largest size that fits (far balls).
+    Hysteresis: the budget gets a +-`hysteresis` band and a size is kept for
+    at least `min_dwell` inferences. Latency per size is an EWMA; unseen sizes
+    are estimated from the current one scaled by pixel count.
+    Every inference can be logged to a CSV (time, seq, imgsz, latency, ball size, decision).
+    """
+
+    def __init__(self, ladder=None, budget_ms=None, small_px=None, large_px=None,
+                 hysteresis=None, min_dwell=None, log_path=None):
+        ladder = ladder if ladder is not None else getattr(config, "YOLO_IMGSZ_LADDER", (256, 320, 416, 640))
+        self.ladder = sorted(int(s) for s in ladder)
+        self.budget_ms = float(budget_ms if budget_ms is not None else getattr(config, "YOLO_LATENCY_BUDGET_MS", 150))
+        self.small_px = float(small_px if small_px is not None else getattr(config, "YOLO_IMGSZ_SMALL_BALL_PX", 16))
+        self.large_px = float(large_px if large_px is not None else getattr(config, "YOLO_IMGSZ_LARGE_BALL_PX", 64))
+        self.hysteresis = float(hysteresis if hysteresis is not None else getattr(config, "YOLO_IMGSZ_HYSTERESIS", 0.15))
+        self.min_dwell = int(min_dwell if min_dwell is not None else getattr(config, "YOLO_IMGSZ_MIN_DWELL", 5))
+        initial = int(getattr(config, "YOLO_IMGSZ_INITIAL", 320))
+        self.index = min(range(len(self.ladder)), key=lambda i: abs(self.ladder[i] - initial))
+
+        self.latency_ms = {}  # imgsz -> EWMA of measured inference time
+        self.alpha = 0.3
+        self.dwell = 0
+        self.switches = 0
+
+        log_path = log_path if log_path is not None else getattr(config, "YOLO_IMGSZ_LOG", "")
+        self._log_file = None
+        self._log = None
+        if log_path:
+            self._log_file = open(log_path, "w", newline="")
+            self._log = csv.writer(self._log_file)
+            self._log.writerow(["time_s", "seq", "imgsz", "inference_ms", "ball_px", "next_imgsz", "decision"])
+
+    @property
+    def imgsz(self):
+        return self.ladder[self.index]
+
+    def _expected_ms(self, index):
+        size = self.ladder[index]
+        if size in self.latency_ms:
+            return self.latency_ms[size]
+        current = self.latency_ms.get(self.imgsz)
+        if current is None:
+            return None
+        return current * (size / float(self.imgsz)) ** 2  # cost ~ pixel count
+
+    def update(self, imgsz, inference_s, ball_diameter_px=None, frame_long_side=None, seq=None):
+        """
+        Feed one full-frame inference (size used, time, ball diameter in frame
+        pixels or None). Returns the size to use next.
+        """
+        ms = inference_s * 1000.0
+        prev = self.latency_ms.get(imgsz)
+        self.latency_ms[imgsz] = ms if prev is None else prev + self.alpha * (ms - prev)
+        self.dwell += 1
+
+        ball_px = None
+        if ball_diameter_px is not None and frame_long_side:
+            ball_px = ball_diameter_px * self.imgsz / float(frame_long_side)
+
+        decision = "hold"
+        if imgsz == self.imgsz and self.dwell >= self.min_dwell:
+            current_ms = self.latency_ms[self.imgsz]
+            up = self.index + 1 if self.index + 1 < len(self.ladder) else None
+            up_ms = self._expected_ms(up) if up is not None else None
+            up_fits = up_ms is not None and up_ms < self.budget_ms * (1.0 - self.hysteresis)
+
+            if current_ms > self.budget_ms * (1.0 + self.hysteresis) and self.index > 0:
+                decision, new_index = "down_latency", self.index - 1
+            elif ball_px is not None and ball_px > self.large_px and self.index > 0:
+                decision, new_index = "down_large_ball", self.index - 1
+            elif ball_px is not None and ball_px < self.small_px and up_fits:
+                decision, new_index = "up_small_ball", up
+            elif ball_px is None and up_fits:
+                decision, new_index = "up_no_ball", up
+            else:
+                new_index = self.index
+            if new_index != self.index:
+                print(f"[imgsz] {self.imgsz} -> {self.ladder[new_index]} ({decision}, "
+                      f"{current_ms:.0f}ms, ball {'-' if ball_px is None else f'{ball_px:.0f}px'})")
+                self.index = new_index
+                self.dwell = 0
+                self.switches += 1
+
+        if self._log is not None:
+            self._log.writerow([f"{time.time():.6f}", seq, imgsz, f"{ms:.2f}",
+                                "" if ball_px is None else f"{ball_px:.1f}", self.imgsz, decision])
+        return self.imgsz
+
+    def close(self):
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+            self._log = None
@@ -0,0 +1,95 @@
+# auto_soccer_bot/inference_worker.py
+import threading
+import time
+from collections import namedtuple
+from .perf_stats import RateStats
+
+# seq: camera seq of the frame the result was computed on; frame_idx: detector frame counter at submit;
+# timestamp: capture time of that frame; inference_s: time spent in the model; job: the submitted job;
+# finished: when the inference completed (time.time())
+InferenceResult = namedtuple("InferenceResult", ["seq", "frame_idx", "detection", "timestamp", "inference_s", "job",
+                                                 "finished"], defaults=(0.0,))
+
+
+class InferenceWorker:
+    """
+    Runs a slow detector (YOLO) on a dedicated thread, fed through a
+    latest-only input slot. submit() never blocks: an input still waiting for
+    the worker is replaced by the newer one (counted as dropped). Results are
+    tagged with the seq/timestamp of the frame they were computed on and kept
+    in a latest-only output slot; take_result() returns each result once.
+    PyTorch releases the GIL during inference, so the asyncio loop keeps
+    running at camera rate meanwhile.
+    """
+
+    def __init__(self, run_fn, stats=None, name="yolo-worker"):
+        self.run_fn = run_fn  # run_fn(*job) -> detection dict or None
+        self.stats = stats if stats is not None else RateStats("yolo")
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._pending = None   # (seq, frame_idx, job, timestamp)
+        self._result = None    # newest InferenceResult not yet taken
+        self._busy = False
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)  # may be inside a model call
+            self._thread = None
+
+    def idle(self):
+        """True if nothing is running or queued (a submit would start right away)."""
+        with self._cond:
+            return not self._busy and self._pending is None
+
+    def submit(self, seq, frame_idx, job, timestamp=None):
+        """Offer a job (tuple of run_fn arguments). Its images must not be modified afterwards (copy reused buffers)."""
+        with self._cond:
+            if self._pending is not None:
+                self.stats.add("dropped")
+            self._pending = (seq, frame_idx, job, time.time() if timestamp is None else timestamp)
+            self.stats.add("submitted")
+            self._cond.notify()
+
+    def take_result(self):
+        """Return the newest result not yet taken, or None."""
+        with self._cond:
+            result, self._result = self._result, None
+            return result
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and self._pending is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                seq, frame_idx, job, timestamp = self._pending
+                self._pending = None
+                self._busy = True
+
+            t0 = time.perf_counter()
+            try:
+                detection = self.run_fn(*job)
+            except Exception as e:
+                print(f"{self.name}: inference error: {e}")
+                detection = None
+            elapsed = time.perf_counter() - t0
+            self.stats.add_time("inference", elapsed)
+            self.stats.add("results")
+
+            with self._cond:
+                self._result = InferenceResult(seq, frame_idx, detection, timestamp, elapsed, job, time.time())
+                self._busy = False
@@ -0,0 +1,116 @@
+# auto_soccer_bot/latency_trace.py
+import csv
+import time
+from . import config_auto as config
+from .perf_stats import LatencyWindow
+
+# Stage timestamps (time.time()) carried by every frame, in pipeline order:
+#   received     - JPEG/frame received from the network (FramePacket.timestamp)
+#   decoded      - decoded frame published (FramePacket.published)
+#   preprocessed - detector HSV ready
+#   color        - color detection done
+#   yolo         - YOLO done on this frame (inline, or the async result for this seq)
+#   decided      - controller decision made
+#   sent         - first command transmitted after the decision (it carries this decision or a newer one)
+#   acked        - that command acknowledged by the robot
+STAGES = ("decoded", "preprocessed", "color", "yolo", "decided", "sent", "acked")
+
+# First three columns as in the simulation's metrics/csv/01_loop_latency.csv
+# (frame stamp -> first subsequent command), so 12_plot_metric_figures.py tooling can read both.
+CSV_COLUMNS = ["frame_stamp_s", "cmd_stamp_s", "latency_ms", "seq", "gated"] + [f"{s}_ms" for s in STAGES]
+
+
+class LatencyTracer:
+    """
+    Per-frame stage timestamps, from network receipt to command ack.
+    begin() attaches a timing dict to the FrameContext; the stages fill it in
+    with ctx.mark() (the loop, BallDetector) or through yolo_done() and
+    delivered() (async YOLO results, RobotCommunicator). A frame
+    is complete once its command was sent/acked and, if YOLO was submitted
+    for it asynchronously, the result came back (or was superseded).
+    Complete frames feed rolling p50/p95/p99 windows (ms since receipt, per
+    stage), printed every STATS_PRINT_INTERVAL_S, and one CSV row each
+    (LATENCY_CSV).
+    """
+
+    def __init__(self, csv_path=None, report_interval_s=None, max_open=500):
+        self.report_interval_s = float(report_interval_s if report_interval_s is not None
+                                       else getattr(config, "STATS_PRINT_INTERVAL_S", 5.0))
+        self.windows = {stage: LatencyWindow(stage) for stage in STAGES}
+        self.max_open = max_open
+        self._open = {}            # seq -> timing, not complete yet
+        self._last_report = time.perf_counter()
+        self.completed = 0
+
+        csv_path = csv_path if csv_path is not None else getattr(config, "LATENCY_CSV", "")
+        self._csv_file = None
+        self._csv = None
+        if csv_path:
+            self._csv_file = open(csv_path, "w", newline="")
+            self._csv = csv.writer(self._csv_file)
+            self._csv.writerow(CSV_COLUMNS)
+
+    def begin(self, ctx, packet):
+        """Start the timing of a frame (stores it as ctx.timing)."""
+        timing = {"seq": packet.seq, "received": packet.timestamp, "decoded": getattr(packet, "published", None)}
+        ctx.timing = timing
+        self._open[packet.seq] = timing
+        if len(self._open) > self.max_open:
+            # Never delivered (e.g. the robot is unreachable): finish the oldest as they are
+            self._complete(self._open[min(self._open)])
+        return timing
+
+    def yolo_done(self, seq, t):
+        """An async YOLO result for frame `seq` finished at `t`; older pending submissions were superseded."""
+        for timing in [tm for s, tm in self._open.items() if s <= seq and tm.get("yolo_pending")]:
+            timing["yolo_pending"] = False
+            if timing["seq"] == seq:
+                timing["yolo"] = t
+            if "sent" in timing:
+                self._complete(timing)
+
+    def delivered(self, timings, sent, acked):
+        """RobotCommunicator: the command carrying these frames' decisions went out at `sent` (acked at `acked` or None)."""
+        for timing in timings:
+            timing["sent"] = sent
+            if acked is not None:
+                timing["acked"] = acked
+            if not timing.get("yolo_pending") and timing["seq"] in self._open:
+                self._complete(timing)
+
+    def _complete(self, timing):
+        self._open.pop(timing["seq"], None)
+        received = timing["received"]
+        row_ms = {}
+        for stage in STAGES:
+            t = timing.get(stage)
+            if t is not None:
+                row_ms[stage] = (t - received) * 1000.0
+                self.windows[stage].add(row_ms[stage])
+        self.completed += 1
+        if self._csv is not None:
+            sent = timing.get("sent")
+            self._csv.writerow(
+                [f"{received:.6f}", "" if sent is None else f"{sent:.6f}",
+                 "" if sent is None else f"{row_ms['sent']:.3f}", timing["seq"], int(bool(timing.get("gated")))]
+                + ["" if stage not in row_ms else f"{row_ms[stage]:.3f}" for stage in STAGES])
+
+    def maybe_report(self):
+        if self.report_interval_s <= 0 or time.perf_counter() - self._last_report < self.report_interval_s:
+            return False
+        self._last_report = time.perf_counter()
+        print(f"[latency] ms since receipt, {self.completed} frames:")
+        for stage in STAGES:
+            window = self.windows[stage]
+            if window.samples:
+                print(f"  {window.summary()}")
+                window.max_seen = 0.0
+        return True
+
+    def close(self):
+        for timing in list(self._open.values()):
+            self._complete(timing)
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+            self._csv = None
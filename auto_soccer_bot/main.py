@@ -5,9 +5,14 @@
 # 3. python -m auto_soccer_bot.main
 
 import asyncio
-from .application import start_auto_application # Import the new entry point
+from . import config_auto as config
 
 if __name__ == "__main__":
+    if getattr(config, "MULTIPROCESS", False):
+        # Camera and detector in separate processes, frames shared through shared memory
+        from .multiprocess_app import start_multiprocess_application as start_auto_application
+    else:
+        from .application import start_auto_application # Import the new entry point
     try:
         asyncio.run(start_auto_application())
     except KeyboardInterrupt:
@@ -0,0 +1,209 @@
+# auto_soccer_bot/mjpeg_parser.py
+# Boundary used by the ESP32 MJPEG server (matches firmware PART_BOUNDARY)
+BOUNDARY = b"--123456789000000000000987654321"
+HEADER_END = b"\r\n\r\n"
+LINE_END = b"\r\n"
+CONTENT_LENGTH = b"content-length"
+
+
+class MjpegPartParser:
+    """
+    Incremental parser for a multipart/x-mixed-replace (MJPEG) byte stream.
+
+    Chunks are appended with feed(); complete JPEG payloads are handed out by
+    next_part() as memoryview slices of the internal buffer, so they can go
+    straight to np.frombuffer()/cv2.imdecode without a copy. A returned view is
+    only valid until the next feed() call; copy it (bytes(view)) to keep it.
+
+    The parser remembers where each search stopped, so bytes are scanned once,
+    and consumed data is only dropped from the buffer every `compact_threshold`
+    bytes instead of after every part.
+    """
+
+    # Parser states
+    _FIND_BOUNDARY = 0
+    _FIND_HEADERS = 1
+    _READ_PAYLOAD = 2
+
+    def __init__(self, boundary=BOUNDARY, compact_threshold=256 * 1024, max_header_size=1024):
+        self.boundary = bytes(boundary)
+        self.compact_threshold = int(compact_threshold)
+        self.max_header_size = int(max_header_size)
+
+        self._buf = bytearray()
+        self._pos = 0             # first byte not yet consumed
+        self._scan = 0            # where the current search resumes
+        self._state = self._FIND_BOUNDARY
+        self._headers_start = 0   # first byte after the boundary of the current part
+        self._payload_start = 0
+        self._payload_len = 0
+        self._view = None         # last view handed out (released on next feed)
+
+        # Counters (useful for benchmarks / debug prints)
+        self.bytes_fed = 0
+        self.parts_parsed = 0
+        self.parts_skipped = 0
+        self.resyncs = 0
+        self.compactions = 0
+
+    def feed(self, chunk):
+        """Append a chunk of stream bytes. Invalidates the last returned part."""
+        self._release_view()
+        try:
+            if self._pos and (self._pos >= self.compact_threshold or self._pos == len(self._buf)):
+                self._compact()
+            self._buf += chunk
+        except BufferError:
+            # A caller still references the old buffer (e.g. an array built on a part); leave it to them
+            self._detach()
+            self._buf += chunk
+        self.bytes_fed += len(chunk)
+
+    def next_part(self):
+        """Return the next complete JPEG payload as a memoryview, or None if more data is needed."""
+        self._release_view()
+        span = self._advance()
+        if span is None:
+            return None
+        self._view = memoryview(self._buf)[span[0]:span[1]]
+        return self._view
+
+    def latest_part(self):
+        """
+        Consume every complete part buffered and return only the newest one (or None).
+        Older parts are skipped without creating views; see `parts_skipped`.
+        """
+        self._release_view()
+        latest = None
+        while True:
+            span = self._advance()
+            if span is None:
+                break
+            if latest is not None:
+                self.parts_skipped += 1
+            latest = span
+        if latest is None:
+            return None
+        self._view = memoryview(self._buf)[latest[0]:latest[1]]
+        return self._view
+
+    def __iter__(self):
+        """Yield every complete part currently buffered (each valid until the next one)."""
+        while True:
+            part = self.next_part()
+            if part is None:
+                return
+            yield part
+
+    def buffered_bytes(self):
+        return len(self._buf) - self._pos
+
+    def reset(self):
+        self._release_view()
+        self._buf = bytearray()
+        self._pos = 0
+        self._scan = 0
+        self._state = self._FIND_BOUNDARY
+
+    # -----------------------------
+    # Internal helpers
+    # -----------------------------
+    def _advance(self):
+        """Run the state machine; return (start, end) of the next complete payload or None."""
+        buf = self._buf
+
+        while True:
+            if self._state == self._FIND_BOUNDARY:
+                bidx = buf.find(self.boundary, self._scan)
+                if bidx == -1:
+                    # Drop garbage, keeping a tail that may hold a split boundary
+                    self._pos = max(self._pos, len(buf) - len(self.boundary) + 1)
+                    self._scan = self._pos
+                    return None
+                self._headers_start = bidx + len(self.boundary)
+                self._pos = bidx
+                self._scan = self._headers_start
+                self._state = self._FIND_HEADERS
+
+            if self._state == self._FIND_HEADERS:
+                h_end = buf.find(HEADER_END, self._scan)
+                if h_end == -1:
+                    if len(buf) - self._headers_start > self.max_header_size:
+                        # Headers never terminated; skip this boundary and resync
+                        self._resync(self._headers_start)
+                        continue
+                    # Incomplete headers; resume just before the unsearched tail
+                    self._scan = max(self._headers_start, len(buf) - len(HEADER_END) + 1)
+                    return None
+
+                length = self._parse_content_length(self._headers_start, h_end)
+                if length is None:
+                    # If no Content-Length, drop headers and resync
+                    self._resync(h_end + len(HEADER_END))
+                    continue
+
+                self._payload_start = h_end + len(HEADER_END)
+                self._payload_len = length
+                self._state = self._READ_PAYLOAD
+
+            # _READ_PAYLOAD
+            end = self._payload_start + self._payload_len
+            if len(buf) < end:
+                # Incomplete JPEG payload; wait for more data
+                return None
+
+            start = self._payload_start
+            self._pos = end
+            self._scan = end
+            self._state = self._FIND_BOUNDARY
+            self.parts_parsed += 1
+            return start, end
+
+    def _parse_content_length(self, start, end):
+        """Find 'Content-Length: N' (case-insensitive) between start and end; return N or None."""
+        buf = self._buf
+        line_start = start
+        while line_start < end:
+            line_end = buf.find(LINE_END, line_start, end)
+            if line_end == -1:
+                line_end = end
+            colon = buf.find(b":", line_start, line_end)
+            if colon != -1 and buf[line_start:colon].strip().lower() == CONTENT_LENGTH:
+                try:
+                    length = int(buf[colon + 1:line_end])
+                except ValueError:
+                    return None
+                return length if length >= 0 else None
+            line_start = line_end + len(LINE_END)
+        return None
+
+    def _resync(self, offset):
+        self.resyncs += 1
+        self._pos = offset
+        self._scan = offset
+        self._state = self._FIND_BOUNDARY
+
+    def _release_view(self):
+        if self._view is not None:
+            try:
+                self._view.release()
+            except BufferError:
+                pass  # still exported; feed() falls back to a fresh buffer
+            self._view = None
+
+    def _shift(self, n):
+        self._pos -= n
+        self._scan -= n
+        self._headers_start -= n
+        self._payload_start -= n
+
+    def _compact(self):
+        del self._buf[:self._pos]
+        self._shift(self._pos)
+        self.compactions += 1
+
+    def _detach(self):
+        # Start a fresh buffer so the old one (still referenced by the caller) is never resized
+        self._buf = self._buf[self._pos:]
+        self._shift(self._pos)
+        self.compactions += 1
@@ -0,0 +1,73 @@
+# auto_soccer_bot/motion_gate.py
+import time
+import cv2
+from . import config_auto as config
+from .perf_stats import RateStats
+
+
+class MotionGate:
+    """
+    Skips detection while the robot is stopped and the scene is static.
+    The frame is compared (mean absolute difference on a small grayscale
+    image, FrameContext.motion_image) with the frame of the last detection
+    run. If the last command was 'stop', the change is below `threshold`
+    and the last run is younger than `max_age_s`, color detection and YOLO
+    submission are skipped (the app still merges finished YOLO results and
+    re-predicts the track, BallDetector.refresh()). Counters: hits (detection skipped) / misses (detection ran, with
+    the reason), plus the detection time saved.
+    """
+
+    def __init__(self, width=None, threshold=None, max_age_s=None, stats=None):
+        self.width = int(width if width is not None else getattr(config, "MOTION_GATE_WIDTH", 80))
+        self.threshold = float(threshold if threshold is not None else getattr(config, "MOTION_GATE_THRESHOLD", 2.0))
+        self.max_age_s = float(max_age_s if max_age_s is not None else getattr(config, "MOTION_GATE_MAX_AGE_MS", 1000)) / 1000.0
+        self.stats = stats if stats is not None else RateStats("motion-gate")
+
+        self._reference = None      # motion image of the last detection run
+        self._reference_time = 0.0
+        self._run_ewma_s = 0.0      # detection cost, to estimate the time saved
+        self.hits = 0
+        self.misses = 0
+        self.last_change = 0.0
+
+    def should_skip(self, ctx, last_command):
+        """True to reuse the previous detection for this frame."""
+        image = ctx.motion_image(self.width)
+        now = time.perf_counter()
+        reason = None
+        if self._reference is None or self._reference.shape != image.shape:
+            reason = "no_reference"
+        elif last_command != "stop":
+            reason = "moving"
+        elif now - self._reference_time >= self.max_age_s:
+            reason = "max_age"
+        else:
+            self.last_change = float(cv2.absdiff(image, self._reference).mean())
+            if self.last_change >= self.threshold:
+                reason = "motion"
+
+        if reason is None:
+            self.hits += 1
+            self.stats.add("hits")
+            self.stats.add_time("saved", self._run_ewma_s)
+            return True
+
+        # Detection runs: this frame becomes the new reference
+        self.misses += 1
+        self.stats.add("misses")
+        self.stats.add(reason)
+        self._reference = image
+        self._reference_time = now
+        return False
+
+    def record_run(self, seconds):
+        """Feed the time a detection run took (used for the saved-time estimate)."""
+        self._run_ewma_s = seconds if self._run_ewma_s == 0.0 else self._run_ewma_s + 0.2 * (seconds - self._run_ewma_s)
+
+    def maybe_report(self):
+        snap = self.stats.maybe_report()
+        if snap is not None:
+            total = self.hits + self.misses
+            print(f"[motion-gate] total hits={self.hits}/{total} "
+                  f"({(100.0 * self.hits / total) if total else 0.0:.1f}%), last change={self.last_change:.2f}")
+        return snap
@@ -0,0 +1,343 @@
+# auto_soccer_bot/multiprocess_app.py
+# Optional multi-process pipeline (config.MULTIPROCESS = True):
+#   camera process  : CameraManager (reader + JPEG decode) -> SharedFrameRing slot
+#   detector procs  : read (slot, seq) from a queue, run BallDetector on the shared view,
+#                     send back a compact DetectionRecord (no pixels)
+#   main process    : RobotController + RobotCommunicator (+ display)
+# Each stage gets its own interpreter/GIL, so throughput scales with the cores given to it.
+# Every detector process has its own BallDetector, so its own tracker, DetectionScheduler and
+# ImgszController: with MP_DETECTOR_PROCESSES > 1 each sees only the frames it was given and their
+# state (track, YOLO period, imgsz) diverges between processes. The imgsz log is one CSV per process.
+import asyncio
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+import cv2
+from . import config_auto as config
+from .detection_output import detection_data, draw_detection
+from .frame_context import FrameContext
+from .frame_slot import FrameSlot
+from .headless import MjpegDebugServer, install_shutdown_handler
+from .perf_stats import LatencyWindow, RateStats
+from .preprocessing import ColorPreprocessor
+from .robot_controller import RobotController
+from .robot_communicator import RobotCommunicator
+from .shm_ring import SharedFrameRing
+
+# kind: 'yolo' / 'color' / '' (nothing found); bbox: (x, y, w, h) in frame pixels
+DetectionRecord = namedtuple("DetectionRecord", [
+    "seq", "slot", "timestamp", "kind", "bbox", "confidence", "area", "detect_ms", "worker"])
+
+
+def _offer(q, item, stats):
+    """Latest-only put on a bounded mp.Queue: drop the oldest queued item when full."""
+    try:
+        q.put_nowait(item)
+    except queue.Full:
+        try:
+            q.get_nowait()
+            stats.add("dropped")
+        except queue.Empty:
+            pass
+        try:
+            q.put_nowait(item)
+        except queue.Full:
+            stats.add("dropped")
+
+
+def camera_process_main(lock, slots, ready_q, detect_q, stop_event):
+    """Camera/decoder process: frames go into the shared ring, slot indices into detect_q."""
+    from .camera_manager import CameraManager
+
+    async def run():
+        camera = CameraManager()
+        stats = RateStats("mp-camera")
+        if not camera.initialize():
+            ready_q.put(None)
+            return
+        ring = None
+        last_seq = 0
+        try:
+            while not stop_event.is_set() and camera.is_opened():
+                packet = await camera.next_frame(last_seq, timeout=0.5)
+                if packet is None:
+                    continue
+                last_seq = packet.seq
+                if ring is None:
+                    # Slot shape comes from the first frame; the stream resolution is fixed
+                    ring = SharedFrameRing.create(packet.frame.shape, slots, lock)
+                    ready_q.put(ring.spec())
+                if packet.frame.shape != ring.shape:
+                    stats.add("bad_shape")
+                    continue
+                slot = ring.write(packet.frame, packet.seq, packet.timestamp)
+                if slot is None:
+                    stats.add("ring_full")
+                    continue
+                stats.add("frames")
+                _offer(detect_q, (slot, packet.seq, packet.timestamp), stats)
+                stats.maybe_report()
+        finally:
+            camera.release()
+            if ring is None:
+                ready_q.put(None)
+            else:
+                # Let readers drop their pins before the block is unlinked
+                stop_event.wait(timeout=2.0)
+                ring.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+def detector_process_main(worker_id, ring_spec, lock, detect_q, result_q, stop_event, enhance):
+    """Detector process: BallDetector on zero-copy views of ring slots."""
+    from .ball_detector import BallDetector  # torch/ultralytics only in the processes that need them
+
+    if getattr(config, "YOLO_IMGSZ_LOG", ""):
+        # One CSV per detector process (spawn: this module's config is private to the process)
+        root, ext = os.path.splitext(config.YOLO_IMGSZ_LOG)
+        config.YOLO_IMGSZ_LOG = f"{root}.detector{worker_id}{ext}"
+    detector = BallDetector()
+    detector.async_yolo = False  # this process is the worker; run YOLO inline
+    if not detector.initialize():
+        result_q.put(None)
+        return
+    preprocessor = ColorPreprocessor(enhance=enhance)
+    ring = SharedFrameRing.attach(*ring_spec, lock)
+    stats = RateStats(f"mp-detector-{worker_id}")
+    try:
+        while not stop_event.is_set():
+            try:
+                slot, seq, timestamp = detect_q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            view = ring.acquire(slot, seq)
+            if view is None:
+                stats.add("stale")  # slot reused before this worker got to it
+                continue
+            t0 = time.perf_counter()
+            try:
+                det = detector.process_frame(FrameContext(view, preprocessor, seq, timestamp))
+            finally:
+                ring.release(slot)
+            detect_ms = (time.perf_counter() - t0) * 1000.0
+            stats.add("frames")
+            stats.add_time("detect", detect_ms / 1000.0)
+            if det:
+                record = DetectionRecord(seq, slot, timestamp, det["type"], tuple(det["bbox"]),
+                                         float(det.get("confidence", 0.0)), float(det["area"]), detect_ms, worker_id)
+            else:
+                record = DetectionRecord(seq, slot, timestamp, "", None, 0.0, 0.0, detect_ms, worker_id)
+            result_q.put(record)
+            stats.maybe_report()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        detector.close()  # flushes this process's imgsz log
+        ring.close()
+
+
+def record_to_detection(record):
+    """Rebuild the BallDetector-style dict (for detection_output's drawing / detection_data)."""
+    if record is None or not record.kind:
+        return None
+    x, y, w, h = record.bbox
+    det = {"type": record.kind, "bbox": (x, y, w, h), "confidence": record.confidence,
+           "area": record.area, "class_name": "color_ball" if record.kind == "color" else "ball",
+           "seq": record.seq, "timestamp": record.timestamp}
+    if record.kind != "yolo":
+        det["center"] = (x + w // 2, y + h // 2)
+        det["radius"] = w // 2
+    return det
+
+
+class MultiProcessApplication:
+    """
+    Controller + communicator in this process; camera and detectors in child processes.
+    No BallDetector here: detections arrive as DetectionRecords and are drawn / turned into
+    controller input by detection_output, so this process never loads torch or the model.
+    """
+
+    def __init__(self):
+        self.ctx = mp.get_context("spawn")  # fork is unsafe with torch/threads, spawn also works on Windows
+        self.detector_processes = max(1, int(getattr(config, "MP_DETECTOR_PROCESSES", 1)))
+        # Every detector may pin one slot, the camera writes one, the display reads one
+        self.ring_slots = max(int(getattr(config, "MP_RING_SLOTS", 0)), self.detector_processes * 2 + 2)
+        self.enhance = config.VIDEO_SOURCE != 'webcam'
+
+        self.robot_controller = RobotController()
+        self.robot_communicator = RobotCommunicator()
+        self.preprocessor = ColorPreprocessor(enhance=self.enhance)
+
+        self.lock = self.ctx.Lock()
+        self.stop_event = self.ctx.Event()
+        self.detect_q = self.ctx.Queue(maxsize=self.detector_processes)
+        self.result_q = self.ctx.Queue()
+        self.processes = []
+        self.ring = None
+
+        self.results = FrameSlot()  # newest DetectionRecord, by frame seq (late/out-of-order ones ignored)
+        self._result_thread = None
+        self.running = False
+        self.headless = getattr(config, "HEADLESS", False)
+        self.debug_stream = MjpegDebugServer() if getattr(config, "DEBUG_STREAM_PORT", 0) else None
+        self._remove_signal_handler = None
+        self.stop_requested = False
+        self.loop_stats = RateStats("loop")
+        self.frame_age = LatencyWindow("frame age")
+
+    async def initialize(self):
+        ready_q = self.ctx.Queue()
+        cam = self.ctx.Process(target=camera_process_main, name="camera",
+                               args=(self.lock, self.ring_slots, ready_q, self.detect_q, self.stop_event))
+        cam.start()
+        self.processes.append(cam)
+
+        spec = await asyncio.to_thread(self._wait_ready, ready_q)
+        if spec is None:
+            print("Multi-process: camera process failed to start.")
+            await self.cleanup()
+            return False
+        self.ring = SharedFrameRing.attach(*spec, self.lock)
+        print(f"Multi-process: ring '{spec[0]}' {spec[1]} x {spec[2]} slots, "
+              f"{self.detector_processes} detector process(es).")
+
+        for i in range(self.detector_processes):
+            p = self.ctx.Process(target=detector_process_main, name=f"detector-{i}",
+                                 args=(i, spec, self.lock, self.detect_q, self.result_q, self.stop_event, self.enhance))
+            p.start()
+            self.processes.append(p)
+
+        self._result_thread = threading.Thread(target=self._collect_results, name="mp-results", daemon=True)
+        self._result_thread.start()
+        await self.robot_communicator.initialize()
+        if self.debug_stream is not None and not self.debug_stream.start():
+            self.debug_stream = None
+        self._remove_signal_handler = install_shutdown_handler(self.request_stop)
+        self.running = True
+        print("Auto Soccer Bot (multi-process) initialized.")
+        return True
+
+    def _wait_ready(self, ready_q):
+        while True:
+            try:
+                return ready_q.get(timeout=0.5)
+            except queue.Empty:
+                if not self.processes[0].is_alive():
+                    return None
+
+    def _collect_results(self):
+        while not self.stop_event.is_set():
+            try:
+                record = self.result_q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if record is None:
+                print("Multi-process: a detector process failed to initialize.")
+                continue
+            self.results.publish(record, record.timestamp, record.seq)
+
+    async def run_main_loop(self):
+        if self.headless:
+            print("Starting Automatic Ball Chasing (multi-process, headless). Press Ctrl+C to quit.")
+        else:
+            print("Starting Automatic Ball Chasing (multi-process). Press ESC in OpenCV window to quit.")
+        print(f"Target ESP32 Endpoint: {config.ESP32_MOVE_ENDPOINT}")
+        frame_width = self.ring.shape[1]
+        last_seq = 0
+
+        while self.running and self.processes[0].is_alive():
+            packet = await self.results.next_frame(last_seq, timeout=0.5)
+            if packet is None:
+                continue
+            if last_seq and packet.seq > last_seq + 1:
+                self.loop_stats.add("skipped", packet.seq - last_seq - 1)
+            last_seq = packet.seq
+            record = packet.frame
+            det = record_to_detection(record)
+
+            direction_command, speed_command, turn_ratio_command = self.robot_controller.decide_action(
+                detection_data(det), frame_width
+            )
+            self.frame_age.add((time.time() - record.timestamp) * 1000.0)
+            self.loop_stats.add("frames")
+            self.loop_stats.add_time("detect", record.detect_ms / 1000.0)
+            self.robot_communicator.submit(direction_command, speed_command, turn_ratio_command)
+
+            # Display: the newest frame whose slot is still in the ring (window or a due debug-stream frame)
+            publish = self.debug_stream is not None and self.debug_stream.wants_frame()
+            view = self.ring.acquire(record.slot, record.seq) if not self.headless or publish else None
+            if view is not None:
+                try:
+                    ctx = FrameContext(view, self.preprocessor, record.seq, record.timestamp)
+                    ctx.display  # built in a local buffer; the shared slot stays untouched
+                finally:
+                    self.ring.release(record.slot)
+                draw_detection(ctx, det)
+                self.robot_controller.draw_target_zone(ctx)
+                self.robot_controller.draw_state_info(ctx)
+                cv2.putText(ctx.display, f"Cmd: {direction_command} @ {speed_command}", (10, 30),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+                if publish:
+                    self.debug_stream.publish(ctx.display)
+                if not self.headless:
+                    cv2.imshow('Auto Soccer Bot - Ball Detection', ctx.display)
+
+            if not self.headless:
+                key = cv2.waitKey(1) & 0xFF
+                if key == 27:  # ESC key
+                    self.request_stop()
+
+            if self.loop_stats.maybe_report() is not None:
+                print(f"[loop] {self.frame_age.summary()}")
+
+        if self.stop_requested:
+            self.robot_communicator.submit("stop", 0)
+            await self.robot_communicator.flush()
+
+    def request_stop(self):
+        """ESC or SIGINT/SIGTERM: leave the loop after this iteration and stop the robot."""
+        if not self.stop_requested:
+            print("Stopping...")
+        self.stop_requested = True
+        self.running = False
+
+    async def cleanup(self):
+        self.running = False
+        if self._remove_signal_handler is not None:
+            self._remove_signal_handler()
+            self._remove_signal_handler = None
+        if self.debug_stream is not None:
+            self.debug_stream.stop()
+        self.stop_event.set()
+        for p in self.processes:
+            await asyncio.to_thread(p.join, 5.0)
+            if p.is_alive():
+                p.terminate()
+        self.processes = []
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+        if not self.headless:
+            cv2.destroyAllWindows()
+        await self.robot_communicator.close()
+        print("Auto Soccer Bot (multi-process) cleaned up.")
+
+
+async def start_multiprocess_application():
+    app = MultiProcessApplication()
+    if await app.initialize():
+        try:
+            await app.run_main_loop()
+        except Exception as e:
+            print(f"Error in auto_soccer_bot multi-process loop: {e}")
+            import traceback
+            traceback.print_exc()
+        finally:
+            await app.cleanup()
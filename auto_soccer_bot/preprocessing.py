@@ -0,0 +1,111 @@
+# auto_soccer_bot/preprocessing.py
+import numpy as np
+import cv2
+from . import config_auto as config
+
+
+def enhance_frame_colors(frame, saturation_scale=1.5, value_scale=1.2):
+    """
+    Enhances the color saturation and value of a frame to make colors more vibrant.
+    :param frame: The input frame in BGR format.
+    :param saturation_scale: Factor to scale the saturation by (e.g., 1.5 for 50% increase).
+    :param value_scale: Factor to scale the brightness by (e.g., 1.2 for 20% increase).
+    :return: The enhanced frame in BGR format.
+    """
+    if frame is None:
+        return None
+    
+    # Convert the image from BGR to HSV color space
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    
+    # Split the channels
+    h, s, v = cv2.split(hsv)
+
+    # Increase the saturation
+    # We multiply the saturation channel by a factor.
+    s = cv2.multiply(s, saturation_scale)
+    s = np.clip(s, 0, 255).astype(np.uint8)
+
+    # Optionally, increase the brightness/value as well
+    v = cv2.multiply(v, value_scale)
+    v = np.clip(v, 0, 255).astype(np.uint8)
+
+    # Merge the channels back together
+    final_hsv = cv2.merge((h, s, v))
+    
+    # Convert the HSV image back to BGR format
+    enhanced_frame = cv2.cvtColor(final_hsv, cv2.COLOR_HSV2BGR)
+    
+    return enhanced_frame
+
+
+def scale_lut(scale):
+    """256-entry uint8 table for saturate(round(x * scale)) (same as cv2.multiply on uint8)."""
+    return np.clip(np.rint(np.arange(256, dtype=np.float64) * scale), 0, 255).astype(np.uint8)
+
+
+class ColorPreprocessor:
+    """
+    Single HSV preprocessing stage shared by the display and the color detector.
+
+    The frame is converted BGR->HSV once. Saturation/brightness changes are
+    applied with precomputed 256-entry lookup tables (one cv2.LUT pass over the
+    3-channel image, no split/merge/float temporaries) into preallocated buffers:
+      - detection_hsv(): enhancement + BallDetector's own S/V gains folded into
+        one table, ready for cv2.inRange.
+      - enhanced_bgr(): enhanced HSV converted back to BGR, only needed for the
+        display or YOLO.
+    Returned arrays are reused buffers: they are overwritten by the next frame.
+    """
+
+    def __init__(self, saturation_scale=None, value_scale=None, enhance=True,
+                 detector_sat_gain=None, detector_brightness_add=None):
+        saturation_scale = float(config.SATURATION if saturation_scale is None else saturation_scale)
+        value_scale = float(config.BRIGHTNESS if value_scale is None else value_scale)
+        detector_sat_gain = float(getattr(config, "SATURATION", 1.0) if detector_sat_gain is None else detector_sat_gain)
+        detector_brightness_add = float(getattr(config, "BRIGHTNESS", 0) if detector_brightness_add is None else detector_brightness_add)
+        self.enhance = bool(enhance)
+
+        identity = np.arange(256, dtype=np.uint8)
+        if self.enhance:
+            enh_s, enh_v = scale_lut(saturation_scale), scale_lut(value_scale)
+        else:
+            enh_s, enh_v = identity, identity
+
+        # Display/YOLO enhancement (was enhance_frame_colors)
+        self.enhance_lut = np.dstack([identity, enh_s, enh_v]).reshape(1, 256, 3)
+
+        # Detector view: enhancement followed by BallDetector's multiplicative S / additive V gains
+        det_s = np.clip(enh_s.astype(np.float32) * detector_sat_gain, 0, 255).astype(np.uint8)
+        det_v = np.clip(enh_v.astype(np.float32) + detector_brightness_add, 0, 255).astype(np.uint8)
+        self.detection_lut = np.dstack([identity, det_s, det_v]).reshape(1, 256, 3)
+
+        self._shape = None
+        self._hsv = None
+        self._det_hsv = None
+        self._enh_hsv = None
+        self._bgr = None
+
+    def _ensure_buffers(self, shape):
+        if shape != self._shape:
+            self._shape = shape
+            self._hsv = np.empty(shape, dtype=np.uint8)
+            self._det_hsv = np.empty(shape, dtype=np.uint8)
+            self._enh_hsv = np.empty(shape, dtype=np.uint8)
+            self._bgr = np.empty(shape, dtype=np.uint8)
+
+    def to_hsv(self, frame_bgr):
+        """BGR->HSV into the shared buffer (the only colour conversion per frame)."""
+        self._ensure_buffers(frame_bgr.shape)
+        return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV, dst=self._hsv)
+
+    def detection_hsv(self, hsv):
+        """HSV image for BallDetector color thresholding (all S/V gains applied)."""
+        return cv2.LUT(hsv, self.detection_lut, dst=self._det_hsv)
+
+    def enhanced_bgr(self, frame_bgr, hsv):
+        """Colour-enhanced BGR frame; the input frame itself when enhancement is disabled."""
+        if not self.enhance:
+            return frame_bgr
+        cv2.LUT(hsv, self.enhance_lut, dst=self._enh_hsv)
+        return cv2.cvtColor(self._enh_hsv, cv2.COLOR_HSV2BGR, dst=self._bgr)
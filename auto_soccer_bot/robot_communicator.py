@@ -1,71 +1,264 @@
-import httpx
 import asyncio
 import time
 from . import config_auto as config
-import json
+from .command_transport import TransportError, TransportTimeout, make_transport
+from .perf_stats import LatencyWindow, RateStats
 
 class RobotCommunicator:
-    def __init__(self):
-        self.http_client = None
+    """
+    Sends movement commands to the ESP32 from one long-lived sender task.
+    submit() never blocks and creates no task: it puts the command in a
+    latest-value mailbox, replacing one not sent yet. The sender posts the
+    newest pending command as soon as the previous request has completed and
+    the pacing allows (MIN_TIME_BETWEEN_ANY_COMMAND_MS between any two
+    requests, COMMAND_SEND_INTERVAL_MS before repeating the command the robot
+    already has).
+    Counters: sent, coalesced (pending command replaced by a different one),
+    dropped (still pending at close), failed.
+
+    Adaptive pacing (COMMAND_ADAPTIVE_PACING): every acknowledged request
+    feeds an RTT EWMA and p95; the gap between requests becomes
+    max(COMMAND_RTT_FACTOR * EWMA, p95), clamped, and the repeat interval
+    twice that. Timeouts double a backoff multiplier, successes halve it.
+    The connection is opened at initialize() and kept warm with a ping
+    (GET /status over HTTP) while idle.
+
+    Delivery is delegated to a transport (COMMAND_TRANSPORT, see
+    command_transport.py): HTTP POST /move or binary UDP datagrams.
+
+    submit() may carry a `token` (the frame's latency-trace timing); tokens of
+    coalesced or duplicate submits ride on the command that is actually sent,
+    and `delivery_listener(tokens, sent_time, ack_time or None)` is called once
+    it went out. Only the oldest COMMAND_MAX_PENDING_TOKENS wait for a command:
+    a frame needs the first command after it, and while the robot is
+    unreachable the newer ones would only pile up.
+    """
+
+    def __init__(self, transport=None):
+        self.transport = transport if transport is not None else make_transport()
+        self._opened = False
         self.is_request_in_flight = False
         self.last_sent_command_to_robot = None
         self.last_sent_speed_to_robot = None
         self.last_sent_turn_ratio = None
         self.last_command_time_robot = 0
+        self._last_ping_time = 0   # keepalive only: never paces commands
+        self._pending = None       # (direction, speed, turn_ratio) waiting for the sender
+        self._pending_tokens = []  # tokens of the submits folded into _pending, oldest first
+        self.max_pending_tokens = max(0, int(getattr(config, "COMMAND_MAX_PENDING_TOKENS", 64)))
+        self.delivery_listener = None
+        self._wakeup = None        # set by submit()
+        self._sender_task = None
+        self._ping_task = None     # keepalive ping, runs beside the sender
+        self.stats = RateStats("commands")
+        self.adaptive = getattr(config, "COMMAND_ADAPTIVE_PACING", True)
+        self.rtt = LatencyWindow("command rtt", maxlen=200)
+        self.rtt_ewma_ms = None
+        self.rtt_p95_ms = None     # refreshed every few samples
+        self.backoff = 1.0
+        self.timeouts = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failed = 0
 
     async def initialize(self):
-        if self.http_client is None:
-            limits = httpx.Limits(max_connections=5, max_keepalive_connections=2)
-            timeout = httpx.Timeout(config.HTTP_TIMEOUT_READ, connect=config.HTTP_TIMEOUT_CONNECT)
-            self.http_client = httpx.AsyncClient(timeout=timeout, limits=limits)
-            print("RobotCommunicator (Auto): Async HTTP client initialized.")
+        if not self._opened:
+            await self.transport.open()
+            self._opened = True
+            print(f"RobotCommunicator (Auto): {self.transport.name} transport initialized.")
+            await self._prewarm()
+        if self._sender_task is None:
+            self._wakeup = asyncio.Event()
+            self._sender_task = asyncio.create_task(self._sender_loop())
 
     async def close(self):
-        if self.http_client:
-            await self.http_client.aclose()
-            self.http_client = None
-            print("RobotCommunicator (Auto): Async HTTP client closed.")
+        if self._sender_task is not None:
+            self._sender_task.cancel()
+            try:
+                await self._sender_task
+            except asyncio.CancelledError:
+                pass
+            self._sender_task = None
+        if self._ping_task is not None:
+            self._ping_task.cancel()
+            try:
+                await self._ping_task
+            except asyncio.CancelledError:
+                pass
+            self._ping_task = None
+        if self._pending is not None:
+            self._pending = None
+            self.dropped += 1
+        self._pending_tokens = []
+        if self._opened:
+            await self.transport.close()
+            self._opened = False
+            print(f"RobotCommunicator (Auto): {self.transport.name} transport closed.")
+        print(f"RobotCommunicator (Auto): commands sent={self.sent} coalesced={self.coalesced} "
+              f"dropped={self.dropped} failed={self.failed}")
 
-    async def send_command(self, direction, speed=config.DEFAULT_ROBOT_SPEED, turn_ratio=1.0):
+    def submit(self, direction, speed=config.DEFAULT_ROBOT_SPEED, turn_ratio=1.0, token=None):
+        """Make this the next command to send (call from the event loop thread)."""
         if not direction:
             return
+        command = (direction, int(speed), float(turn_ratio))
+        if self._pending is not None and self._pending != command:
+            self.coalesced += 1  # a repeat of the pending command loses nothing
+            self.stats.add("coalesced")
+        self._pending = command
+        if token is not None and len(self._pending_tokens) < self.max_pending_tokens:
+            self._pending_tokens.append(token)
+        if self._wakeup is not None:
+            self._wakeup.set()
 
-        if not self.http_client:
-            print("RobotCommunicator: HTTP client not initialized. Command not sent.")
-            return
+    async def flush(self, timeout=1.0):
+        """Wait until the pending command has been sent (or `timeout` seconds)."""
+        deadline = time.perf_counter() + timeout
+        while (self._pending is not None or self.is_request_in_flight) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
 
-        current_time_ms = time.time() * 1000
+    def send_intervals_ms(self):
+        """(min gap between any two requests, repeat interval for an unchanged command) in ms."""
+        if not self.adaptive or self.rtt_ewma_ms is None:
+            gap = config.MIN_TIME_BETWEEN_ANY_COMMAND_MS * self.backoff
+            repeat = config.COMMAND_SEND_INTERVAL_MS * self.backoff
+            return gap, repeat
+        gap = max(getattr(config, "COMMAND_RTT_FACTOR", 1.5) * self.rtt_ewma_ms, self.rtt_p95_ms or 0.0)
+        gap = min(max(gap * self.backoff, getattr(config, "COMMAND_MIN_INTERVAL_MS", 40)),
+                  getattr(config, "COMMAND_MAX_INTERVAL_MS", 1000))
+        return gap, 2.0 * gap
 
-        if current_time_ms - self.last_command_time_robot < config.MIN_TIME_BETWEEN_ANY_COMMAND_MS:
-            return
-        if (direction == self.last_sent_command_to_robot and 
-            speed == self.last_sent_speed_to_robot and
-            turn_ratio == self.last_sent_turn_ratio and
-            current_time_ms - self.last_command_time_robot < config.COMMAND_SEND_INTERVAL_MS):
-            return
-        if self.is_request_in_flight:
+    def rtt_stats(self):
+        """RTT/pacing snapshot for logging."""
+        gap, repeat = self.send_intervals_ms()
+        pct = self.rtt.percentiles()
+        return {
+            "rtt_ewma_ms": self.rtt_ewma_ms,
+            "rtt_p50_ms": pct.get("p50"),
+            "rtt_p95_ms": pct.get("p95"),
+            "rtt_p99_ms": pct.get("p99"),
+            "gap_ms": gap,
+            "repeat_ms": repeat,
+            "backoff": self.backoff,
+            "timeouts": self.timeouts,
+        }
+
+    def _record_rtt(self, ms):
+        self.rtt.add(ms)
+        self.rtt_ewma_ms = ms if self.rtt_ewma_ms is None else self.rtt_ewma_ms + 0.2 * (ms - self.rtt_ewma_ms)
+        if self.rtt_p95_ms is None or len(self.rtt.samples) % 16 == 0:
+            self.rtt_p95_ms = self.rtt.percentiles((95,))["p95"]
+        self.backoff = max(1.0, self.backoff * 0.5)
+
+    def _record_timeout(self):
+        self.timeouts += 1
+        self.stats.add("timeouts")
+        self.backoff = min(self.backoff * 2.0, 16.0)
+
+    def _pacing_delay_ms(self, command):
+        now_ms = time.time() * 1000
+        gap, repeat = self.send_intervals_ms()
+        delay = self.last_command_time_robot + gap - now_ms
+        if command == (self.last_sent_command_to_robot, self.last_sent_speed_to_robot, self.last_sent_turn_ratio):
+            delay = max(delay, self.last_command_time_robot + repeat - now_ms)
+        return delay
+
+    async def _prewarm(self):
+        """Open the connection now so the first command does not pay the TCP connect."""
+        t0 = time.perf_counter()
+        if await self._ping(record_rtt=False):  # includes the TCP connect: not an RTT sample
+            print(f"RobotCommunicator (Auto): connection to the ESP32 ready ({(time.perf_counter() - t0) * 1000:.0f} ms).")
+        else:
+            print("RobotCommunicator (Auto): ESP32 not reachable yet; commands will connect on demand.")
+
+    async def _ping(self, record_rtt=True):
+        t0 = time.perf_counter()
+        try:
+            answered = await self.transport.ping()
+            if answered and record_rtt:
+                self._record_rtt((time.perf_counter() - t0) * 1000.0)
+            return answered
+        except TransportTimeout:
+            self._record_timeout()
+        except (TransportError, OSError):
+            pass
+        return False
+
+    async def _sender_loop(self):
+        keepalive_s = getattr(config, "COMMAND_KEEPALIVE_S", 2.0)
+        while True:
+            if self._pending is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), keepalive_s if keepalive_s > 0 else None)
+                except asyncio.TimeoutError:
+                    now_ms = time.time() * 1000
+                    idle_ms = now_ms - max(self.last_command_time_robot, self._last_ping_time)
+                    if idle_ms >= keepalive_s * 1000 and (self._ping_task is None or self._ping_task.done()):
+                        # Idle: keep the connection (and the RTT estimate) alive. Not awaited, so a
+                        # command submitted meanwhile goes out at once instead of after the ping.
+                        self._last_ping_time = now_ms
+                        self._ping_task = asyncio.create_task(self._ping())
+                continue
+            delay_ms = self._pacing_delay_ms(self._pending)
+            if delay_ms > 0:
+                # A different command may arrive meanwhile and be due sooner
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay_ms / 1000.0)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            command, self._pending = self._pending, None
+            tokens, self._pending_tokens = self._pending_tokens, []
+            await self._post(*command, tokens=tokens)
+            if self.stats.maybe_report() is not None:
+                rtt = self.rtt_stats()
+                print(f"[commands] {self.rtt.summary()}, gap={rtt['gap_ms']:.0f}ms "
+                      f"repeat={rtt['repeat_ms']:.0f}ms backoff=x{rtt['backoff']:.0f}")
+
+    async def _post(self, direction, speed, turn_ratio, tokens=()):
+        if not self._opened:
+            print("RobotCommunicator: transport not initialized. Command not sent.")
             return
 
         self.is_request_in_flight = True
-        payload = {"direction": direction, "speed": int(speed), "turn_ratio": float(turn_ratio)}
-        json_payload_str = json.dumps(payload)
-        # print(f"RobotCommunicator (Auto): Sending: {json_payload_str}") # Debug print
+        sent_time = time.time()
+        self.last_command_time_robot = sent_time * 1000  # pacing counts from the attempt
+        # print(f"RobotCommunicator (Auto): Sending: {direction} {speed} {turn_ratio}") # Debug print
 
+        ok = False
+        acked = False
+        t0 = time.perf_counter()
         try:
-            print(payload)
-            response = await self.http_client.post(config.ESP32_MOVE_ENDPOINT, json=payload)
-            response.raise_for_status()
+            print({"direction": direction, "speed": int(speed), "turn_ratio": float(turn_ratio)})
+            acked = await self.transport.send(direction, speed, turn_ratio)
             self.last_sent_command_to_robot = direction
             self.last_sent_speed_to_robot = speed
             self.last_sent_turn_ratio = turn_ratio
-            self.last_command_time_robot = current_time_ms
-        except httpx.ReadTimeout:
-            print(f"RobotCommunicator (Auto): ReadTimeout sending command '{direction}'.")
-        except httpx.ConnectTimeout:
-            print(f"RobotCommunicator (Auto): ConnectTimeout sending command '{direction}'.")
-        except httpx.RequestError as e:
+            ok = True
+        except TransportTimeout as e:
+            self._record_timeout()
+            print(f"RobotCommunicator (Auto): Timeout ({e}) sending command '{direction}'.")
+        except TransportError as e:
             print(f"RobotCommunicator (Auto): Error sending command '{direction}': {e}")
         except Exception as e:
             print(f"RobotCommunicator (Auto): Unexpected error sending command '{direction}': {e}")
         finally:
-            self.is_request_in_flight = False
\ No newline at end of file
+            self.is_request_in_flight = False
+
+        if ok:
+            self.sent += 1
+            self.stats.add("sent")
+            if acked:  # fire-and-forget UDP gives no RTT sample
+                self._record_rtt((time.perf_counter() - t0) * 1000.0)
+            if tokens and self.delivery_listener is not None:
+                self.delivery_listener(tokens, sent_time, time.time() if acked else None)
+        else:
+            self.failed += 1
+            self.stats.add("failed")
+            if self._pending is None:
+                self._pending = (direction, speed, turn_ratio)  # retry unless something newer is waiting
+            self._pending_tokens[:0] = tokens  # delivered with the retry or the newer command
+            del self._pending_tokens[self.max_pending_tokens:]
@@ -1,6 +1,7 @@
 import cv2
 import time
 from . import config_auto as config
+from .frame_context import FrameContext
 
 class RobotController:
     # New state parameters
@@ -137,14 +138,20 @@ class RobotController:
         # Fallback safety
         return "stop", 0, 1.0
 
-    def draw_target_zone(self, frame, frame_width, frame_height):
-        """Visualize the horizontal target corridor."""
+    def draw_target_zone(self, frame, frame_width=None, frame_height=None):
+        """Visualize the horizontal target corridor. `frame` may be a FrameContext."""
+        if isinstance(frame, FrameContext):
+            frame_width, frame_height, frame = frame.width, frame.height, frame.display
+        elif frame_width is None or frame_height is None:
+            frame_height, frame_width = frame.shape[:2]
         x_min = int(config.TARGET_ZONE_X_MIN * frame_width)
         x_max = int(config.TARGET_ZONE_X_MAX * frame_width)
         cv2.line(frame, (x_min, 0), (x_min, frame_height), (255, 255, 0), 1)
         cv2.line(frame, (x_max, 0), (x_max, frame_height), (255, 255, 0), 1)
 
     def draw_state_info(self, frame):
-        """Overlay current FSM state."""
+        """Overlay current FSM state. `frame` may be a FrameContext."""
+        if isinstance(frame, FrameContext):
+            frame = frame.display
         cv2.putText(frame, f"State: {self.state}", (10, 60),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
\ No newline at end of file
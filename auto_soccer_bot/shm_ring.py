@@ -0,0 +1,101 @@
+# auto_soccer_bot/shm_ring.py
+import numpy as np
+from multiprocessing import shared_memory
+
+# Per-slot header: frame seq (0 = empty / being written), readers currently holding the slot
+_SEQ, _PINS = 0, 1
+
+
+class SharedFrameRing:
+    """
+    Ring of preallocated frame slots in one multiprocessing.shared_memory block.
+    The writer copies each decoded frame into a free slot and passes only
+    (slot, seq, timestamp) to other processes; readers get a numpy view on the
+    slot, so pixels are never pickled or copied between processes.
+
+    A reader pins a slot with acquire(slot, seq) and unpins it with release();
+    the writer never reuses a pinned slot, and acquire() fails if the slot was
+    already overwritten by a newer frame. All header updates happen under
+    `lock` (a multiprocessing.Lock shared by every process).
+    """
+
+    def __init__(self, shm, shape, slots, lock, owner):
+        self.shm = shm
+        self.name = shm.name
+        self.shape = tuple(shape)
+        self.slots = int(slots)
+        self.lock = lock
+        self.owner = owner
+
+        header_bytes = self.slots * 2 * 8
+        ts_bytes = self.slots * 8
+        self._meta = np.ndarray((self.slots, 2), dtype=np.int64, buffer=shm.buf, offset=0)
+        self._stamps = np.ndarray((self.slots,), dtype=np.float64, buffer=shm.buf, offset=header_bytes)
+        self._frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=shm.buf,
+                                  offset=header_bytes + ts_bytes)
+        self.written = 0
+        self.full = 0  # writes refused because every slot was pinned
+
+    @classmethod
+    def create(cls, shape, slots, lock):
+        shape = tuple(int(v) for v in shape)
+        size = slots * (2 * 8 + 8) + slots * int(np.prod(shape))
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        ring = cls(shm, shape, slots, lock, owner=True)
+        ring._meta[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name, shape, slots, lock):
+        return cls(shared_memory.SharedMemory(name=name), shape, slots, lock, owner=False)
+
+    def spec(self):
+        """Picklable (name, shape, slots) for attach() in another process."""
+        return self.name, self.shape, self.slots
+
+    def write(self, frame, seq, timestamp):
+        """Copy `frame` into the oldest unpinned slot. Returns the slot index, or None if all are pinned."""
+        with self.lock:
+            free = np.flatnonzero(self._meta[:, _PINS] == 0)
+            if free.size == 0:
+                self.full += 1
+                return None
+            slot = int(free[np.argmin(self._meta[free, _SEQ])])
+            self._meta[slot, _SEQ] = 0  # readers cannot acquire it while it is written
+        np.copyto(self._frames[slot], frame)
+        with self.lock:
+            self._meta[slot, _SEQ] = seq
+            self._stamps[slot] = timestamp
+        self.written += 1
+        return slot
+
+    def acquire(self, slot, seq):
+        """Pin `slot` if it still holds frame `seq`; returns a read-only view or None."""
+        with self.lock:
+            if self._meta[slot, _SEQ] != seq:
+                return None
+            self._meta[slot, _PINS] += 1
+        view = self._frames[slot]
+        view.flags.writeable = False
+        return view
+
+    def release(self, slot):
+        with self.lock:
+            if self._meta[slot, _PINS] > 0:
+                self._meta[slot, _PINS] -= 1
+
+    def timestamp(self, slot):
+        return float(self._stamps[slot])
+
+    def close(self):
+        # Drop numpy views first: SharedMemory.close() fails while buffers are exported
+        self._meta = self._stamps = self._frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,101 @@
+# auto_soccer_bot/stream_recording.py
+# Record the raw multipart MJPEG stream of the ESP32 and play it back.
+#   <path>     : the stream bytes exactly as received (also readable by benchmarks/stream_samples.load_stream)
+#   <path>.ts  : CSV sidecar, one row per received chunk: receive time (time.time()), end offset in <path>
+# To record without running the app (from the parent directory of 'auto_soccer_bot'):
+#   python -m auto_soccer_bot.stream_recording recordings/field.mjpeg --seconds 30
+# or set STREAM_RECORD_PATH to tee the live reader while the app runs.
+import argparse
+import asyncio
+import csv
+import time
+import httpx
+from . import config_auto as config
+
+INDEX_SUFFIX = ".ts"
+
+
+class StreamRecorder:
+    """Tees received stream chunks to disk with their receive timestamps."""
+
+    def __init__(self, path):
+        self.path = path
+        self._data = open(path, "wb")
+        self._index_file = open(path + INDEX_SUFFIX, "w", newline="")
+        self._index = csv.writer(self._index_file)
+        self._index.writerow(["receive_time_s", "end_offset"])
+        self.bytes_written = 0
+        self.chunks = 0
+
+    def write(self, chunk, timestamp=None):
+        self._data.write(chunk)
+        self.bytes_written += len(chunk)
+        self.chunks += 1
+        self._index.writerow([f"{time.time() if timestamp is None else timestamp:.6f}", self.bytes_written])
+
+    def close(self):
+        if self._data is not None:
+            self._data.close()
+            self._index_file.close()
+            self._data = None
+            print(f"Stream recording: {self.chunks} chunks, {self.bytes_written / 1e6:.1f} MB -> {self.path}")
+
+
+def read_recording(path):
+    """Yield (receive_time_s, chunk) in recorded order."""
+    with open(path + INDEX_SUFFIX, newline="") as f:
+        rows = [(float(t), int(end)) for t, end in list(csv.reader(f))[1:]]
+    with open(path, "rb") as data:
+        start = 0
+        for t, end in rows:
+            yield t, data.read(end - start)
+            start = end
+
+
+async def replay_chunks(path, realtime=True):
+    """
+    Async iterator over (receive_time_s, chunk). With `realtime`, chunks come
+    with the recorded spacing; otherwise as fast as the consumer takes them.
+    """
+    t0_rec = t0 = None
+    for t, chunk in read_recording(path):
+        if realtime:
+            if t0_rec is None:
+                t0_rec, t0 = t, time.perf_counter()
+            delay = (t - t0_rec) - (time.perf_counter() - t0)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        yield t, chunk
+
+
+async def record_stream(path, seconds, url=None):
+    recorder = StreamRecorder(path)
+    timeout = httpx.Timeout(None, connect=config.HTTP_TIMEOUT_CONNECT)
+    deadline = time.perf_counter() + seconds
+    try:
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            async with client.stream("GET", url or config.ESP32_STREAM_URL,
+                                     headers={"Accept": "multipart/x-mixed-replace"}) as resp:
+                resp.raise_for_status()
+                async for chunk in resp.aiter_bytes():
+                    recorder.write(chunk, time.time())
+                    if time.perf_counter() >= deadline:
+                        break
+    finally:
+        recorder.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record the ESP32 MJPEG stream (raw bytes + receive timestamps).")
+    parser.add_argument("path", help="output file; the timestamps go to <path>.ts")
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--url", default=None, help="stream URL (default: ESP32_STREAM_URL)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(record_stream(args.path, args.seconds, args.url))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,12 @@ import asyncio
 from .camera_manager import CameraManager
 from .hand_detector import HandDetector # Or your chosen DetectionManager implementation
 from .gesture_classifier import GestureClassifier
+from .gesture_filter import GestureFilter
+from .landmark_recording import LandmarkRecorder
 from .robot_communicator import RobotCommunicator
+from .headless import MjpegDebugServer, install_shutdown_handler
+from .gesture_pipeline import GestureResult, GestureStage
+from .perf_stats import LatencyWindow, RateStats
 from . import config
 import time
 
@@ -13,8 +18,22 @@ class Application:
         self.camera_manager = CameraManager()
         self.hand_detector = HandDetector() # Using HandDetector specifically for now
         self.gesture_classifier = GestureClassifier()
+        # Majority vote / speed hysteresis against single-frame jitter (fed from one thread: the analyze() caller)
+        self.gesture_filter = GestureFilter() if getattr(config, "GESTURE_FILTER", True) else None
+        record_path = getattr(config, "LANDMARK_RECORD_PATH", "")
+        self.landmark_recorder = LandmarkRecorder(record_path) if record_path else None
         self.robot_communicator = RobotCommunicator()
         self.running = False
+        # Headless: no drawing/window; annotated frames only for a connected debug-stream client
+        self.headless = getattr(config, "HEADLESS", False)
+        self.debug_stream = MjpegDebugServer() if getattr(config, "DEBUG_STREAM_PORT", 0) else None
+        self._remove_signal_handler = None
+        self.stop_requested = False
+        # Pipelined: capture, detect/classify and UI on separate threads, linked by latest-only slots
+        self.pipelined = getattr(config, "PIPELINED", True)
+        self.gesture_stage = None
+        self.stage_stats = RateStats("pipeline")                # detect/classify/ui time, frames, skipped
+        self.gesture_latency = LatencyWindow("gesture latency")  # capture -> command handed to the sender (ms)
 
     async def initialize(self):
         if not self.camera_manager.initialize():
@@ -23,90 +42,167 @@ class Application:
             self.camera_manager.release()
             return False
         await self.robot_communicator.initialize()
+        if self.debug_stream is not None and not self.debug_stream.start():
+            self.debug_stream = None
+        self._remove_signal_handler = install_shutdown_handler(self.request_stop)
         self.running = True
         print("Application initialized.")
         return True
 
     async def run_main_loop(self):
-        print("Starting main control loop. Press ESC in OpenCV window to quit.")
+        if self.headless:
+            print("Starting main control loop (headless). Press Ctrl+C to quit.")
+        else:
+            print("Starting main control loop. Press ESC in OpenCV window to quit.")
         print(f"Sending commands to: {config.ESP32_MOVE_ENDPOINT}")
 
-        last_known_command = "stop" # Start with stop
+        if self.pipelined:
+            await self._run_pipelined()
+        else:
+            await self._run_serial()
+
+        if self.gesture_stage is not None:
+            await asyncio.to_thread(self.gesture_stage.stop)  # no gesture command after the final stop
+            self.gesture_stage = None
+        if self.stop_requested:
+            self.robot_communicator.submit("stop", 0)
+            await self.robot_communicator.flush()
+
+    async def _run_serial(self):
+        # Capture (grabber thread) -> detect/classify -> send -> display, one frame at a time on the loop
+        last_seq = 0 # seq of the last processed frame (each webcam frame is processed once)
 
         while self.running and self.camera_manager.is_opened():
-            frame = self.camera_manager.get_frame()
-            if frame is None:
-                await asyncio.sleep(0.01)
+            packet = await self.camera_manager.next_frame(last_seq, timeout=0.5)
+            if packet is None:
                 continue
-            
-            frame_height, frame_width, _ = frame.shape
-
-            # 1. Detect hands (or other objects in the future)
-            processed_frame, detection_results_mp = self.hand_detector.process_frame(frame, draw=True)
-
-            # 2. Extract relevant data from detection
-            # --- Process detected hands ---
-            all_hands_data = self.hand_detector.get_detection_data(detection_results_mp)
-
-            right_hand_landmarks = None
-            left_hand_landmarks = None
-
-            # --- Iterate through detected hands to find left and right ---
-            for landmarks, handedness_str in all_hands_data:
-                if handedness_str.lower() == "right": # Use .lower() for case-insensitivity
-                    right_hand_landmarks = landmarks
-                    # print("Found Right Hand")
-                elif handedness_str.lower() == "left":
-                    left_hand_landmarks = landmarks
-                    # print("Found Left Hand")
-
-            # 3.1 Classify gesture based on landmarks
-            # --- Get Direction from Right Hand ---
-            current_direction_command = "stop" # Default
-            direction_text = None 
-
-            if right_hand_landmarks:
-                right_fingers_status = self.gesture_classifier.get_fingers_status(right_hand_landmarks, "Right")
-                if right_fingers_status:
-                    cmd = self.gesture_classifier.classify_gesture(right_fingers_status)
-                    if cmd:
-                        current_direction_command = cmd
-                        direction_text = cmd
-            
-            # 3.2 Calculate spped based on landmarks
-            # --- Get Speed from Left Hand ---
-            current_speed = config.DEFAULT_SPEED
-            if left_hand_landmarks:
-                current_speed = self.gesture_classifier.calculate_speed_from_left_hand(
-                    left_hand_landmarks, frame_width, frame_height
-                )
-                # Display speed (optional)
-                cv2.putText(processed_frame, f"Speed: {current_speed}", (10, 60),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+            last_seq = packet.seq
 
-            if direction_text is not None:
-                cv2.putText(processed_frame, f"Direction: {direction_text}", (10, 90),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-                
-            current_command = "stop" # Default to stop if no hand or specific gesture
+            result = self.analyze(packet)
 
             # 4. Send command to robot (if changed or needs resending based on communicator's logic)
-            # The communicator handles rate limiting and in-flight checks.
-            asyncio.create_task(self.robot_communicator.send_command(current_direction_command, current_speed))
+            # The communicator's sender task keeps only the newest command and handles pacing.
+            self.submit_command(result)
 
             # 5. Display processed frame
+            self.show(result)
+            self._report()
+
+    async def _run_pipelined(self):
+        # Capture (grabber thread) -> detect/classify (GestureStage thread, wakes the sender) -> UI (this loop)
+        loop = asyncio.get_running_loop()
+        self.gesture_stage = GestureStage(
+            self.camera_manager.frame_slot, self.analyze,
+            lambda result: loop.call_soon_threadsafe(self.submit_command, result), self.stage_stats)
+        self.gesture_stage.start()
+        last_seq = 0
+
+        while self.running and self.camera_manager.is_opened() and self.gesture_stage.is_alive():
+            packet = await self.gesture_stage.results.next_frame(last_seq, timeout=0.5)
+            if packet is None:
+                continue
+            last_seq = packet.seq
+            self.show(packet.frame)
+            self._report()
+
+    def analyze(self, packet):
+        """Detection + classification of one frame -> GestureResult (runs on the loop or the GestureStage thread)."""
+        frame = packet.frame
+        frame_height, frame_width, _ = frame.shape
+
+        # Overlays only for the window or a due debug-stream frame
+        publish = self.debug_stream is not None and self.debug_stream.wants_frame()
+        draw = not self.headless or publish
+
+        # 1. Detect hands (or other objects in the future)
+        t0 = time.perf_counter()
+        processed_frame, detection_results_mp = self.hand_detector.process_frame(frame, draw=draw)
+        t1 = time.perf_counter()
+
+        # 2. Extract relevant data from detection
+        # --- Process detected hands ---
+        all_hands_data = self.hand_detector.get_detection_data(detection_results_mp)
+
+        if self.landmark_recorder is not None:
+            self.landmark_recorder.add(packet.timestamp, all_hands_data, frame_width, frame_height)
+
+        # 3. Direction from the right hand, speed from the left hand
+        # (one (21, 3) array per hand; finger states -> 5-bit mask -> command table)
+        current_direction_command, direction_text, current_speed, speed_shown = \
+            self.gesture_classifier.command_from_hands(all_hands_data, frame_width, frame_height)
+
+        if self.gesture_filter is not None:
+            raw = (current_direction_command, current_speed)
+            current_direction_command, current_speed = self.gesture_filter.update(*raw)
+            if direction_text is not None:
+                direction_text = current_direction_command
+            if (current_direction_command, current_speed) != raw:
+                self.stage_stats.add("filtered")
+
+        self.stage_stats.add_time("detect", t1 - t0)
+        self.stage_stats.add_time("classify", time.perf_counter() - t1)
+        self.stage_stats.add("frames")
+        return GestureResult(packet.seq, packet.timestamp, processed_frame, current_direction_command,
+                             current_speed, direction_text, speed_shown, publish)
+
+    def submit_command(self, result):
+        """Hand the frame's command to the sender (event loop thread); capture -> here is the gesture latency."""
+        if not self.running:
+            return  # stopping: a late result from the gesture stage must not replace the final stop
+        self.robot_communicator.submit(result.direction, result.speed, result.timestamp)
+        self.gesture_latency.add((time.time() - result.timestamp) * 1000.0)
+
+    def show(self, result):
+        """UI stage: overlays, debug stream, window."""
+        t0 = time.perf_counter()
+        processed_frame = result.frame
+        if not self.headless or result.publish:
+            # Display speed (optional)
+            if result.speed_shown:
+                cv2.putText(processed_frame, f"Speed: {result.speed}", (10, 60),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+            if result.direction_text is not None:
+                cv2.putText(processed_frame, f"Direction: {result.direction_text}", (10, 90),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        if result.publish:
+            self.debug_stream.publish(processed_frame)
+        if not self.headless:
             cv2.imshow('Hand Gesture Control', processed_frame)
             key = cv2.waitKey(5) & 0xFF
             if key == 27:  # ESC key
-                self.running = False
-                break
-            
-            await asyncio.sleep(0.001)
+                self.request_stop()
+        self.stage_stats.add_time("ui", time.perf_counter() - t0)
+
+    def _report(self):
+        if self.stage_stats.maybe_report() is not None:
+            print(f"[pipeline] {self.gesture_latency.summary()}")
+            if self.gesture_filter is not None:
+                print(f"[pipeline] {self.gesture_filter.summary()}")
+
+    def request_stop(self):
+        """ESC or SIGINT/SIGTERM: leave the loop after this iteration and stop the robot."""
+        if not self.stop_requested:
+            print("Stopping...")
+        self.stop_requested = True
+        self.running = False
 
     async def cleanup(self):
+        if self._remove_signal_handler is not None:
+            self._remove_signal_handler()
+            self._remove_signal_handler = None
+        if self.gesture_stage is not None:
+            self.gesture_stage.stop()
+            self.gesture_stage = None
+        if self.debug_stream is not None:
+            self.debug_stream.stop()
+        if self.landmark_recorder is not None:
+            self.landmark_recorder.close()  # after the gesture stage: nothing adds to it anymore
         self.camera_manager.release()
-        cv2.destroyAllWindows()
+        if not self.headless:
+            cv2.destroyAllWindows()
         await self.robot_communicator.close()
+        if self.gesture_filter is not None:
+            print(self.gesture_filter.summary())
         print("Application cleaned up.")
 
 async def start_application():
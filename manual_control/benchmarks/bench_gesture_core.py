@@ -0,0 +1,151 @@
+# manual_control/benchmarks/bench_gesture_core.py
+# Gesture classification cost per hand: the previous per-finger attribute access + if-chain
+# vs gesture_core (one (21, 3) array per hand, vectorized finger mask, 32-entry table),
+# per hand and over a whole landmark sequence at once. Every path must give the same commands.
+# Input: an .npz with 'points' (N, 21, 3) and optional 'handedness' (N,) ("Right"/"Left");
+# without --input a synthetic sequence cycling through all 32 finger masks is used.
+# To run (from the parent directory of 'manual_control'):
+#   python -m manual_control.benchmarks.bench_gesture_core --frames 5000
+#   python -m manual_control.benchmarks.bench_gesture_core --input landmarks.npz
+import argparse
+import math
+import time
+import numpy as np
+from .. import config
+from .. import gesture_core
+
+
+class Landmark:
+    """Stand-in for a MediaPipe NormalizedLandmark (attribute access per coordinate)."""
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+# --- Previous implementation (GestureClassifier before gesture_core), kept as the reference ---
+def legacy_is_finger_down(landmarks, finger_tip_id, finger_mcp_id, handedness="Right"):
+    finger_tip = landmarks[finger_tip_id]
+    finger_mcp = landmarks[finger_mcp_id]
+    if finger_tip_id == config.FINGER_TIPS["THUMB"]:
+        if handedness == "Right":
+            return finger_tip.x > finger_mcp.x
+        return finger_tip.x < finger_mcp.x
+    return finger_tip.y > finger_mcp.y
+
+
+def legacy_status(landmarks, handedness):
+    return [legacy_is_finger_down(landmarks, config.FINGER_TIPS[f], config.FINGER_MCP[f], handedness)
+            for f in gesture_core.FINGERS]
+
+
+def legacy_classify(s):
+    if not s[0] and not s[1] and s[2] and s[3] and s[4]:
+        return "left"
+    if not s[0] and s[1] and s[2] and s[3] and not s[4]:
+        return "right"
+    if not s[0] and s[1] and s[2] and s[3] and s[4]:
+        return "backward"
+    if all(s):
+        return "forward"
+    if not any(s):
+        return "stop"
+    return None
+
+
+def legacy_speed(landmarks, frame_width, frame_height):
+    thumb_tip = landmarks[config.FINGER_TIPS["THUMB"]]
+    index_tip = landmarks[config.FINGER_TIPS["INDEX"]]
+    thumb_x, thumb_y = int(thumb_tip.x * frame_width), int(thumb_tip.y * frame_height)
+    index_x, index_y = int(index_tip.x * frame_width), int(index_tip.y * frame_height)
+    distance = math.sqrt((thumb_x - index_x) ** 2 + (thumb_y - index_y) ** 2)
+    clamped = max(config.SPEED_CONTROL_MIN_DIST, min(distance, config.SPEED_CONTROL_MAX_DIST))
+    normalized = (clamped - config.SPEED_CONTROL_MIN_DIST) / (config.SPEED_CONTROL_MAX_DIST - config.SPEED_CONTROL_MIN_DIST)
+    speed = int(config.MIN_SPEED + normalized * (config.MAX_SPEED - config.MIN_SPEED))
+    return max(config.MIN_SPEED, min(speed, config.MAX_SPEED))
+
+
+def synthetic_sequence(n_frames, hold=15, seed=0):
+    """Hands holding each of the 32 finger masks for `hold` frames, with landmark jitter."""
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0.3, 0.7, size=(n_frames, 21, 3))
+    for i in range(n_frames):
+        mask = (i // hold) % 32
+        for bit in range(5):
+            tip, mcp = gesture_core.TIP_IDS[bit], gesture_core.MCP_IDS[bit]
+            down = bool(mask >> bit & 1)
+            offset = rng.uniform(0.02, 0.15)
+            if bit == 0:  # right thumb: down = tip x right of the MCP
+                points[i, tip, 0] = points[i, mcp, 0] + (offset if down else -offset)
+            else:
+                points[i, tip, 1] = points[i, mcp, 1] + (offset if down else -offset)
+    return points, np.array(["Right"] * n_frames)
+
+
+def per_hand(fn, items, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = [fn(*item) for item in items]
+        best = min(best, time.perf_counter() - t0)
+    return out, best * 1e6 / len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark gesture_core against the previous classifier.")
+    parser.add_argument("--input", default="", help="landmark sequence (.npz with 'points' and 'handedness')")
+    parser.add_argument("--frames", type=int, default=3000, help="synthetic sequence length")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.input:
+        data = np.load(args.input)
+        points = data["points"].astype(np.float64)
+        handedness = data["handedness"] if "handedness" in data else np.array(["Right"] * len(points))
+    else:
+        points, handedness = synthetic_sequence(args.frames)
+    hands = [[Landmark(*map(float, p)) for p in hand] for hand in points]
+    w, h = args.width, args.height
+    print(f"{len(points)} hands ({'recorded' if args.input else 'synthetic'}), best of {args.repeat}")
+
+    legacy_out, legacy_us = per_hand(
+        lambda lms, hd: (legacy_classify(legacy_status(lms, hd)), legacy_speed(lms, w, h)),
+        list(zip(hands, handedness)), args.repeat)
+
+    def core_hand(lms, hd):
+        arr = gesture_core.landmarks_to_array(lms)
+        return gesture_core.classify_points(arr, hd), gesture_core.speed_from_points(arr, w, h)
+    core_out, core_us = per_hand(core_hand, list(zip(hands, handedness)), args.repeat)
+
+    array_out, array_us = per_hand(
+        lambda arr, hd: (gesture_core.classify_points(arr, hd), gesture_core.speed_from_points(arr, w, h)),
+        list(zip(points, handedness)), args.repeat)
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        commands = np.empty(len(points), dtype=object)
+        for hd in np.unique(handedness):
+            sel = handedness == hd
+            commands[sel] = gesture_core.classify_masks(gesture_core.finger_masks(points[sel], str(hd)))
+        best = min(best, time.perf_counter() - t0)
+    batch_us = best * 1e6 / len(points)
+
+    same = (legacy_out == core_out == array_out
+            and list(commands) == [c for c, _ in legacy_out])
+    print(f"{'path':>34} {'us/hand':>8} {'speedup':>8}")
+    for name, us in (("legacy (5 x _is_finger_down + ifs)", legacy_us),
+                     ("core, landmark objects", core_us),
+                     ("core, (21, 3) arrays", array_us),
+                     ("core, whole sequence (no speed)", batch_us)):
+        print(f"{name:>34} {us:8.2f} {legacy_us / us:7.1f}x")
+    counts = {}
+    for c, _ in legacy_out:
+        counts[c] = counts.get(c, 0) + 1
+    print(f"Commands identical: {same}   {counts}")
+
+
+if __name__ == "__main__":
+    main()
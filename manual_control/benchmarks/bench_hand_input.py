@@ -0,0 +1,107 @@
+# manual_control/benchmarks/bench_hand_input.py
+# Cost of HandDetector.process_frame per camera resolution: the previous input path
+# (flip -> BGR2RGB -> MediaPipe -> RGB2BGR -> draw, new arrays at every step) vs the current one
+# (mirrored RGB in reusable buffers, optional downscale, BGR output only when drawing).
+# --input-only swaps MediaPipe for a no-op model, leaving only the frame handling.
+# To run (from the parent directory of 'manual_control'; MediaPipe must be installed):
+#   python -m manual_control.benchmarks.bench_hand_input --input-only
+#   python -m manual_control.benchmarks.bench_hand_input --resolutions 640x480,1280x720 --inference-width 320
+import argparse
+import time
+from types import SimpleNamespace
+import cv2
+import numpy as np
+from ..hand_detector import HandDetector
+
+
+def legacy_process_frame(detector, frame, draw=True):
+    """HandDetector.process_frame before the reusable-buffer input path."""
+    image_rgb = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+    image_rgb.flags.writeable = False
+    results = detector.hands_model.process(image_rgb)
+    image_rgb.flags.writeable = True
+    output_frame = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
+    if draw and results.multi_hand_landmarks:
+        for hand_landmarks in results.multi_hand_landmarks:
+            detector.mp_drawing.draw_landmarks(
+                output_frame, hand_landmarks, detector.mp_hands.HAND_CONNECTIONS,
+                detector.mp_drawing_styles.get_default_hand_landmarks_style(),
+                detector.mp_drawing_styles.get_default_hand_connections_style())
+    return output_frame, results
+
+
+class NullHands:
+    """No-op stand-in for mp.solutions.hands.Hands (times the frame handling alone)."""
+
+    def process(self, image):
+        return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+
+    def close(self):
+        pass
+
+
+def test_frames(width, height, count=8):
+    """A few different frames (gradient + moving blob), so caches do not flatter either path."""
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.dstack([np.broadcast_to(x, (height, width)), np.broadcast_to(y, (height, width)),
+                      np.full((height, width), 128, np.float32)]).astype(np.uint8)
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        cv2.circle(frame, (width * (i + 1) // (count + 1), height // 2), height // 6, (60, 120, 220), -1)
+        frames.append(frame)
+    return frames
+
+
+def time_per_frame(fn, frames, n):
+    for frame in frames[:2]:
+        fn(frame)  # warm-up: buffers allocated, model graph ready
+    t0 = time.perf_counter()
+    for i in range(n):
+        fn(frames[i % len(frames)])
+    return (time.perf_counter() - t0) * 1000.0 / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare HandDetector input paths per resolution.")
+    parser.add_argument("--resolutions", default="640x480,1280x720,1920x1080")
+    parser.add_argument("--inference-width", type=int, default=320, help="downscaled variant (0 = skip it)")
+    parser.add_argument("--frames", type=int, default=0, help="frames per measurement (default: 300, 30 with MediaPipe)")
+    parser.add_argument("--input-only", action="store_true", help="no-op model instead of MediaPipe")
+    args = parser.parse_args()
+    n = args.frames or (300 if args.input_only else 30)
+
+    detector = HandDetector()
+    detector.initialize()
+    if args.input_only:
+        detector.hands_model.close()
+        detector.hands_model = NullHands()
+
+    variants = [("previous, draw", lambda f: legacy_process_frame(detector, f, draw=True)),
+                ("previous, headless", lambda f: legacy_process_frame(detector, f, draw=False)),
+                ("current, draw", lambda f: detector.process_frame(f, draw=True)),
+                ("current, headless", lambda f: detector.process_frame(f, draw=False))]
+    print(f"ms/frame over {n} frames ({'input path only' if args.input_only else 'incl. MediaPipe'})")
+    for resolution in args.resolutions.split(","):
+        width, height = (int(v) for v in resolution.lower().split("x"))
+        frames = test_frames(width, height)
+        rows = []
+        detector.inference_width = 0
+        for name, fn in variants:
+            rows.append((name, time_per_frame(fn, frames, n)))
+        if args.inference_width and args.inference_width < width:
+            detector.inference_width = args.inference_width
+            for name, fn in variants[2:]:
+                rows.append((f"{name}, {args.inference_width}px input", time_per_frame(fn, frames, n)))
+            detector.inference_width = 0
+        baseline = {"draw": rows[0][1], "headless": rows[1][1]}
+        print(f"\n{width}x{height}")
+        for name, ms in rows:
+            ref = baseline["draw" if "draw" in name else "headless"]
+            print(f"  {name:>32} {ms:8.3f} ms  {ref / ms:5.2f}x")
+    detector.hands_model.close()
+
+
+if __name__ == "__main__":
+    main()
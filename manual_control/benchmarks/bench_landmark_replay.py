@@ -0,0 +1,216 @@
+# manual_control/benchmarks/bench_landmark_replay.py
+# Offline run of the gesture control path on recorded hand landmarks (LANDMARK_RECORD_PATH /
+# landmark_recording.py): GestureClassifier -> speed mapping -> GestureFilter -> RobotCommunicator,
+# posting to a local stand-in /move server instead of the ESP32. No webcam, MediaPipe or person needed.
+# Reports gesture-path throughput, the command sequence (raw and filtered, with a digest to compare
+# runs) and how many commands reached the stand-in. As fast as possible (default) the command
+# sequence is deterministic, but the communicator paces in wall time, so nearly all commands
+# coalesce; --realtime replays at the recorded pace for representative send counts.
+# To run (from the parent directory of 'manual_control'):
+#   python -m manual_control.benchmarks.bench_landmark_replay recordings/hands.npz --realtime
+#   python -m manual_control.benchmarks.bench_landmark_replay recordings/synthetic.npz --synthetic 600
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from .. import config
+from ..landmark_recording import LandmarkRecorder, read_landmarks
+
+
+class MoveStandIn:
+    """Local /move (POST JSON) and /status (GET) endpoints; keeps every received command."""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.http = ThreadingHTTPServer((host, port), _MoveHandler)
+        self.http.daemon_threads = True
+        self.http.standin = self
+        self.host, self.port = host, self.http.server_address[1]
+        self.lock = threading.Lock()
+        self.received = []  # (time, direction, speed)
+        self.status_requests = 0
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.http.serve_forever, name="move-standin", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.http.shutdown()
+        self.http.server_close()
+        self._thread.join(timeout=2.0)
+
+
+class _MoveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like esp_http_server
+
+    def _reply(self, code, body):
+        data = body.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            doc = json.loads(body)
+            command = (doc["direction"], int(doc.get("speed", 255)))
+        except (ValueError, KeyError, TypeError):
+            self._reply(400, "Malformed JSON")
+            return
+        standin = self.server.standin
+        with standin.lock:
+            standin.received.append((time.time(),) + command)
+        self._reply(200, "OK")
+
+    def do_GET(self):
+        with self.server.standin.lock:
+            self.server.standin.status_requests += 1
+        self._reply(200, "{}")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_synthetic_recording(path, n_frames, fps=30.0, hold=45, seed=0):
+    """Right hand holding each direction gesture for `hold` frames with ~15% single-frame
+    misclassifications, left hand slowly opening and closing (speed) with jitter."""
+    from .bench_gesture_core import synthetic_sequence
+    rng = np.random.default_rng(seed)
+    poses = synthetic_sequence(64, hold=2, seed=seed)[0][::2]  # poses[mask]: a right hand showing that mask
+    gesture_masks = [31, 0, 28, 14, 30]  # forward, stop, left, right, backward
+    recorder = LandmarkRecorder(path)
+    t = time.time()
+    for i in range(n_frames):
+        mask = gesture_masks[(i // hold) % len(gesture_masks)]
+        if rng.random() < 0.15:
+            mask = int(rng.integers(32))
+        right = poses[mask] + rng.normal(0.0, 0.002, size=(21, 3))
+        left = rng.uniform(0.3, 0.7, size=(21, 3))
+        spread = 0.2 + 0.15 * np.sin(i / 90.0) + rng.normal(0.0, 0.01)
+        left[8, :2] = left[4, :2] + (spread, 0.0)
+        hands = [(right, "Right"), (left, "Left")] if i % 200 < 190 else []  # hands leave the view now and then
+        recorder.add(t + i / fps, hands, 640, 480)
+    with contextlib.redirect_stdout(io.StringIO()):
+        recorder.close()
+
+
+def run_lengths(commands):
+    runs = []
+    for command in commands:
+        if runs and runs[-1][0] == command:
+            runs[-1][1] += 1
+        else:
+            runs.append([command, 1])
+    return runs
+
+
+def command_digest(commands):
+    h = hashlib.sha1()
+    for direction, speed in commands:
+        h.update(f"{direction},{speed};".encode())
+    return h.hexdigest()[:16]
+
+
+async def run(args, frames):
+    from ..gesture_classifier import GestureClassifier
+    from ..gesture_filter import GestureFilter
+    from ..robot_communicator import RobotCommunicator
+
+    classifier = GestureClassifier()
+    gesture_filter = GestureFilter() if not args.no_filter else None
+    communicator = RobotCommunicator()
+    await communicator.initialize()
+
+    raw, sent_cmds = [], []
+    busy = 0.0
+    t_start = time.perf_counter()
+    first_ts = frames[0][0]
+    try:
+        for timestamp, width, height, hands in frames:
+            if args.realtime:
+                delay = (timestamp - first_ts) - (time.perf_counter() - t_start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            t0 = time.perf_counter()
+            direction, _, speed, _ = classifier.command_from_hands(hands, width, height)
+            raw.append((direction, speed))
+            if gesture_filter is not None:
+                direction, speed = gesture_filter.update(direction, speed)
+            sent_cmds.append((direction, speed))
+            communicator.submit(direction, speed, time.time() if args.realtime else None)
+            busy += time.perf_counter() - t0
+            if not args.realtime:
+                await asyncio.sleep(0)  # let the sender task run, as the UI stage would
+        await communicator.flush()
+    finally:
+        wall = time.perf_counter() - t_start
+        await communicator.close()
+    return raw, sent_cmds, busy, wall, communicator, gesture_filter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded hand landmarks through the gesture control path.")
+    parser.add_argument("recording", help=".npz written by LANDMARK_RECORD_PATH / LandmarkRecorder")
+    parser.add_argument("--realtime", action="store_true", help="recorded pace (representative send counts)")
+    parser.add_argument("--no-filter", action="store_true", help="send raw classifier output (no GestureFilter)")
+    parser.add_argument("--max-frames", type=int, default=0)
+    parser.add_argument("--synthetic", type=int, default=0, help="first write a synthetic recording of N frames")
+    parser.add_argument("--verbose", action="store_true", help="show the communicator's per-request log")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        write_synthetic_recording(args.recording, args.synthetic)
+    if not os.path.exists(args.recording):
+        parser.error(f"no recording at {args.recording}")
+    frames = list(read_landmarks(args.recording))
+    if args.max_frames:
+        frames = frames[:args.max_frames]
+    if not frames:
+        print("Recording has no frames.")
+        return
+
+    standin = MoveStandIn()
+    standin.start()
+    config.ESP32_MOVE_ENDPOINT = f"http://{standin.host}:{standin.port}/move"
+    config.ESP32_STATUS_ENDPOINT = f"http://{standin.host}:{standin.port}/status"
+    config.STATS_PRINT_INTERVAL_S = 0
+    try:
+        # The communicator prints every request: only shown with --verbose
+        with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO()):
+            raw, filtered, busy, wall, communicator, gesture_filter = asyncio.run(run(args, frames))
+    finally:
+        standin.stop()
+
+    n = len(frames)
+    hands = sum(len(f[3]) for f in frames)
+    print(f"{n} frames ({hands} hands) in {wall:.2f}s wall "
+          f"({'recorded pace' if args.realtime else 'as fast as possible'})")
+    print(f"Gesture path (classify + speed{'' if args.no_filter else ' + filter'} + submit): "
+          f"{busy * 1e6 / n:.1f} us/frame, {n / max(busy, 1e-9):.0f} frames/s")
+
+    raw_runs, out_runs = run_lengths(raw), run_lengths(filtered)
+    print(f"Raw commands: {len(raw_runs) - 1} changes, digest {command_digest(raw)}")
+    if gesture_filter is not None:
+        print(f"Filtered commands: {len(out_runs) - 1} changes, digest {command_digest(filtered)}  "
+              f"({gesture_filter.summary()})")
+    print("  " + " ".join(f"{d}@{s}x{count}" for (d, s), count in out_runs[:30]) + (" ..." if len(out_runs) > 30 else ""))
+
+    received = standin.received
+    print(f"Communicator: sent={communicator.sent} coalesced={communicator.coalesced} "
+          f"dropped={communicator.dropped} failed={communicator.failed}")
+    print(f"Stand-in /move received {len(received)} commands "
+          f"({len(received) / max(wall, 1e-9):.1f}/s), {standin.status_requests} /status")
+    if received:
+        print("  " + " ".join(f"{d}@{s}x{count}" for (d, s), count in run_lengths([r[1:] for r in received])[:30]))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,47 @@
 # manual_control/camera_manager.py
 import cv2
 from . import config
+from .frame_slot import FrameSlot
+from .frame_grabber import FrameGrabber
 
 class CameraManager:
     def __init__(self, camera_index=config.WEBCAM_INDEX):
         self.camera_index = camera_index
         self.cap = None
+        # Newest frame + seq + capture timestamp, filled by the grabber thread
+        self.frame_slot = FrameSlot()
+        self._grabber = None
 
     def initialize(self):
         self.cap = cv2.VideoCapture(self.camera_index)
         if not self.cap.isOpened():
             print(f"Error: Could not open webcam at index {self.camera_index}.")
             return False
+        # cap.read() blocks for a frame interval; run it on its own thread, keep only the newest frame
+        self._grabber = FrameGrabber(self.cap, self.frame_slot, name="webcam-grabber")
+        self._grabber.start()
         print(f"Webcam {self.camera_index} initialized successfully.")
         return True
 
     def get_frame(self):
-        if self.cap and self.cap.isOpened():
-            success, frame = self.cap.read()
-            if success:
-                return frame
-        return None
+        # Newest grabbed frame (non-blocking); may repeat the previous one, use next_frame() to avoid that
+        return self.frame_slot.latest().frame
+
+    async def next_frame(self, after_seq=0, timeout=None):
+        """Wait for a frame newer than `after_seq`; returns a FramePacket (seq, frame, timestamp) or None on timeout."""
+        return await self.frame_slot.next_frame(after_seq, timeout)
 
     def release(self):
+        if self._grabber is not None:
+            self._grabber.stop()
+            print(f"Webcam grabber: {self._grabber.grabbed} grabbed, "
+                  f"{self._grabber.dropped} dropped, {self._grabber.failed} failed reads.")
+            self._grabber = None
         if self.cap:
             self.cap.release()
             print("Webcam released.")
 
     def is_opened(self):
-        return self.cap is not None and self.cap.isOpened()
\ No newline at end of file
+        if self._grabber is not None and not self._grabber.is_alive():
+            return False  # device lost
+        return self.cap is not None and self.cap.isOpened()
@@ -2,6 +2,7 @@
 ESP32_IP_ADDRESS = "192.168.43.2" # Make sure this is correct
 ESP32_CONTROL_PORT = 80
 ESP32_MOVE_ENDPOINT = f"http://{ESP32_IP_ADDRESS}:{ESP32_CONTROL_PORT}/move"
+ESP32_STATUS_ENDPOINT = f"http://{ESP32_IP_ADDRESS}:{ESP32_CONTROL_PORT}/status" # connection pre-warm / keep-alive
 HTTP_TIMEOUT_CONNECT = 2.0 # Seconds
 HTTP_TIMEOUT_READ = 1.0    # Seconds
 
@@ -9,6 +10,7 @@ HTTP_TIMEOUT_READ = 1.0    # Seconds
 MIN_DETECTION_CONFIDENCE = 0.6 # Higher value = more strict detection, less false positives
 MIN_TRACKING_CONFIDENCE = 0.6  # Higher value = more strict tracking
 MAX_NUM_HANDS = 2              # Control with one hand for simplicity, can be 2
+HAND_INFERENCE_WIDTH = 0       # Downscale the MediaPipe input to this width (e.g. 320; 0 = camera resolution)
 
 # --- Gesture Definitions ---
 # These are based on the MediaPipe landmark indices
@@ -33,11 +35,32 @@ FINGER_MCP = {
 # --- Robot Command Settings ---
 COMMAND_SEND_INTERVAL_MS = 200  # Min interval to resend the *same* command
 MIN_TIME_BETWEEN_ANY_COMMAND_MS = 100 # Min interval between *any* two commands'
+COMMAND_ADAPTIVE_PACING = True   # Derive both intervals above from the measured RTT (they apply until the first ack)
+COMMAND_RTT_FACTOR = 1.5         # Gap between requests = max(factor * RTT EWMA, RTT p95)
+COMMAND_MIN_INTERVAL_MS = 40     # Adaptive gap floor
+COMMAND_MAX_INTERVAL_MS = 1000   # Adaptive gap ceiling (reached through timeout backoff)
+COMMAND_KEEPALIVE_S = 2.0        # GET ESP32_STATUS_ENDPOINT after this long without a request (0 = off)
 DEFAULT_SPEED = 150  # Speed value from 0-255 (assuming 8-bit PWM on ESP32)
 MIN_SPEED = 50
 MAX_SPEED = 255
 SPEED_CONTROL_MIN_DIST = 20  # Min pixel distance between thumb and index for min speed
 SPEED_CONTROL_MAX_DIST = 200 # Max pixel distance for max speed (adjust these based on your camera/hand size)
+GESTURE_FILTER = True        # Debounce gesture commands before they reach the communicator
+GESTURE_FILTER_WINDOW = 5    # Direction = majority of the last N frames (1 = no vote)
+GESTURE_SPEED_STEP = 16      # Speed quantized to steps of this size from DEFAULT_SPEED (1 = off)
+GESTURE_SPEED_HYSTERESIS = 4 # Extra margin past the step midpoint before the speed step changes
 
 # --- Camera Settings ---
-WEBCAM_INDEX = 0
\ No newline at end of file
+WEBCAM_INDEX = 0
+LANDMARK_RECORD_PATH = ""    # Save every frame's hand landmarks to this .npz for offline replay ("" = off)
+PIPELINED = True             # Capture / detect+classify / UI on separate threads (latest-only slots); False = one loop
+
+# --- Headless Mode ---
+HEADLESS = False             # No drawing, no OpenCV window; quit with Ctrl+C / SIGTERM
+DEBUG_STREAM_PORT = 0        # Annotated MJPEG at http://<host>:<port>/ while a client is connected (0 = off)
+DEBUG_STREAM_HOST = "0.0.0.0"
+DEBUG_STREAM_FPS = 5         # Max frames drawn/encoded per second for the debug stream
+DEBUG_STREAM_QUALITY = 70    # JPEG quality of the debug stream
+
+# --- Statistics ---
+STATS_PRINT_INTERVAL_S = 5.0 # Print command/timing statistics every N seconds (0 disables)
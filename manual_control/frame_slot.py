@@ -0,0 +1,105 @@
+# manual_control/frame_slot.py
+import asyncio
+import threading
+import time
+from collections import namedtuple
+
+# seq: monotonically increasing per slot; timestamp: capture/receipt time (time.time());
+# published: when the packet entered the slot (for decoded frames: decode done)
+FramePacket = namedtuple("FramePacket", ["seq", "frame", "timestamp", "published"], defaults=(0.0,))
+
+
+def _wake(fut):
+    if not fut.done():
+        fut.set_result(None)
+
+
+class FrameSlot:
+    """
+    Latest-only frame slot with sequence numbers.
+    Producers (the reader task or worker threads) call publish(); asyncio
+    consumers await next_frame(after_seq), which returns as soon as a packet
+    newer than `after_seq` exists, so a loop wakes once per new frame instead
+    of polling and never processes the same frame twice. Consumer threads use
+    wait_frame() the same way.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)  # wakes wait_frame() threads
+        self._packet = FramePacket(0, None, 0.0)
+        self._taken = True  # current packet has been read by a consumer
+        self._waiters = []  # (loop, future) pairs woken on publish
+        self.published = 0
+        self.dropped = 0    # packets overwritten before any consumer read them
+
+    def publish(self, frame, timestamp=None, seq=None):
+        """
+        Store a new packet. seq defaults to last seq + 1; an explicit seq older
+        than the current one is ignored (late result from a slower worker).
+        Returns the stored FramePacket or None if it was stale.
+        """
+        with self._lock:
+            current = self._packet.seq
+            if seq is None:
+                seq = current + 1
+            elif seq < current:
+                return None
+            if not self._taken:
+                self.dropped += 1
+            now = time.time()
+            packet = FramePacket(seq, frame, now if timestamp is None else timestamp, now)
+            self._packet = packet
+            self._taken = False
+            self.published += 1
+            waiters, self._waiters = self._waiters, []
+            self._cond.notify_all()
+
+        for loop, fut in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, fut)
+            except RuntimeError:
+                pass  # loop already closed
+        return packet
+
+    def latest(self):
+        with self._lock:
+            self._taken = True
+            return self._packet
+
+    def wait_frame(self, after_seq=0, timeout=None):
+        """Blocking next_frame() for worker threads: packet with seq > after_seq, or None on timeout."""
+        with self._cond:
+            ready = self._cond.wait_for(lambda: self._packet.seq > after_seq and self._packet.frame is not None, timeout)
+            if not ready:
+                return None
+            self._taken = True
+            return self._packet
+
+    async def next_frame(self, after_seq=0, timeout=None):
+        """Wait for a packet with seq > after_seq; returns it, or None on timeout."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        waited = False
+
+        while True:
+            with self._lock:
+                packet = self._packet
+                if packet.seq > after_seq and packet.frame is not None:
+                    self._taken = True
+                    break
+                fut = loop.create_future()
+                self._waiters.append((loop, fut))
+
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(fut, remaining)
+            except asyncio.TimeoutError:
+                return None
+            waited = True
+
+        if not waited:
+            await asyncio.sleep(0)  # always yield so producers on this loop keep running
+        return packet
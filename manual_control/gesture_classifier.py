@@ -1,47 +1,74 @@
 # manual_control/gesture_classifier.py
 from . import config
-import math
+from . import gesture_core
+
 
 class GestureClassifier:
+    """
+    Gestures from MediaPipe hand landmarks, backed by gesture_core: each hand
+    is converted once to a (21, 3) array (hand_array()), finger states come
+    out as a 5-bit mask and the command from a 32-entry table. The list-based
+    methods below are kept for callers that still pass landmark lists.
+    """
+
     def __init__(self):
         pass
 
-    def _is_finger_down(self, landmarks, finger_tip_id, finger_mcp_id, handedness="Right"):
-        """Internal helper to check individual finger state."""
-        if not landmarks:
-            return False
+    def hand_array(self, landmarks):
+        """(21, 3) array of a hand's landmarks (None if no landmarks)."""
+        if landmarks is None or len(landmarks) == 0:
+            return None
+        return gesture_core.landmarks_to_array(landmarks)
+
+    def classify_hand(self, points, handedness="Right"):
+        """Command for a hand array (None: no gesture matched)."""
+        if points is None:
+            return "stop"
+        return gesture_core.classify_points(points, handedness)
 
-        finger_tip = landmarks[finger_tip_id]
-        finger_mcp = landmarks[finger_mcp_id]
+    def speed_from_hand(self, points, frame_width, frame_height):
+        """Speed from the LEFT hand array: thumb-index tip distance mapped to MIN_SPEED..MAX_SPEED."""
+        if points is None:
+            return config.DEFAULT_SPEED
+        return gesture_core.speed_from_points(points, frame_width, frame_height)
 
-        # Thumb logic (same as before, adjust if needed)
-        if finger_tip_id == config.FINGER_TIPS["THUMB"]:
-            if handedness == "Right":
-                return finger_tip.x > finger_mcp.x # Thumb tucked for right hand
-            else: # Left hand
-                return finger_tip.x < finger_mcp.x # Thumb tucked for left hand
-        else:
-            # Other fingers: "down" if tip_y is below (greater Y) mcp_y
-            return finger_tip.y > finger_mcp.y
+    def command_from_hands(self, hands, frame_width, frame_height):
+        """
+        Direction from the RIGHT hand, speed from the LEFT hand.
+        :param hands: [(landmarks, handedness_str), ...] from HandDetector.get_detection_data() (or a recording).
+        :return: (direction, direction_text, speed, speed_shown); direction_text is None when no gesture matched.
+        """
+        right_hand = None
+        left_hand = None
+        for landmarks, handedness in hands:
+            if handedness.lower() == "right":
+                right_hand = landmarks
+            elif handedness.lower() == "left":
+                left_hand = landmarks
+
+        direction, direction_text = "stop", None
+        if right_hand is not None and len(right_hand):
+            cmd = self.classify_hand(self.hand_array(right_hand), "Right")
+            if cmd:
+                direction = direction_text = cmd
+
+        speed = config.DEFAULT_SPEED
+        speed_shown = left_hand is not None and len(left_hand) > 0
+        if speed_shown:
+            speed = self.speed_from_hand(self.hand_array(left_hand), frame_width, frame_height)
+        return direction, direction_text, speed, speed_shown
 
     def get_fingers_status(self, landmarks, handedness):
         """
         Determines the up/down status of all five fingers.
-        :param landmarks: List of landmark objects for a single hand.
+        :param landmarks: List of landmark objects (or a (21, 3) array) for a single hand.
         :param handedness: String "Left" or "Right".
         :return: A list of 5 booleans [thumb_down, index_down, ...] or None if no landmarks.
         """
-        if not landmarks:
+        points = self.hand_array(landmarks)
+        if points is None:
             return None
-
-        status = [
-            self._is_finger_down(landmarks, config.FINGER_TIPS["THUMB"],  config.FINGER_MCP["THUMB"], handedness),
-            self._is_finger_down(landmarks, config.FINGER_TIPS["INDEX"],  config.FINGER_MCP["INDEX"], handedness),
-            self._is_finger_down(landmarks, config.FINGER_TIPS["MIDDLE"], config.FINGER_MCP["MIDDLE"], handedness),
-            self._is_finger_down(landmarks, config.FINGER_TIPS["RING"],   config.FINGER_MCP["RING"], handedness),
-            self._is_finger_down(landmarks, config.FINGER_TIPS["PINKY"],  config.FINGER_MCP["PINKY"], handedness)
-        ]
-        return status
+        return gesture_core.mask_to_status(gesture_core.finger_mask(points, handedness))
 
     def classify_gesture(self, right_hand_fingers_status):
         """
@@ -51,59 +78,20 @@ class GestureClassifier:
         """
         if right_hand_fingers_status is None:
             return "stop" # Default to stop if no fingers detected/valid status
+        mask = sum(1 << i for i, down in enumerate(right_hand_fingers_status) if down)
+        return gesture_core.classify_mask(mask)
 
-        elif not right_hand_fingers_status[0] and not right_hand_fingers_status[1] and right_hand_fingers_status[2] and right_hand_fingers_status[3] and right_hand_fingers_status[4]:
-            return "left"
-        if not right_hand_fingers_status[0] and right_hand_fingers_status[1] and right_hand_fingers_status[2] and right_hand_fingers_status[3] and not right_hand_fingers_status[4]:
-            return "right"
-        if not right_hand_fingers_status[0] and  right_hand_fingers_status[1] and right_hand_fingers_status[2] and right_hand_fingers_status[3] and right_hand_fingers_status[4]:
-            return "backward"
-        # Gesture: All five fingers "down" (curled) means "forward"
-        elif all(right_hand_fingers_status):
-            return "forward"
-        # Gesture: All five fingers "up" (extended) means "stop"
-        elif not any(right_hand_fingers_status):
-            return "stop"
-
-        return None # No specific gesture matched, could also default to "stop"
-    
     def calculate_speed_from_left_hand(self, left_hand_landmarks, frame_width, frame_height):
         """
         Calculates speed based on the distance between thumb tip and index finger tip of the LEFT hand.
-        :param left_hand_landmarks: List of landmark objects for the left hand.
+        :param left_hand_landmarks: List of landmark objects (or a (21, 3) array) for the left hand.
         :param frame_width: Width of the camera frame for normalization.
         :param frame_height: Height of the camera frame for normalization.
         :return: Speed value (e.g., 0-255) or config.DEFAULT_SPEED if no left hand or invalid.
         """
-        if not left_hand_landmarks:
-            return config.DEFAULT_SPEED
-
         try:
-            thumb_tip = left_hand_landmarks[config.FINGER_TIPS["THUMB"]]
-            index_tip = left_hand_landmarks[config.FINGER_TIPS["INDEX"]]
-
-            # Get pixel coordinates (landmarks are normalized 0.0-1.0)
-            thumb_x, thumb_y = int(thumb_tip.x * frame_width), int(thumb_tip.y * frame_height)
-            index_x, index_y = int(index_tip.x * frame_width), int(index_tip.y * frame_height)
-
-            # Calculate Euclidean distance in pixels
-            distance = math.sqrt((thumb_x - index_x)**2 + (thumb_y - index_y)**2)
-            # print(f"Left hand T-I dist: {distance:.2f}") # For debugging
-
-            # Map distance to speed (linear interpolation)
-            # Clamp distance to defined min/max
-            clamped_dist = max(config.SPEED_CONTROL_MIN_DIST, min(distance, config.SPEED_CONTROL_MAX_DIST))
-
-            # Normalize distance to 0-1 range
-            normalized_dist = (clamped_dist - config.SPEED_CONTROL_MIN_DIST) / \
-                              (config.SPEED_CONTROL_MAX_DIST - config.SPEED_CONTROL_MIN_DIST)
-
-            # Map normalized distance to speed range
-            speed = int(config.MIN_SPEED + normalized_dist * (config.MAX_SPEED - config.MIN_SPEED))
-            
-            return max(config.MIN_SPEED, min(speed, config.MAX_SPEED)) # Ensure speed is within bounds
-
-        except IndexError: # Should not happen if landmarks are correctly passed
+            return self.speed_from_hand(self.hand_array(left_hand_landmarks), frame_width, frame_height)
+        except (IndexError, ValueError): # Should not happen if landmarks are correctly passed
             print("Error: Could not access thumb/index landmarks for speed control.")
             return config.DEFAULT_SPEED
         except Exception as e:
@@ -0,0 +1,100 @@
+# manual_control/gesture_core.py
+# Array-backed gesture classification: a hand's 21 landmarks become one (21, 3) array,
+# the five finger states are computed together as a 5-bit mask (bit i = finger i down,
+# thumb = bit 0) and the mask indexes a precomputed 32-entry command table.
+# Copy of simulation/ros2_ws/src/footbot_perception/footbot_perception/gesture_core.py (the
+# packages cannot import each other): change both together. That package's
+# test/test_gesture_core.py checks the two against each other and against the original if-chain.
+import math
+import numpy as np
+from . import config
+
+FINGERS = ("THUMB", "INDEX", "MIDDLE", "RING", "PINKY")
+TIP_IDS = np.array([config.FINGER_TIPS[f] for f in FINGERS])
+MCP_IDS = np.array([config.FINGER_MCP[f] for f in FINGERS])
+MASK_WEIGHTS = 1 << np.arange(len(FINGERS))
+NUM_LANDMARKS = 21
+
+# Flat (21 * 3) indices read by finger_mask(): tip y, MCP y of every finger, then thumb tip x, thumb MCP x
+_MASK_IDX = np.concatenate([TIP_IDS * 3 + 1, MCP_IDS * 3 + 1, [TIP_IDS[0] * 3, MCP_IDS[0] * 3]])
+# thumb tip x, y, index tip x, y (speed)
+_SPEED_IDX = np.array([config.FINGER_TIPS["THUMB"] * 3, config.FINGER_TIPS["THUMB"] * 3 + 1,
+                       config.FINGER_TIPS["INDEX"] * 3, config.FINGER_TIPS["INDEX"] * 3 + 1])
+
+
+def _rule(status):
+    """The original if-chain of GestureClassifier.classify_gesture, on 5 booleans (True = down)."""
+    thumb, index, middle, ring, pinky = status
+    if not thumb and not index and middle and ring and pinky:
+        return "left"
+    if not thumb and index and middle and ring and not pinky:
+        return "right"
+    if not thumb and index and middle and ring and pinky:
+        return "backward"
+    if all(status):
+        return "forward"
+    if not any(status):
+        return "stop"
+    return None
+
+
+def mask_to_status(mask):
+    return [bool(mask >> i & 1) for i in range(len(FINGERS))]
+
+
+# mask -> command (None: no gesture), built from the rules above so both always agree
+GESTURE_TABLE = tuple(_rule(mask_to_status(mask)) for mask in range(1 << len(FINGERS)))
+_GESTURE_ARRAY = np.array(GESTURE_TABLE, dtype=object)
+
+
+def landmarks_to_array(landmarks, out=None):
+    """(21, 3) float64 array of x, y, z from MediaPipe landmarks (an array is returned as is)."""
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 3), dtype=np.float64)
+    out.reshape(-1)[:] = [v for lm in landmarks for v in (lm.x, lm.y, lm.z)]
+    return out
+
+
+def finger_mask(points, handedness="Right"):
+    """5-bit finger-down mask of a (21, 3) landmark array."""
+    v = points.reshape(-1).take(_MASK_IDX).tolist()  # one gather, then plain floats
+    # Thumb: tucked across the palm, mirrored for the left hand
+    mask = int(v[10] > v[11] if handedness == "Right" else v[10] < v[11])
+    for i in range(1, 5):
+        mask |= (v[i] > v[i + 5]) << i  # fingers: tip below (greater y) the MCP
+    return mask
+
+
+def finger_masks(points, handedness="Right"):
+    """finger_mask() of a whole (N, 21, 3) sequence at once -> (N,) int array."""
+    down = points[:, TIP_IDS, 1] > points[:, MCP_IDS, 1]
+    thumb_x, thumb_mcp_x = points[:, TIP_IDS[0], 0], points[:, MCP_IDS[0], 0]
+    down[:, 0] = thumb_x > thumb_mcp_x if handedness == "Right" else thumb_x < thumb_mcp_x
+    return down.astype(np.int64) @ MASK_WEIGHTS
+
+
+def classify_mask(mask):
+    return GESTURE_TABLE[mask]
+
+
+def classify_masks(masks):
+    """(N,) masks -> (N,) object array of commands (None: no gesture)."""
+    return _GESTURE_ARRAY[masks]
+
+
+def classify_points(points, handedness="Right"):
+    return GESTURE_TABLE[finger_mask(points, handedness)]
+
+
+def speed_from_points(points, frame_width, frame_height):
+    """Speed from the thumb-index tip distance in pixels (same mapping as the legacy code)."""
+    thumb_x, thumb_y, index_x, index_y = points.reshape(-1).take(_SPEED_IDX).tolist()
+    dx = int(thumb_x * frame_width) - int(index_x * frame_width)
+    dy = int(thumb_y * frame_height) - int(index_y * frame_height)
+    distance = math.sqrt(dx * dx + dy * dy)
+    clamped = max(config.SPEED_CONTROL_MIN_DIST, min(distance, config.SPEED_CONTROL_MAX_DIST))
+    normalized = (clamped - config.SPEED_CONTROL_MIN_DIST) / (config.SPEED_CONTROL_MAX_DIST - config.SPEED_CONTROL_MIN_DIST)
+    speed = int(config.MIN_SPEED + normalized * (config.MAX_SPEED - config.MIN_SPEED))
+    return max(config.MIN_SPEED, min(speed, config.MAX_SPEED))
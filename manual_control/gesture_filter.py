@@ -0,0 +1,91 @@
+# manual_control/gesture_filter.py
+# Temporal filter for gesture commands: single-frame MediaPipe jitter (forward -> None -> forward,
+# speed 182 -> 176 -> 185) must not reach the robot as a new command every frame.
+from collections import deque
+from . import config
+
+
+class GestureFilter:
+    """
+    Direction: majority vote over the last `window` raw directions. The output
+    only switches when another direction holds a strict majority of the
+    window, so a flip has to last about window/2 frames to be sent.
+    Speed: quantized to `speed_step` steps counted from DEFAULT_SPEED (so the
+    speed sent without a left hand is itself a step), clamped to
+    MIN_SPEED..MAX_SPEED, with hysteresis: the output step only moves once the raw speed is more
+    than `speed_hysteresis` past the midpoint to the next step.
+    window=1 and speed_step<=1 pass commands through unchanged.
+    """
+
+    def __init__(self, window=None, speed_step=None, speed_hysteresis=None):
+        self.window = max(1, int(window if window is not None else getattr(config, "GESTURE_FILTER_WINDOW", 5)))
+        self.speed_step = max(1, int(speed_step if speed_step is not None else getattr(config, "GESTURE_SPEED_STEP", 16)))
+        self.speed_hysteresis = max(0.0, float(speed_hysteresis if speed_hysteresis is not None
+                                               else getattr(config, "GESTURE_SPEED_HYSTERESIS", 4)))
+        self._history = deque(maxlen=self.window)
+        self.direction = None
+        self.speed = None
+        self._last_raw = None
+        # Counters: frames seen, raw command changes, changes let through, changes suppressed
+        self.frames = 0
+        self.raw_changes = 0
+        self.changes = 0
+        self.suppressed = 0
+
+    def update(self, direction, speed):
+        """Feed one frame's raw (direction, speed); returns the filtered (direction, speed)."""
+        self.frames += 1
+        previous = (self.direction, self.speed)
+        self._history.append(direction)
+        self.direction = self._vote(direction)
+        self.speed = self._quantize(int(speed))
+
+        raw = (direction, int(speed))
+        output = (self.direction, self.speed)
+        if self._last_raw is not None:
+            if raw != self._last_raw:
+                self.raw_changes += 1
+                if output == previous:
+                    self.suppressed += 1  # the communicator would have sent this flip
+            if output != previous:
+                self.changes += 1
+        self._last_raw = raw
+        return output
+
+    def _vote(self, direction):
+        if self.direction is None or self.window == 1:
+            return direction  # first frame: nothing to hold yet
+        counts = {}
+        for d in self._history:
+            counts[d] = counts.get(d, 0) + 1
+        best = max(counts, key=counts.get)
+        if best != self.direction and counts[best] * 2 > len(self._history):
+            return best
+        return self.direction
+
+    def _quantize(self, speed):
+        step = self.speed_step
+        if step == 1:
+            return speed
+        level = config.DEFAULT_SPEED + round((speed - config.DEFAULT_SPEED) / step) * step
+        level = max(config.MIN_SPEED, min(level, config.MAX_SPEED))
+        if self.speed is None or level == self.speed:
+            return level
+        # Hysteresis: stay on the current step until the raw value is clearly past the midpoint
+        if abs(speed - self.speed) <= step / 2.0 + self.speed_hysteresis:
+            return self.speed
+        return level
+
+    def reset(self):
+        """Forget the history (e.g. after the final stop); counters are kept."""
+        self._history.clear()
+        self.direction = None
+        self.speed = None
+        self._last_raw = None
+
+    def summary(self):
+        if not self.frames:
+            return "gesture filter: no frames"
+        return (f"gesture filter: {self.frames} frames, {self.raw_changes} raw changes, "
+                f"{self.changes} sent, {self.suppressed} suppressed "
+                f"(window {self.window}, speed step {self.speed_step})")
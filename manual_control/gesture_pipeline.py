@@ -0,0 +1,67 @@
+# manual_control/gesture_pipeline.py
+import threading
+from collections import namedtuple
+from .frame_slot import FrameSlot
+
+# What the detect/classify stage hands to the UI stage for one frame.
+# frame: BGR output (mirrored, landmarks drawn if requested); timestamp: capture time;
+# speed_shown: a left hand set the speed; publish: a debug-stream frame is due
+GestureResult = namedtuple("GestureResult", ["seq", "timestamp", "frame", "direction", "speed",
+                                             "direction_text", "speed_shown", "publish"])
+
+
+class GestureStage:
+    """
+    Detection + classification stage of the pipelined mode, on its own thread.
+    Capture (FrameGrabber) -> this stage -> UI are linked by latest-only
+    FrameSlots: while MediaPipe runs on frame N the grabber already stores
+    N+1, and a frame the stage was too slow for is skipped, never queued.
+    `analyze(packet)` returns a GestureResult; `on_command(result)` is called
+    right away from this thread (it must hand over to the sender thread-safely),
+    so the command does not wait for drawing or imshow/waitKey in the UI stage.
+    """
+
+    def __init__(self, frame_slot, analyze, on_command, stats=None, name="gesture-stage"):
+        self.frame_slot = frame_slot
+        self.analyze = analyze
+        self.on_command = on_command
+        self.stats = stats
+        self.name = name
+        self.results = FrameSlot()  # newest GestureResult ('frame' holds it) for the UI stage
+        self.processed = 0
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)  # may be inside a MediaPipe call
+            self._thread = None
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        last_seq = 0
+        while self._running:
+            packet = self.frame_slot.wait_frame(last_seq, timeout=0.5)
+            if packet is None:
+                continue
+            if self.stats is not None and last_seq and packet.seq > last_seq + 1:
+                self.stats.add("skipped", packet.seq - last_seq - 1)
+            last_seq = packet.seq
+            try:
+                result = self.analyze(packet)
+            except Exception as e:
+                print(f"{self.name}: error: {e}")
+                continue
+            self.on_command(result)
+            self.results.publish(result, packet.timestamp, packet.seq)
+            self.processed += 1
@@ -19,6 +19,10 @@ class HandDetector(DetectionManager):
         self.hands_model = None # Renamed from 'hands' to avoid conflict if a variable 'hands' is used
         self.mp_drawing = None
         self.mp_drawing_styles = None
+        self.inference_width = int(getattr(config, "HAND_INFERENCE_WIDTH", 0))
+        self._small = None          # reusable inference-input buffers (see _inference_input)
+        self._rgb = None
+        self._rgb_mirrored = None
 
     def initialize(self):
         self.mp_hands = mp.solutions.hands
@@ -34,11 +38,21 @@ class HandDetector(DetectionManager):
         return True # Indicate success
 
     def process_frame(self, frame, draw=True):
-        image_rgb = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB) # Selfie view
+        """
+        Runs MediaPipe on the mirrored (selfie view) frame.
+        The RGB inference input is built in reusable buffers, downscaled first to
+        HAND_INFERENCE_WIDTH when set (landmarks are normalized, so nothing downstream
+        changes). The BGR output frame is only made when drawing: a mirrored copy of
+        `frame`, which is also the source of the inference input, with the landmarks
+        drawn on it. With draw=False it is None.
+        :return: (output_frame or None, results)
+        """
+        # New array each frame: the output frame is handed to the UI stage
+        output_frame = cv2.flip(frame, 1) if draw else None
+        image_rgb = self._inference_input(frame, output_frame)
         image_rgb.flags.writeable = False # Performance optimization
         results = self.hands_model.process(image_rgb)
         image_rgb.flags.writeable = True
-        output_frame = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR) # Back to BGR
 
         if draw and results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
@@ -51,6 +65,23 @@ class HandDetector(DetectionManager):
                 )
         return output_frame, results
 
+    def _inference_input(self, frame, mirrored=None):
+        """Mirrored RGB copy of `frame` (optionally downscaled) in reusable buffers.
+        `mirrored`: the already flipped BGR frame, if there is one."""
+        src = frame if mirrored is None else mirrored
+        height, width = src.shape[:2]
+        if 0 < self.inference_width < width:
+            size = (self.inference_width, max(1, round(height * self.inference_width / width)))
+            # Linear: INTER_AREA costs more than the rest of the path at non-integer ratios
+            self._small = cv2.resize(src, size, dst=self._small, interpolation=cv2.INTER_LINEAR)
+            src = self._small
+        # cv2 reuses dst when shape/type match and allocates a new one otherwise (resolution change)
+        self._rgb = cv2.cvtColor(src, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        if mirrored is not None:
+            return self._rgb
+        self._rgb_mirrored = cv2.flip(self._rgb, 1, dst=self._rgb_mirrored)
+        return self._rgb_mirrored
+
     def get_detection_data(self, results):
         """
         Extracts hand landmarks and handedness if available.
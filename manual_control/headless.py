@@ -0,0 +1,176 @@
+# manual_control/headless.py
+import asyncio
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import cv2
+from . import config
+
+BOUNDARY = "debugframe"
+
+
+class MjpegDebugServer:
+    """
+    Low-rate MJPEG view of the annotated frames for headless runs
+    (open http://<laptop>:<port>/ in a browser).
+    The main loop asks wants_frame() before drawing anything: it is False
+    unless a client is connected and the rate cap (`max_fps`) allows a new
+    frame, so without a viewer a loop iteration costs one comparison.
+    publish() only copies the frame; JPEG encoding runs on a background
+    thread, once per frame for all clients.
+    """
+
+    def __init__(self, port=None, host=None, max_fps=None, quality=None):
+        self.port = int(port if port is not None else getattr(config, "DEBUG_STREAM_PORT", 0))
+        self.host = host if host is not None else getattr(config, "DEBUG_STREAM_HOST", "0.0.0.0")
+        max_fps = float(max_fps if max_fps is not None else getattr(config, "DEBUG_STREAM_FPS", 5))
+        self.period_s = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.quality = int(quality if quality is not None else getattr(config, "DEBUG_STREAM_QUALITY", 70))
+
+        self._cond = threading.Condition()
+        self._frame = None       # newest published frame, not encoded yet
+        self._jpeg = None
+        self._jpeg_id = 0
+        self._last_publish = 0.0
+        self._running = False
+        self._server = None
+        self._threads = []
+        self.clients = 0
+        self.encoded = 0
+
+    def start(self):
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), _MjpegHandler)
+        except OSError as e:
+            print(f"Debug stream: cannot listen on {self.host}:{self.port}: {e}")
+            self._server = None
+            return False
+        self._server.daemon_threads = True
+        self._server.debug_stream = self
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.5},
+                             name="debug-http", daemon=True),
+            threading.Thread(target=self._encode_loop, name="debug-encoder", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+        fps = f"{1.0 / self.period_s:.0f}" if self.period_s else "unlimited"
+        print(f"Debug stream: http://{self.host}:{self._server.server_address[1]}/ (max {fps} fps)")
+        return True
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for t in self._threads:
+            t.join(timeout=2.0)
+        self._threads = []
+
+    def wants_frame(self, now=None):
+        """True if a client is watching and the next frame is due (draw only then)."""
+        if self.clients <= 0:
+            return False
+        now = time.perf_counter() if now is None else now
+        return now - self._last_publish >= self.period_s
+
+    def publish(self, frame):
+        """Hand over an annotated frame (copied: the caller may reuse its buffer)."""
+        with self._cond:
+            self._frame = frame.copy()
+            self._last_publish = time.perf_counter()
+            self._cond.notify_all()
+
+    def _encode_loop(self):
+        while True:
+            with self._cond:
+                while self._running and self._frame is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                frame, self._frame = self._frame, None
+            ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if not ok:
+                continue
+            with self._cond:
+                self._jpeg = buf.tobytes()
+                self._jpeg_id += 1
+                self.encoded += 1
+                self._cond.notify_all()
+
+    def _stream_to(self, wfile):
+        """Write JPEGs to one client as they are encoded, until it disconnects or the server stops."""
+        with self._cond:
+            self.clients += 1
+            last_id = self._jpeg_id
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: not self._running or self._jpeg_id != last_id, timeout=1.0)
+                    if not self._running:
+                        return
+                    if self._jpeg_id == last_id:
+                        continue
+                    jpeg, last_id = self._jpeg, self._jpeg_id
+                wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                            f"Content-Length: {len(jpeg)}\r\n\r\n".encode("ascii"))
+                wfile.write(jpeg)
+                wfile.write(b"\r\n")
+                wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass
+        finally:
+            with self._cond:
+                self.clients -= 1
+
+
+class _MjpegHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.server.debug_stream._stream_to(self.wfile)
+
+    def log_message(self, format, *args):
+        pass  # keep the console for the application's own output
+
+
+def install_shutdown_handler(callback):
+    """
+    Call `callback` once on SIGINT/SIGTERM, from the running asyncio loop
+    (headless runs have no window to press ESC in). The handlers are removed
+    after the first signal, so a second Ctrl+C interrupts as usual.
+    Returns a function that removes the handlers.
+    """
+    loop = asyncio.get_running_loop()
+    signals = [signal.SIGINT] + ([signal.SIGTERM] if hasattr(signal, "SIGTERM") else [])
+    previous = {}
+
+    def remove():
+        for sig in signals:
+            if sig in previous:
+                signal.signal(sig, previous.pop(sig))
+            else:
+                try:
+                    loop.remove_signal_handler(sig)
+                except (NotImplementedError, RuntimeError, ValueError):
+                    pass
+
+    def fire(*_):
+        loop.call_soon_threadsafe(remove)
+        loop.call_soon_threadsafe(callback)
+
+    try:
+        for sig in signals:
+            loop.add_signal_handler(sig, fire)
+    except NotImplementedError:
+        # Windows: no loop signal handlers; a plain handler wakes the loop instead
+        for sig in signals:
+            previous[sig] = signal.signal(sig, fire)
+    return remove
@@ -0,0 +1,64 @@
+# manual_control/landmark_recording.py
+# Per-frame MediaPipe hand outputs saved to a compressed .npz, so the gesture path
+# (classification, speed, filter, communicator) can be replayed without a webcam or a person.
+# Arrays in the file:
+#   timestamps (F,) float64  capture time of every processed frame (frames without hands included)
+#   frame_size (F, 2) int32  width, height the landmarks were normalized to
+#   hand_frame (H,) int32    frame index of every detected hand
+#   points     (H, 21, 3) float32  landmark x, y, z (MediaPipe's own precision, so replay is exact)
+#   handedness (H,) str      "Right" / "Left" / "Unknown"
+# 'points' and 'handedness' are also what benchmarks/bench_gesture_core.py --input reads.
+import numpy as np
+from . import gesture_core
+
+
+class LandmarkRecorder:
+    """Collects hands frame by frame (add()); close() writes the file. Fed from one thread."""
+
+    def __init__(self, path):
+        self.path = path
+        self.timestamps = []
+        self.frame_size = []
+        self.hand_frame = []
+        self.points = []
+        self.handedness = []
+
+    def add(self, timestamp, hands, frame_width, frame_height):
+        """hands: [(landmarks, handedness_str), ...] as returned by HandDetector.get_detection_data()."""
+        frame = len(self.timestamps)
+        self.timestamps.append(timestamp)
+        self.frame_size.append((frame_width, frame_height))
+        for landmarks, handedness in hands:
+            self.hand_frame.append(frame)
+            self.points.append(gesture_core.landmarks_to_array(landmarks).astype(np.float32))
+            self.handedness.append(handedness)
+
+    def close(self):
+        if self.path is None:
+            return
+        points = np.stack(self.points) if self.points else np.empty((0, gesture_core.NUM_LANDMARKS, 3), np.float32)
+        np.savez_compressed(self.path,
+                            timestamps=np.asarray(self.timestamps, dtype=np.float64),
+                            frame_size=np.asarray(self.frame_size, dtype=np.int32).reshape(-1, 2),
+                            hand_frame=np.asarray(self.hand_frame, dtype=np.int32),
+                            points=points,
+                            handedness=np.asarray(self.handedness, dtype=str))
+        print(f"Landmarks of {len(self.timestamps)} frames ({len(self.points)} hands) written to {self.path}")
+        self.path = None
+
+
+def read_landmarks(path):
+    """
+    Yields (timestamp, frame_width, frame_height, hands) per recorded frame, with
+    hands = [((21, 3) float64 array, handedness_str), ...] in detection order.
+    """
+    with np.load(path) as data:
+        timestamps = data["timestamps"]
+        frame_size = data["frame_size"]
+        hand_frame = data["hand_frame"]
+        points = data["points"].astype(np.float64)
+        handedness = data["handedness"].tolist()
+    starts = np.searchsorted(hand_frame, np.arange(len(timestamps) + 1))
+    for i, timestamp in enumerate(timestamps.tolist()):
+        hands = [(points[j], handedness[j]) for j in range(starts[i], starts[i + 1])]
+        yield timestamp, int(frame_size[i, 0]), int(frame_size[i, 1]), hands
@@ -0,0 +1,113 @@
+# manual_control/perf_stats.py
+import asyncio
+import threading
+import time
+from collections import deque
+import numpy as np
+from . import config
+
+
+class RateStats:
+    """
+    Counters and accumulated durations, printed as per-second rates.
+    add() counts events, add_time() accumulates seconds spent; maybe_report()
+    prints and resets the window every `interval_s` seconds. Safe to feed from
+    worker threads.
+    """
+
+    def __init__(self, name, interval_s=None):
+        self.name = name
+        self.interval_s = float(interval_s if interval_s is not None else getattr(config, "STATS_PRINT_INTERVAL_S", 5.0))
+        self.counts = {}
+        self.times = {}
+        self.totals = {}
+        self._lock = threading.Lock()
+        self._window_start = time.perf_counter()
+
+    def add(self, key, count=1):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + count
+            self.totals[key] = self.totals.get(key, 0) + count
+
+    def add_time(self, key, seconds):
+        with self._lock:
+            n, total = self.times.get(key, (0, 0.0))
+            self.times[key] = (n + 1, total + seconds)
+
+    def snapshot(self):
+        """Return {key: per-second rate} for counters and {key_ms_per_s, key_avg_ms} for timers."""
+        elapsed = max(1e-6, time.perf_counter() - self._window_start)
+        with self._lock:
+            counts, times = dict(self.counts), dict(self.times)
+        out = {k: v / elapsed for k, v in counts.items()}
+        for k, (n, total) in times.items():
+            out[f"{k}_ms_per_s"] = total * 1000.0 / elapsed
+            out[f"{k}_avg_ms"] = (total * 1000.0 / n) if n else 0.0
+        return out
+
+    def maybe_report(self):
+        """Print and reset the window once `interval_s` has elapsed. Returns the snapshot or None."""
+        if self.interval_s <= 0 or time.perf_counter() - self._window_start < self.interval_s:
+            return None
+        with self._lock:
+            counts, times = list(self.counts), list(self.times)
+        snap = self.snapshot()
+        parts = [f"{k}={snap[k]:.1f}/s" for k in counts]
+        for k in times:
+            parts.append(f"{k}={snap[f'{k}_avg_ms']:.2f}ms avg ({snap[f'{k}_ms_per_s']:.1f}ms/s)")
+        print(f"[{self.name}] " + ", ".join(parts))
+        self.reset()
+        return snap
+
+    def reset(self):
+        with self._lock:
+            self.counts = {}
+            self.times = {}
+            self._window_start = time.perf_counter()
+
+
+class LatencyWindow:
+    """Rolling window of samples (ms) with percentile summaries."""
+
+    def __init__(self, name, maxlen=1000):
+        self.name = name
+        self.samples = deque(maxlen=maxlen)
+        self.max_seen = 0.0
+
+    def add(self, value_ms):
+        self.samples.append(value_ms)
+        if value_ms > self.max_seen:
+            self.max_seen = value_ms
+
+    def percentiles(self, qs=(50, 95, 99)):
+        if not self.samples:
+            return {}
+        values = np.percentile(np.fromiter(self.samples, dtype=np.float64), qs)
+        return {f"p{q}": float(v) for q, v in zip(qs, values)}
+
+    def summary(self):
+        """One-line 'name p50=.. p95=.. p99=.. max=..' string (empty window -> 'name n/a')."""
+        pct = self.percentiles()
+        if not pct:
+            return f"{self.name} n/a"
+        text = " ".join(f"{k}={v:.1f}" for k, v in pct.items())
+        return f"{self.name} {text} max={self.max_seen:.1f}ms (n={len(self.samples)})"
+
+
+async def monitor_event_loop_lag(window, interval_s=0.01, report_every_s=None):
+    """
+    Measure asyncio event-loop lag: how late a sleep(interval_s) wakes up.
+    Anything blocking the loop (MediaPipe, waitKey) shows up as lag here.
+    """
+    report_every_s = float(report_every_s if report_every_s is not None else getattr(config, "STATS_PRINT_INTERVAL_S", 5.0))
+    loop = asyncio.get_running_loop()
+    last_report = loop.time()
+    while True:
+        t0 = loop.time()
+        await asyncio.sleep(interval_s)
+        now = loop.time()
+        window.add(max(0.0, (now - t0 - interval_s) * 1000.0))
+        if report_every_s > 0 and now - last_report >= report_every_s:
+            print(f"[loop-lag] {window.summary()}")
+            window.max_seen = 0.0
+            last_report = now
@@ -3,15 +3,57 @@ import httpx
 import asyncio
 import time
 from . import config
+from .perf_stats import LatencyWindow, RateStats
 import json
 
 class RobotCommunicator:
+    """
+    Sends movement commands to the ESP32 from one long-lived sender task.
+    submit() never blocks and creates no task: it puts the command in a
+    latest-value mailbox, replacing one not sent yet. The sender posts the
+    newest pending command as soon as the previous request has completed and
+    the pacing allows (MIN_TIME_BETWEEN_ANY_COMMAND_MS between any two
+    requests, COMMAND_SEND_INTERVAL_MS before repeating the command the robot
+    already has).
+    Counters: sent, coalesced (pending command replaced by a different one),
+    dropped (still pending at close), failed.
+
+    Adaptive pacing (COMMAND_ADAPTIVE_PACING): every acknowledged request
+    feeds an RTT EWMA and p95; the gap between requests becomes
+    max(COMMAND_RTT_FACTOR * EWMA, p95), clamped, and the repeat interval
+    twice that. Timeouts double a backoff multiplier, successes halve it.
+    The connection is opened at initialize() and kept warm with GET /status
+    while idle.
+
+    submit() may carry the capture time of the frame the command comes from;
+    `gesture_latency` collects capture -> request sent for the first frame
+    showing a new command (repeats of what the robot already has are not counted).
+    """
+
     def __init__(self):
         self.http_client = None
         self.is_request_in_flight = False
         self.last_sent_command_to_robot = None
         self.last_sent_speed_to_robot = None
         self.last_command_time_robot = 0
+        self._last_ping_time = 0   # keepalive only: never paces commands
+        self._pending = None       # (direction, speed) waiting for the sender
+        self._pending_since = None # capture time of the first frame that asked for _pending
+        self.gesture_latency = LatencyWindow("gesture -> sent")
+        self._wakeup = None        # set by submit()
+        self._sender_task = None
+        self._ping_task = None     # keepalive ping, runs beside the sender
+        self.stats = RateStats("commands")
+        self.adaptive = getattr(config, "COMMAND_ADAPTIVE_PACING", True)
+        self.rtt = LatencyWindow("command rtt", maxlen=200)
+        self.rtt_ewma_ms = None
+        self.rtt_p95_ms = None     # refreshed every few samples
+        self.backoff = 1.0
+        self.timeouts = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failed = 0
 
     async def initialize(self):
         if self.http_client is None:
@@ -19,58 +61,207 @@ class RobotCommunicator:
             timeout = httpx.Timeout(config.HTTP_TIMEOUT_READ, connect=config.HTTP_TIMEOUT_CONNECT)
             self.http_client = httpx.AsyncClient(timeout=timeout, limits=limits)
             print("RobotCommunicator: Async HTTP client initialized.")
+            await self._prewarm()
+        if self._sender_task is None:
+            self._wakeup = asyncio.Event()
+            self._sender_task = asyncio.create_task(self._sender_loop())
 
     async def close(self):
+        if self._sender_task is not None:
+            self._sender_task.cancel()
+            try:
+                await self._sender_task
+            except asyncio.CancelledError:
+                pass
+            self._sender_task = None
+        if self._ping_task is not None:
+            self._ping_task.cancel()
+            try:
+                await self._ping_task
+            except asyncio.CancelledError:
+                pass
+            self._ping_task = None
+        if self._pending is not None:
+            self._pending = None
+            self.dropped += 1
         if self.http_client:
             await self.http_client.aclose()
             self.http_client = None
             print("RobotCommunicator: Async HTTP client closed.")
+        print(f"RobotCommunicator: commands sent={self.sent} coalesced={self.coalesced} "
+              f"dropped={self.dropped} failed={self.failed}")
 
-    async def send_command(self, direction, speed=config.DEFAULT_SPEED):
+    def submit(self, direction, speed=config.DEFAULT_SPEED, timestamp=None):
+        """Make this the next command to send (call from the event loop thread)."""
         if not direction:
             return
+        command = (direction, int(speed))
+        if command != self._pending:
+            new = command != (self.last_sent_command_to_robot, self.last_sent_speed_to_robot)
+            self._pending_since = timestamp if new else None
+        if self._pending is not None and self._pending != command:
+            self.coalesced += 1  # a repeat of the pending command loses nothing
+            self.stats.add("coalesced")
+        self._pending = command
+        if self._wakeup is not None:
+            self._wakeup.set()
 
-        if not self.http_client:
-            print("RobotCommunicator: HTTP client not initialized. Command not sent.")
-            return
+    async def flush(self, timeout=1.0):
+        """Wait until the pending command has been sent (or `timeout` seconds)."""
+        deadline = time.perf_counter() + timeout
+        while (self._pending is not None or self.is_request_in_flight) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+
+    def send_intervals_ms(self):
+        """(min gap between any two requests, repeat interval for an unchanged command) in ms."""
+        if not self.adaptive or self.rtt_ewma_ms is None:
+            gap = config.MIN_TIME_BETWEEN_ANY_COMMAND_MS * self.backoff
+            repeat = config.COMMAND_SEND_INTERVAL_MS * self.backoff
+            return gap, repeat
+        gap = max(getattr(config, "COMMAND_RTT_FACTOR", 1.5) * self.rtt_ewma_ms, self.rtt_p95_ms or 0.0)
+        gap = min(max(gap * self.backoff, getattr(config, "COMMAND_MIN_INTERVAL_MS", 40)),
+                  getattr(config, "COMMAND_MAX_INTERVAL_MS", 1000))
+        return gap, 2.0 * gap
+
+    def rtt_stats(self):
+        """RTT/pacing snapshot for logging."""
+        gap, repeat = self.send_intervals_ms()
+        pct = self.rtt.percentiles()
+        return {
+            "rtt_ewma_ms": self.rtt_ewma_ms,
+            "rtt_p50_ms": pct.get("p50"),
+            "rtt_p95_ms": pct.get("p95"),
+            "rtt_p99_ms": pct.get("p99"),
+            "gap_ms": gap,
+            "repeat_ms": repeat,
+            "backoff": self.backoff,
+            "timeouts": self.timeouts,
+        }
+
+    def _record_rtt(self, ms):
+        self.rtt.add(ms)
+        self.rtt_ewma_ms = ms if self.rtt_ewma_ms is None else self.rtt_ewma_ms + 0.2 * (ms - self.rtt_ewma_ms)
+        if self.rtt_p95_ms is None or len(self.rtt.samples) % 16 == 0:
+            self.rtt_p95_ms = self.rtt.percentiles((95,))["p95"]
+        self.backoff = max(1.0, self.backoff * 0.5)
 
-        current_time_ms = time.time() * 1000
+    def _record_timeout(self):
+        self.timeouts += 1
+        self.stats.add("timeouts")
+        self.backoff = min(self.backoff * 2.0, 16.0)
 
+    def _pacing_delay_ms(self, command):
+        now_ms = time.time() * 1000
+        gap, repeat = self.send_intervals_ms()
         # Prevent flooding the ESP32 with any command too quickly
-        if current_time_ms - self.last_command_time_robot < config.MIN_TIME_BETWEEN_ANY_COMMAND_MS:
-            return
+        delay = self.last_command_time_robot + gap - now_ms
+        # Same command/speed as the robot already has: only resend after the repeat interval
+        if command == (self.last_sent_command_to_robot, self.last_sent_speed_to_robot):
+            delay = max(delay, self.last_command_time_robot + repeat - now_ms)
+        return delay
 
-        # Send if command OR speed changed, or enough time passed for resending same command/speed
-        if (direction == self.last_sent_command_to_robot and speed == self.last_sent_speed_to_robot) and \
-           (current_time_ms - self.last_command_time_robot < config.COMMAND_SEND_INTERVAL_MS):
-            return
+    async def _prewarm(self):
+        """Open the connection now so the first command does not pay the TCP connect."""
+        t0 = time.perf_counter()
+        if await self._ping(record_rtt=False):  # includes the TCP connect: not an RTT sample
+            print(f"RobotCommunicator: connection to the ESP32 ready ({(time.perf_counter() - t0) * 1000:.0f} ms).")
+        else:
+            print("RobotCommunicator: ESP32 not reachable yet; commands will connect on demand.")
+
+    async def _ping(self, record_rtt=True):
+        endpoint = getattr(config, "ESP32_STATUS_ENDPOINT", None)
+        if not endpoint:
+            return False
+        t0 = time.perf_counter()
+        try:
+            response = await self.http_client.get(endpoint)
+            response.raise_for_status()
+            if record_rtt:
+                self._record_rtt((time.perf_counter() - t0) * 1000.0)
+            return True
+        except (httpx.ReadTimeout, httpx.ConnectTimeout):
+            self._record_timeout()
+        except httpx.HTTPError:
+            pass
+        return False
 
+    async def _sender_loop(self):
+        keepalive_s = getattr(config, "COMMAND_KEEPALIVE_S", 2.0)
+        while True:
+            if self._pending is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), keepalive_s if keepalive_s > 0 else None)
+                except asyncio.TimeoutError:
+                    now_ms = time.time() * 1000
+                    idle_ms = now_ms - max(self.last_command_time_robot, self._last_ping_time)
+                    if idle_ms >= keepalive_s * 1000 and (self._ping_task is None or self._ping_task.done()):
+                        # Idle: keep the connection (and the RTT estimate) alive. Not awaited, so a
+                        # command submitted meanwhile goes out at once instead of after the ping.
+                        self._last_ping_time = now_ms
+                        self._ping_task = asyncio.create_task(self._ping())
+                continue
+            delay_ms = self._pacing_delay_ms(self._pending)
+            if delay_ms > 0:
+                # A different command may arrive meanwhile and be due sooner
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay_ms / 1000.0)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            command, self._pending = self._pending, None
+            since, self._pending_since = self._pending_since, None
+            if since is not None:
+                self.gesture_latency.add((time.time() - since) * 1000.0)
+            await self._post(*command)
+            if self.stats.maybe_report() is not None:
+                rtt = self.rtt_stats()
+                print(f"[commands] {self.rtt.summary()}, gap={rtt['gap_ms']:.0f}ms "
+                      f"repeat={rtt['repeat_ms']:.0f}ms backoff=x{rtt['backoff']:.0f}")
+                print(f"[commands] {self.gesture_latency.summary()}")
 
-        if self.is_request_in_flight:
-            # print(f"RobotCommunicator: Request for '{self.last_sent_command_to_robot}' still in flight. Skipping '{command}'.")
+    async def _post(self, direction, speed):
+        if not self.http_client:
+            print("RobotCommunicator: HTTP client not initialized. Command not sent.")
             return
 
         self.is_request_in_flight = True
+        self.last_command_time_robot = time.time() * 1000  # pacing counts from the attempt
         payload = {"direction": direction, "speed": int(speed)}
-        
+
          # --- Print JSON payload for debugging ---
         json_payload_str = json.dumps(payload)
         print(f"RobotCommunicator: Attempting to send payload: {json_payload_str}")
 
+        ok = False
+        t0 = time.perf_counter()
         try:
             response = await self.http_client.post(config.ESP32_MOVE_ENDPOINT, json=payload)
             response.raise_for_status()
             print(f"RobotCommunicator: Sent '{direction}', ESP32 Response: {response.status_code} - {response.text}")
             self.last_sent_command_to_robot = direction
             self.last_sent_speed_to_robot = speed
-            self.last_command_time_robot = current_time_ms
+            ok = True
         except httpx.ReadTimeout:
+            self._record_timeout()
             print(f"RobotCommunicator: ReadTimeout sending command '{direction}'.")
         except httpx.ConnectTimeout:
+             self._record_timeout()
              print(f"RobotCommunicator: ConnectTimeout sending command '{direction}'.")
         except httpx.RequestError as e:
             print(f"RobotCommunicator: Error sending command '{direction}': {e}")
         except Exception as e:
             print(f"RobotCommunicator: Unexpected error sending command '{direction}': {e}")
         finally:
-            self.is_request_in_flight = False
\ No newline at end of file
+            self.is_request_in_flight = False
+
+        if ok:
+            self.sent += 1
+            self.stats.add("sent")
+            self._record_rtt((time.perf_counter() - t0) * 1000.0)
+        else:
+            self.failed += 1
+            self.stats.add("failed")
+            if self._pending is None:
+                self._pending = (direction, speed)  # retry unless something newer is waiting
@@ -25,3 +25,8 @@ MIN_SPEED = 50
 MAX_SPEED = 255
 SPEED_CONTROL_MIN_DIST = 20
 SPEED_CONTROL_MAX_DIST = 200
+
+# Temporal filter for published gesture commands.
+GESTURE_FILTER_WINDOW = 5
+GESTURE_SPEED_STEP = 16
+GESTURE_SPEED_HYSTERESIS = 4
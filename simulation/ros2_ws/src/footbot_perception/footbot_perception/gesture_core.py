@@ -0,0 +1,142 @@
+"""Array-backed gesture classification shared with the legacy manual control app.
+
+A hand's 21 landmarks become one (21, 3) array, the five finger states are
+computed together as a 5-bit mask (bit i = finger i down, thumb = bit 0) and
+the mask indexes a precomputed 32-entry command table.
+
+manual_control/gesture_core.py is a copy of this module (the two packages
+cannot import each other): change both together. test/test_gesture_core.py
+checks the table against the original if-chain and the two copies against
+each other.
+"""
+
+import math
+
+import numpy as np
+
+from footbot_perception import gesture_config as config
+
+FINGERS = ('THUMB', 'INDEX', 'MIDDLE', 'RING', 'PINKY')
+TIP_IDS = np.array([config.FINGER_TIPS[finger] for finger in FINGERS])
+MCP_IDS = np.array([config.FINGER_MCP[finger] for finger in FINGERS])
+MASK_WEIGHTS = 1 << np.arange(len(FINGERS))
+NUM_LANDMARKS = 21
+
+# Flat (21 * 3) indices read by finger_mask(): tip y and MCP y of every
+# finger, then thumb tip x and thumb MCP x.
+_MASK_IDX = np.concatenate([
+    TIP_IDS * 3 + 1,
+    MCP_IDS * 3 + 1,
+    [TIP_IDS[0] * 3, MCP_IDS[0] * 3],
+])
+# Thumb tip x, y and index tip x, y (speed).
+_SPEED_IDX = np.array([
+    config.FINGER_TIPS['THUMB'] * 3,
+    config.FINGER_TIPS['THUMB'] * 3 + 1,
+    config.FINGER_TIPS['INDEX'] * 3,
+    config.FINGER_TIPS['INDEX'] * 3 + 1,
+])
+
+
+def _rule(status):
+    """Apply the original classify_gesture if-chain to 5 finger states."""
+    thumb, index, middle, ring, pinky = status
+    if not thumb and not index and middle and ring and pinky:
+        return 'left'
+    if not thumb and index and middle and ring and not pinky:
+        return 'right'
+    if not thumb and index and middle and ring and pinky:
+        return 'backward'
+    if all(status):
+        return 'forward'
+    if not any(status):
+        return 'stop'
+    return None
+
+
+def mask_to_status(mask):
+    """Return the 5 finger-down booleans encoded in a mask."""
+    return [bool(mask >> i & 1) for i in range(len(FINGERS))]
+
+
+# Mask -> command (None: no gesture), built from the rules above.
+GESTURE_TABLE = tuple(
+    _rule(mask_to_status(mask)) for mask in range(1 << len(FINGERS))
+)
+_GESTURE_ARRAY = np.array(GESTURE_TABLE, dtype=object)
+
+
+def landmarks_to_array(landmarks, out=None):
+    """Return a (21, 3) float64 array of landmark x, y, z."""
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 3), dtype=np.float64)
+    out.reshape(-1)[:] = [
+        value for lm in landmarks for value in (lm.x, lm.y, lm.z)
+    ]
+    return out
+
+
+def finger_mask(points, handedness='Right'):
+    """Return the 5-bit finger-down mask of a (21, 3) landmark array."""
+    values = points.reshape(-1).take(_MASK_IDX).tolist()
+    # Thumb: tucked across the palm, mirrored for the left hand.
+    if handedness == 'Right':
+        mask = int(values[10] > values[11])
+    else:
+        mask = int(values[10] < values[11])
+    for i in range(1, 5):
+        # Fingers: tip below (greater y) the MCP joint.
+        mask |= (values[i] > values[i + 5]) << i
+    return mask
+
+
+def finger_masks(points, handedness='Right'):
+    """Return finger_mask() of a whole (N, 21, 3) sequence as an (N,) array."""
+    down = points[:, TIP_IDS, 1] > points[:, MCP_IDS, 1]
+    thumb_x = points[:, TIP_IDS[0], 0]
+    thumb_mcp_x = points[:, MCP_IDS[0], 0]
+    if handedness == 'Right':
+        down[:, 0] = thumb_x > thumb_mcp_x
+    else:
+        down[:, 0] = thumb_x < thumb_mcp_x
+    return down.astype(np.int64) @ MASK_WEIGHTS
+
+
+def classify_mask(mask):
+    """Return the command of a finger mask (None: no gesture)."""
+    return GESTURE_TABLE[mask]
+
+
+def classify_masks(masks):
+    """Return an object array with the command of every mask."""
+    return _GESTURE_ARRAY[masks]
+
+
+def classify_points(points, handedness='Right'):
+    """Return the command of a (21, 3) landmark array."""
+    return GESTURE_TABLE[finger_mask(points, handedness)]
+
+
+def speed_from_points(points, frame_width, frame_height):
+    """Map the thumb-index tip distance in pixels to an ESP32-style speed."""
+    thumb_x, thumb_y, index_x, index_y = (
+        points.reshape(-1).take(_SPEED_IDX).tolist()
+    )
+    dx = int(thumb_x * frame_width) - int(index_x * frame_width)
+    dy = int(thumb_y * frame_height) - int(index_y * frame_height)
+    distance = math.sqrt(dx * dx + dy * dy)
+    clamped_dist = max(
+        config.SPEED_CONTROL_MIN_DIST,
+        min(distance, config.SPEED_CONTROL_MAX_DIST),
+    )
+    normalized_dist = (
+        (clamped_dist - config.SPEED_CONTROL_MIN_DIST) /
+        (config.SPEED_CONTROL_MAX_DIST - config.SPEED_CONTROL_MIN_DIST)
+    )
+    speed = int(
+        config.MIN_SPEED +
+        normalized_dist * (config.MAX_SPEED - config.MIN_SPEED)
+    )
+    return max(config.MIN_SPEED, min(speed, config.MAX_SPEED))
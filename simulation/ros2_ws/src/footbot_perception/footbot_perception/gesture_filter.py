@@ -0,0 +1,101 @@
+"""Temporal filtering of gesture commands against single-frame jitter."""
+
+from collections import deque
+
+from footbot_perception import gesture_config as config
+
+
+class GestureFilter:
+    """Debounce direction and speed before they are published.
+
+    Direction is a majority vote over the last ``window`` raw directions: the
+    output only switches when another direction holds a strict majority.
+    Speed is quantized to ``speed_step`` steps from DEFAULT_SPEED (the speed
+    published without a left hand stays exact), clamped to MIN_SPEED and
+    MAX_SPEED, and the step only changes once the raw speed is more than
+    ``speed_hysteresis`` past the midpoint to the next step. window=1 and
+    speed_step=1 pass values through.
+    """
+
+    def __init__(
+        self,
+        window=config.GESTURE_FILTER_WINDOW,
+        speed_step=config.GESTURE_SPEED_STEP,
+        speed_hysteresis=config.GESTURE_SPEED_HYSTERESIS,
+    ):
+        self.window = max(1, int(window))
+        self.speed_step = max(1, int(speed_step))
+        self.speed_hysteresis = max(0.0, float(speed_hysteresis))
+        self._history = deque(maxlen=self.window)
+        self.direction = None
+        self.speed = None
+        self._last_raw = None
+        self.frames = 0
+        self.raw_changes = 0
+        self.changes = 0
+        self.suppressed = 0
+
+    def update(self, direction, speed):
+        """Feed one frame's raw command and return the filtered one."""
+        self.frames += 1
+        previous = (self.direction, self.speed)
+        self._history.append(direction)
+        self.direction = self._vote(direction)
+        self.speed = self._quantize(int(speed))
+
+        raw = (direction, int(speed))
+        output = (self.direction, self.speed)
+        if self._last_raw is not None:
+            if raw != self._last_raw:
+                self.raw_changes += 1
+                if output == previous:
+                    self.suppressed += 1
+            if output != previous:
+                self.changes += 1
+        self._last_raw = raw
+        return output
+
+    def _vote(self, direction):
+        if self.direction is None or self.window == 1:
+            return direction
+        counts = {}
+        for item in self._history:
+            counts[item] = counts.get(item, 0) + 1
+        best = max(counts, key=counts.get)
+        if best != self.direction and counts[best] * 2 > len(self._history):
+            return best
+        return self.direction
+
+    def _quantize(self, speed):
+        step = self.speed_step
+        if step == 1:
+            return speed
+        level = config.DEFAULT_SPEED + round(
+            (speed - config.DEFAULT_SPEED) / step) * step
+        level = max(config.MIN_SPEED, min(level, config.MAX_SPEED))
+        if self.speed is None or level == self.speed:
+            return level
+        if abs(speed - self.speed) <= step / 2.0 + self.speed_hysteresis:
+            return self.speed
+        return level
+
+    def reset(self):
+        """Forget the vote history; counters are kept."""
+        self._history.clear()
+        self.direction = None
+        self.speed = None
+        self._last_raw = None
+
+    def summary(self):
+        """Return the counters as one log line."""
+        return (
+            'gesture filter: %d frames, %d raw changes, %d published, '
+            '%d suppressed (window %d, speed step %d)' % (
+                self.frames,
+                self.raw_changes,
+                self.changes,
+                self.suppressed,
+                self.window,
+                self.speed_step,
+            )
+        )
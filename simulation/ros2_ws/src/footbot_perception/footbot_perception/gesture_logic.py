@@ -1,12 +1,35 @@
 """Gesture classification helpers adapted from the legacy manual control app."""
 
-import math
-
 from footbot_perception import gesture_config as config
+from footbot_perception import gesture_core
 
 
 class GestureLogic:
-    """Classify hand landmarks into movement directions and speed values."""
+    """Classify hand landmarks into movement directions and speed values.
+
+    Backed by gesture_core: a hand is converted once to a (21, 3) array
+    (hand_array()), finger states become a 5-bit mask and the command comes
+    from a 32-entry table. The list-based methods accept landmark lists or
+    arrays.
+    """
+
+    def hand_array(self, landmarks):
+        """Return a (21, 3) array of the hand landmarks, or None."""
+        if landmarks is None or len(landmarks) == 0:
+            return None
+        return gesture_core.landmarks_to_array(landmarks)
+
+    def classify_hand(self, points, handedness='Right'):
+        """Return the direction of a hand array (None: no gesture)."""
+        if points is None:
+            return 'stop'
+        return gesture_core.classify_points(points, handedness)
+
+    def speed_from_hand(self, points, frame_width, frame_height):
+        """Return an ESP32-style speed from a left-hand array."""
+        if points is None:
+            return config.DEFAULT_SPEED
+        return gesture_core.speed_from_points(points, frame_width, frame_height)
 
     def is_finger_down(self, landmarks, finger_tip_id, finger_mcp_id, handedness):
         """Return true when a single finger appears curled/down."""
@@ -25,93 +48,34 @@ class GestureLogic:
 
     def get_fingers_status(self, landmarks, handedness):
         """Return down/up status for thumb, index, middle, ring, and pinky."""
-        if not landmarks:
+        points = self.hand_array(landmarks)
+        if points is None:
             return None
-
-        return [
-            self.is_finger_down(
-                landmarks,
-                config.FINGER_TIPS['THUMB'],
-                config.FINGER_MCP['THUMB'],
-                handedness,
-            ),
-            self.is_finger_down(
-                landmarks,
-                config.FINGER_TIPS['INDEX'],
-                config.FINGER_MCP['INDEX'],
-                handedness,
-            ),
-            self.is_finger_down(
-                landmarks,
-                config.FINGER_TIPS['MIDDLE'],
-                config.FINGER_MCP['MIDDLE'],
-                handedness,
-            ),
-            self.is_finger_down(
-                landmarks,
-                config.FINGER_TIPS['RING'],
-                config.FINGER_MCP['RING'],
-                handedness,
-            ),
-            self.is_finger_down(
-                landmarks,
-                config.FINGER_TIPS['PINKY'],
-                config.FINGER_MCP['PINKY'],
-                handedness,
-            ),
-        ]
+        return gesture_core.mask_to_status(
+            gesture_core.finger_mask(points, handedness)
+        )
 
     def classify_gesture(self, right_hand_fingers_status):
         """Convert right-hand finger status into a movement direction."""
         if right_hand_fingers_status is None:
             return 'stop'
 
-        thumb, index, middle, ring, pinky = right_hand_fingers_status
-
-        if not thumb and not index and middle and ring and pinky:
-            return 'left'
-        if not thumb and index and middle and ring and not pinky:
-            return 'right'
-        if not thumb and index and middle and ring and pinky:
-            return 'backward'
-        if all(right_hand_fingers_status):
-            return 'forward'
-        if not any(right_hand_fingers_status):
-            return 'stop'
-
-        return None
+        mask = sum(
+            1 << index
+            for index, down in enumerate(right_hand_fingers_status)
+            if down
+        )
+        return gesture_core.classify_mask(mask)
 
     def calculate_speed_from_left_hand(self, landmarks, frame_width, frame_height):
         """Return an ESP32-style speed value from left thumb/index distance."""
-        if not landmarks:
-            return config.DEFAULT_SPEED
-
         try:
-            thumb_tip = landmarks[config.FINGER_TIPS['THUMB']]
-            index_tip = landmarks[config.FINGER_TIPS['INDEX']]
-
-            thumb_x = int(thumb_tip.x * frame_width)
-            thumb_y = int(thumb_tip.y * frame_height)
-            index_x = int(index_tip.x * frame_width)
-            index_y = int(index_tip.y * frame_height)
-            distance = math.sqrt(
-                (thumb_x - index_x) ** 2 + (thumb_y - index_y) ** 2
-            )
-
-            clamped_dist = max(
-                config.SPEED_CONTROL_MIN_DIST,
-                min(distance, config.SPEED_CONTROL_MAX_DIST),
-            )
-            normalized_dist = (
-                (clamped_dist - config.SPEED_CONTROL_MIN_DIST) /
-                (config.SPEED_CONTROL_MAX_DIST - config.SPEED_CONTROL_MIN_DIST)
-            )
-            speed = int(
-                config.MIN_SPEED +
-                normalized_dist * (config.MAX_SPEED - config.MIN_SPEED)
+            return self.speed_from_hand(
+                self.hand_array(landmarks),
+                frame_width,
+                frame_height,
             )
-            return max(config.MIN_SPEED, min(speed, config.MAX_SPEED))
-        except (IndexError, AttributeError, TypeError):
+        except (IndexError, AttributeError, TypeError, ValueError):
             return config.DEFAULT_SPEED
 
 
@@ -0,0 +1,177 @@
+"""Record hand landmarks and replay them through the gesture command path.
+
+Recordings are the .npz files written by manual_control's LandmarkRecorder:
+timestamps (F,), frame_size (F, 2), hand_frame (H,), points (H, 21, 3) and
+handedness (H,). Replay feeds every frame to HandDetectorNode.extract_command
+and the GestureFilter at full speed, without MediaPipe or a running graph.
+"""
+
+import argparse
+import hashlib
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from footbot_perception import gesture_config as config
+from footbot_perception import gesture_core
+from footbot_perception.gesture_filter import GestureFilter
+
+
+class LandmarkRecorder:
+    """Collect detected hands per frame and save them on close()."""
+
+    def __init__(self, path):
+        self.path = path
+        self.timestamps = []
+        self.frame_size = []
+        self.hand_frame = []
+        self.points = []
+        self.handedness = []
+
+    def add(self, timestamp, hands, frame_width, frame_height):
+        """Add one frame of (landmarks, handedness) pairs."""
+        frame = len(self.timestamps)
+        self.timestamps.append(timestamp)
+        self.frame_size.append((frame_width, frame_height))
+        for landmarks, handedness in hands:
+            points = gesture_core.landmarks_to_array(landmarks)
+            self.hand_frame.append(frame)
+            self.points.append(points.astype(np.float32))
+            self.handedness.append(handedness)
+
+    def close(self):
+        """Write the recording (once)."""
+        if self.path is None:
+            return
+        if self.points:
+            points = np.stack(self.points)
+        else:
+            points = np.empty((0, gesture_core.NUM_LANDMARKS, 3), np.float32)
+        np.savez_compressed(
+            self.path,
+            timestamps=np.asarray(self.timestamps, dtype=np.float64),
+            frame_size=np.asarray(self.frame_size, dtype=np.int32).reshape(-1, 2),
+            hand_frame=np.asarray(self.hand_frame, dtype=np.int32),
+            points=points,
+            handedness=np.asarray(self.handedness, dtype=str),
+        )
+        self.path = None
+
+
+def read_landmarks(path):
+    """Yield (timestamp, width, height, hands) for every recorded frame."""
+    with np.load(path) as data:
+        timestamps = data['timestamps']
+        frame_size = data['frame_size']
+        hand_frame = data['hand_frame']
+        points = data['points'].astype(np.float64)
+        handedness = data['handedness'].tolist()
+    starts = np.searchsorted(hand_frame, np.arange(len(timestamps) + 1))
+    for index, timestamp in enumerate(timestamps.tolist()):
+        hands = [
+            (points[j], handedness[j])
+            for j in range(starts[index], starts[index + 1])
+        ]
+        yield (
+            timestamp,
+            int(frame_size[index, 0]),
+            int(frame_size[index, 1]),
+            hands,
+        )
+
+
+def to_results(hands):
+    """Wrap recorded hands in the shape of a MediaPipe Hands result."""
+    if not hands:
+        return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+    return SimpleNamespace(
+        multi_hand_landmarks=[
+            SimpleNamespace(landmark=points) for points, _ in hands
+        ],
+        multi_handedness=[
+            SimpleNamespace(classification=[SimpleNamespace(label=label)])
+            for _, label in hands
+        ],
+    )
+
+
+def run_lengths(commands):
+    """Collapse a command sequence into [command, count] runs."""
+    runs = []
+    for command in commands:
+        if runs and runs[-1][0] == command:
+            runs[-1][1] += 1
+        else:
+            runs.append([command, 1])
+    return runs
+
+
+def command_digest(commands):
+    """Return a short digest of a command sequence."""
+    digest = hashlib.sha1()
+    for direction, speed in commands:
+        digest.update(('%s,%d;' % (direction, speed)).encode())
+    return digest.hexdigest()[:16]
+
+
+def replay(frames, gesture_filter=None, lost_hand_direction='stop'):
+    """Run extract_command (and the filter) over recorded frames."""
+    from footbot_perception.gesture_logic import GestureLogic
+    from footbot_perception.hand_detector_node import HandDetectorNode
+
+    # extract_command only needs these attributes of the node.
+    node = SimpleNamespace(
+        gesture_logic=GestureLogic(),
+        lost_hand_direction=lost_hand_direction,
+        default_speed=config.DEFAULT_SPEED,
+        get_detection_data=HandDetectorNode.get_detection_data,
+    )
+    raw = []
+    published = []
+    start = time.perf_counter()
+    for _, width, height, hands in frames:
+        frame = SimpleNamespace(shape=(height, width, 3))
+        command = HandDetectorNode.extract_command(node, to_results(hands), frame)
+        raw.append(command)
+        if gesture_filter is not None:
+            command = gesture_filter.update(*command)
+        published.append(command)
+    return raw, published, time.perf_counter() - start
+
+
+def main(args=None):
+    """Replay a landmark recording through the hand detector's command path."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('recording', help='.npz landmark recording')
+    parser.add_argument('--no-filter', action='store_true')
+    parser.add_argument('--window', type=int, default=config.GESTURE_FILTER_WINDOW)
+    parser.add_argument('--speed-step', type=int, default=config.GESTURE_SPEED_STEP)
+    options = parser.parse_args(args)
+
+    frames = list(read_landmarks(options.recording))
+    if not frames:
+        print('Recording has no frames.')
+        return
+    gesture_filter = None
+    if not options.no_filter:
+        gesture_filter = GestureFilter(options.window, options.speed_step)
+    raw, published, elapsed = replay(frames, gesture_filter)
+
+    count = len(frames)
+    print('%d frames in %.3f s: %.1f us/frame, %.0f frames/s' % (
+        count, elapsed, elapsed * 1e6 / count, count / max(elapsed, 1e-9)))
+    print('Raw commands: %d changes, digest %s' % (
+        len(run_lengths(raw)) - 1, command_digest(raw)))
+    if gesture_filter is not None:
+        print('Published commands: %d changes, digest %s' % (
+            len(run_lengths(published)) - 1, command_digest(published)))
+        print(gesture_filter.summary())
+    print(' '.join(
+        '%s@%dx%d' % (direction, speed, runs)
+        for (direction, speed), runs in run_lengths(published)[:30]
+    ))
+
+
+if __name__ == '__main__':
+    main()
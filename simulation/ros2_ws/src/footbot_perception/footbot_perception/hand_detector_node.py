@@ -8,7 +8,9 @@ from sensor_msgs.msg import Image
 from std_msgs.msg import Float32, String
 
 from footbot_perception import gesture_config as config
+from footbot_perception.gesture_filter import GestureFilter
 from footbot_perception.gesture_logic import GestureLogic, normalize_speed
+from footbot_perception.gesture_replay import LandmarkRecorder
 
 
 class HandDetectorNode(Node):
@@ -33,6 +35,17 @@ class HandDetectorNode(Node):
         self.declare_parameter('selfie_view', True)
         self.declare_parameter('lost_hand_direction', 'stop')
         self.declare_parameter('default_speed', config.DEFAULT_SPEED)
+        self.declare_parameter(
+            'gesture_filter_window',
+            config.GESTURE_FILTER_WINDOW,
+        )
+        self.declare_parameter('gesture_speed_step', config.GESTURE_SPEED_STEP)
+        self.declare_parameter(
+            'gesture_speed_hysteresis',
+            float(config.GESTURE_SPEED_HYSTERESIS),
+        )
+        self.declare_parameter('filter_log_interval_s', 10.0)
+        self.declare_parameter('landmark_record_path', '')
 
         self.image_topic = self.get_parameter('image_topic').value
         self.debug_image_topic = self.get_parameter('debug_image_topic').value
@@ -47,8 +60,20 @@ class HandDetectorNode(Node):
 
         self.bridge = CvBridge()
         self.gesture_logic = GestureLogic()
+        self.gesture_filter = GestureFilter(
+            window=int(self.get_parameter('gesture_filter_window').value),
+            speed_step=int(self.get_parameter('gesture_speed_step').value),
+            speed_hysteresis=float(
+                self.get_parameter('gesture_speed_hysteresis').value
+            ),
+        )
+        self.landmark_recorder = None
+        record_path = self.get_parameter('landmark_record_path').value
+        if record_path:
+            self.landmark_recorder = LandmarkRecorder(record_path)
         self.mp_hands = None
         self.hands_model = None
+        self.image_rgb = None
         self.mp_drawing = None
         self.mp_drawing_styles = None
         self.initialize_mediapipe()
@@ -76,6 +101,11 @@ class HandDetectorNode(Node):
         self.get_logger().info(
             'Detecting hand gestures from %s' % self.image_topic
         )
+        filter_log_interval = float(
+            self.get_parameter('filter_log_interval_s').value
+        )
+        if filter_log_interval > 0.0:
+            self.create_timer(filter_log_interval, self.log_filter_stats)
 
     def initialize_mediapipe(self):
         """Initialize MediaPipe Hands and drawing helpers."""
@@ -110,35 +140,53 @@ class HandDetectorNode(Node):
             self.publish_gesture(self.lost_hand_direction, self.default_speed)
             return
 
+        draw = self.debug_publisher is not None
         if self.selfie_view:
             frame = cv2.flip(frame, 1)
-
-        results, output_frame = self.detect_hands(frame)
+        elif draw:
+            # The converted image may share the message buffer; draw on a copy.
+            frame = frame.copy()
+
+        results, output_frame = self.detect_hands(frame, draw)
+        if self.landmark_recorder is not None:
+            height, width = frame.shape[:2]
+            self.landmark_recorder.add(
+                self.get_clock().now().nanoseconds * 1e-9,
+                self.get_detection_data(results),
+                width,
+                height,
+            )
         direction, speed = self.extract_command(results, output_frame)
+        # Majority vote and speed hysteresis: jitter must not flip the command.
+        direction, speed = self.gesture_filter.update(direction, speed)
         self.publish_gesture(direction, speed)
 
         if self.debug_publisher is not None:
             self.draw_status_overlay(output_frame, direction, speed)
             self.publish_debug_image(output_frame, image_msg.header)
 
-    def detect_hands(self, frame):
-        """Run MediaPipe and draw landmarks onto a debug image."""
-        image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        image_rgb.flags.writeable = False
-        results = self.hands_model.process(image_rgb)
-        image_rgb.flags.writeable = True
-        output_frame = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
+    def detect_hands(self, frame, draw=True):
+        """Run MediaPipe and draw landmarks onto the frame itself."""
+        # Reused RGB buffer; the BGR frame doubles as the debug image.
+        self.image_rgb = cv2.cvtColor(
+            frame,
+            cv2.COLOR_BGR2RGB,
+            dst=self.image_rgb,
+        )
+        self.image_rgb.flags.writeable = False
+        results = self.hands_model.process(self.image_rgb)
+        self.image_rgb.flags.writeable = True
 
-        if results.multi_hand_landmarks:
+        if draw and results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
                 self.mp_drawing.draw_landmarks(
-                    output_frame,
+                    frame,
                     hand_landmarks,
                     self.mp_hands.HAND_CONNECTIONS,
                     self.mp_drawing_styles.get_default_hand_landmarks_style(),
                     self.mp_drawing_styles.get_default_hand_connections_style(),
                 )
-        return results, output_frame
+        return results, frame
 
     def extract_command(self, results, frame):
         """Extract right-hand direction and left-hand speed from detections."""
@@ -153,18 +201,18 @@ class HandDetectorNode(Node):
                 left_hand_landmarks = landmarks
 
         direction = self.lost_hand_direction
-        if right_hand_landmarks:
-            finger_status = self.gesture_logic.get_fingers_status(
-                right_hand_landmarks,
+        if right_hand_landmarks is not None:
+            # One (21, 3) array per hand: finger mask -> command table.
+            classified = self.gesture_logic.classify_hand(
+                self.gesture_logic.hand_array(right_hand_landmarks),
                 'Right',
             )
-            classified = self.gesture_logic.classify_gesture(finger_status)
             direction = classified or self.lost_hand_direction
 
         speed = self.default_speed
-        if left_hand_landmarks:
-            speed = self.gesture_logic.calculate_speed_from_left_hand(
-                left_hand_landmarks,
+        if left_hand_landmarks is not None:
+            speed = self.gesture_logic.speed_from_hand(
+                self.gesture_logic.hand_array(left_hand_landmarks),
                 frame_width,
                 frame_height,
             )
@@ -231,10 +279,17 @@ class HandDetectorNode(Node):
         debug_msg.header.frame_id = input_header.frame_id
         self.debug_publisher.publish(debug_msg)
 
+    def log_filter_stats(self):
+        """Log how many command changes the gesture filter suppressed."""
+        if self.gesture_filter.frames:
+            self.get_logger().info(self.gesture_filter.summary())
+
     def shutdown(self):
-        """Release MediaPipe resources."""
+        """Release MediaPipe resources and save a landmark recording."""
         if self.hands_model is not None:
             self.hands_model.close()
+        if self.landmark_recorder is not None:
+            self.landmark_recorder.close()
 
 
 def main(args=None):
@@ -26,6 +26,7 @@ setup(
         'console_scripts': [
             'ball_detector = footbot_perception.ball_detector_node:main',
             'debug_image_viewer = footbot_perception.debug_image_viewer_node:main',
+            'gesture_replay = footbot_perception.gesture_replay:main',
             'hand_detector = footbot_perception.hand_detector_node:main',
             'webcam_publisher = footbot_perception.webcam_publisher_node:main',
         ],
@@ -0,0 +1,156 @@
+"""Offline tests for the mask-table gesture classification.
+
+The table path is checked against the original per-finger, if-chain
+classification (written out here as it was before the table) for all 32
+finger masks and both hands, and against manual_control's copy of
+gesture_core when the repository checkout is available.
+"""
+
+import pathlib
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from footbot_perception import gesture_config as config
+from footbot_perception import gesture_core
+
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[5]
+FINGERS = ('THUMB', 'INDEX', 'MIDDLE', 'RING', 'PINKY')
+
+
+# --- The original classification --------------------------------------------
+
+def legacy_is_finger_down(landmarks, tip_id, mcp_id, handedness):
+    tip = landmarks[tip_id]
+    mcp = landmarks[mcp_id]
+    if tip_id == config.FINGER_TIPS['THUMB']:
+        if handedness == 'Right':
+            return tip.x > mcp.x
+        return tip.x < mcp.x
+    return tip.y > mcp.y
+
+
+def legacy_fingers_status(landmarks, handedness):
+    return [
+        legacy_is_finger_down(
+            landmarks,
+            config.FINGER_TIPS[finger],
+            config.FINGER_MCP[finger],
+            handedness,
+        )
+        for finger in FINGERS
+    ]
+
+
+def legacy_classify_gesture(status):
+    thumb, index, middle, ring, pinky = status
+    if not thumb and not index and middle and ring and pinky:
+        return 'left'
+    if not thumb and index and middle and ring and not pinky:
+        return 'right'
+    if not thumb and index and middle and ring and pinky:
+        return 'backward'
+    if all(status):
+        return 'forward'
+    if not any(status):
+        return 'stop'
+    return None
+
+
+def hand_showing(mask, handedness, rng):
+    """Return random (21, 3) landmarks whose fingers are down as in `mask`."""
+    points = rng.uniform(0.3, 0.7, size=(gesture_core.NUM_LANDMARKS, 3))
+    for bit, finger in enumerate(FINGERS):
+        tip = config.FINGER_TIPS[finger]
+        mcp = config.FINGER_MCP[finger]
+        down = bool(mask >> bit & 1)
+        if finger == 'THUMB':
+            # Down means tip x past the MCP, mirrored for the left hand.
+            sign = 1.0 if (handedness == 'Right') == down else -1.0
+            points[tip, 0] = points[mcp, 0] + sign * rng.uniform(0.01, 0.1)
+        else:
+            sign = 1.0 if down else -1.0
+            points[tip, 1] = points[mcp, 1] + sign * rng.uniform(0.01, 0.1)
+    return points
+
+
+def to_landmarks(points):
+    return [SimpleNamespace(x=x, y=y, z=z) for x, y, z in points.tolist()]
+
+
+# --- Table against the if-chain ----------------------------------------------
+
+@pytest.mark.parametrize('mask', range(32))
+def test_table_matches_if_chain(mask):
+    status = gesture_core.mask_to_status(mask)
+    assert gesture_core.classify_mask(mask) == legacy_classify_gesture(status)
+
+
+def test_table_has_one_mask_per_command():
+    commands = [c for c in gesture_core.GESTURE_TABLE if c is not None]
+    assert sorted(commands) == ['backward', 'forward', 'left', 'right', 'stop']
+
+
+@pytest.mark.parametrize('handedness', ['Right', 'Left'])
+def test_points_match_legacy_finger_status(handedness):
+    rng = np.random.default_rng(0)
+    for mask in range(32):
+        points = hand_showing(mask, handedness, rng)
+        status = legacy_fingers_status(to_landmarks(points), handedness)
+        assert gesture_core.mask_to_status(
+            gesture_core.finger_mask(points, handedness)) == status
+        assert gesture_core.classify_points(points, handedness) == (
+            legacy_classify_gesture(status))
+
+
+@pytest.mark.parametrize('handedness', ['Right', 'Left'])
+def test_batch_path_matches_single_hand(handedness):
+    rng = np.random.default_rng(1)
+    points = rng.uniform(0.0, 1.0, size=(200, gesture_core.NUM_LANDMARKS, 3))
+    masks = gesture_core.finger_masks(points, handedness)
+    single = [gesture_core.finger_mask(p, handedness) for p in points]
+    assert masks.tolist() == single
+    assert gesture_core.classify_masks(masks).tolist() == [
+        gesture_core.classify_mask(mask) for mask in single
+    ]
+
+
+def test_landmark_objects_and_arrays_agree():
+    rng = np.random.default_rng(2)
+    points = rng.uniform(0.0, 1.0, size=(gesture_core.NUM_LANDMARKS, 3))
+    converted = gesture_core.landmarks_to_array(to_landmarks(points))
+    np.testing.assert_array_equal(converted, points)
+
+
+# --- Parity with manual_control/gesture_core.py ------------------------------
+
+@pytest.fixture
+def manual_core(monkeypatch):
+    if not (REPO_ROOT / 'manual_control' / 'gesture_core.py').is_file():
+        pytest.skip('manual_control is not part of this checkout')
+    monkeypatch.syspath_prepend(str(REPO_ROOT))
+    from manual_control import gesture_core as core
+    return core
+
+
+def test_manual_control_copy_has_the_same_table(manual_core):
+    assert manual_core.GESTURE_TABLE == gesture_core.GESTURE_TABLE
+    assert manual_core.TIP_IDS.tolist() == gesture_core.TIP_IDS.tolist()
+    assert manual_core.MCP_IDS.tolist() == gesture_core.MCP_IDS.tolist()
+
+
+@pytest.mark.parametrize('handedness', ['Right', 'Left'])
+def test_manual_control_copy_classifies_the_same(manual_core, handedness):
+    rng = np.random.default_rng(3)
+    points = rng.uniform(0.0, 1.0, size=(200, gesture_core.NUM_LANDMARKS, 3))
+    np.testing.assert_array_equal(
+        manual_core.finger_masks(points, handedness),
+        gesture_core.finger_masks(points, handedness),
+    )
+    for hand in points[:50]:
+        assert manual_core.finger_mask(hand, handedness) == (
+            gesture_core.finger_mask(hand, handedness))
+        assert manual_core.speed_from_points(hand, 640, 480) == (
+            gesture_core.speed_from_points(hand, 640, 480))
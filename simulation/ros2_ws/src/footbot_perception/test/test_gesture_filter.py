@@ -0,0 +1,103 @@
+"""Offline tests for the gesture command filter.
+
+They drive GestureFilter with fabricated raw commands; no camera, MediaPipe
+or running ROS graph is needed.
+"""
+
+from footbot_perception import gesture_config as config
+from footbot_perception.gesture_filter import GestureFilter
+
+
+def feed(gesture_filter, commands):
+    return [gesture_filter.update(direction, speed) for direction, speed in commands]
+
+
+# --- Direction: majority vote ----------------------------------------------
+
+def test_single_frame_flip_is_suppressed():
+    gesture_filter = GestureFilter(window=5, speed_step=1)
+    raw = [('forward', 150)] * 5 + [('stop', 150)] + [('forward', 150)] * 3
+    out = feed(gesture_filter, raw)
+    assert [direction for direction, _ in out] == ['forward'] * len(raw)
+    assert gesture_filter.changes == 0
+    assert gesture_filter.suppressed == 2
+
+
+def test_direction_switches_on_strict_majority():
+    gesture_filter = GestureFilter(window=5, speed_step=1)
+    feed(gesture_filter, [('forward', 150)] * 5)
+    out = feed(gesture_filter, [('left', 150)] * 3)
+    # 2 of 5 is not a majority yet, 3 of 5 is.
+    assert [direction for direction, _ in out] == ['forward', 'forward', 'left']
+
+
+def test_no_majority_keeps_the_current_direction():
+    gesture_filter = GestureFilter(window=4, speed_step=1)
+    feed(gesture_filter, [('forward', 150)] * 4)
+    out = feed(gesture_filter, [('left', 150), ('right', 150)])
+    assert [direction for direction, _ in out] == ['forward', 'forward']
+
+
+def test_first_frame_is_published_as_is():
+    gesture_filter = GestureFilter(window=5, speed_step=1)
+    assert gesture_filter.update('backward', 90) == ('backward', 90)
+
+
+# --- Speed: quantization and hysteresis ------------------------------------
+
+def test_default_speed_is_a_step():
+    gesture_filter = GestureFilter(window=5, speed_step=16, speed_hysteresis=4)
+    out = feed(gesture_filter, [('forward', config.DEFAULT_SPEED)] * 3)
+    assert out == [('forward', config.DEFAULT_SPEED)] * 3
+
+
+def test_speed_snaps_to_the_step_grid():
+    gesture_filter = GestureFilter(window=1, speed_step=16, speed_hysteresis=0)
+    assert gesture_filter.update('forward', 170) == ('forward', 166)
+    assert gesture_filter.update('forward', 135) == ('forward', 134)
+
+
+def test_speed_is_clamped_to_the_range():
+    gesture_filter = GestureFilter(window=1, speed_step=16, speed_hysteresis=0)
+    assert gesture_filter.update('forward', config.MAX_SPEED)[1] == config.MAX_SPEED
+    low = gesture_filter.update('forward', config.MIN_SPEED)[1]
+    assert config.MIN_SPEED <= low < config.MIN_SPEED + 16
+
+
+def test_hysteresis_band_holds_the_step():
+    gesture_filter = GestureFilter(window=1, speed_step=16, speed_hysteresis=4)
+    assert gesture_filter.update('forward', 150)[1] == 150
+    # The next step (166) is nearer from 159 on, but the band is 8 + 4 around 150.
+    for speed in (159, 162, 138, 145, 160):
+        assert gesture_filter.update('forward', speed)[1] == 150
+    assert gesture_filter.update('forward', 163)[1] == 166
+    # Back down: 166 holds until the raw speed is more than 12 below it.
+    assert gesture_filter.update('forward', 155)[1] == 166
+    assert gesture_filter.update('forward', 153)[1] == 150
+
+
+def test_jitter_inside_the_band_publishes_one_command():
+    gesture_filter = GestureFilter(window=5, speed_step=16, speed_hysteresis=4)
+    out = feed(gesture_filter, [('forward', s) for s in (182, 176, 185, 179, 184, 177)])
+    assert len(set(out)) == 1
+    assert gesture_filter.changes == 0
+
+
+# --- Pass-through ----------------------------------------------------------
+
+def test_window_one_and_step_one_pass_through():
+    gesture_filter = GestureFilter(window=1, speed_step=1)
+    raw = [
+        ('forward', 182), ('stop', 176), ('forward', 185),
+        ('left', 51), ('right', 254), ('backward', 150),
+    ]
+    assert feed(gesture_filter, raw) == raw
+    assert gesture_filter.suppressed == 0
+    assert gesture_filter.changes == gesture_filter.raw_changes
+
+
+def test_reset_forgets_the_vote():
+    gesture_filter = GestureFilter(window=5, speed_step=1)
+    feed(gesture_filter, [('forward', 150)] * 5)
+    gesture_filter.reset()
+    assert gesture_filter.update('stop', 150) == ('stop', 150)